@@ -0,0 +1,13 @@
+"""RAPID MO2 plugin entry point.
+
+MO2 imports this package at startup and only calls createPlugins, so the package import
+itself stays free of mobase and Qt: the cache format (RAPID.cache_format) and the build
+engine (RAPID.engine) can be imported by scripts and tests outside MO2.
+"""
+
+
+# MO2 requires this factory function to initialize the plugin
+def createPlugins():
+    from .plugins import PreLaunchGameHook, RapidCacheTool, RapidCacheViewerTool
+
+    return [PreLaunchGameHook(), RapidCacheTool(), RapidCacheViewerTool()]
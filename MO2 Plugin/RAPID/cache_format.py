@@ -0,0 +1,1153 @@
+"""The RAP2 cache format: path hashing, section serializers, the compressed writer and readers.
+
+Needs neither mobase nor Qt.
+"""
+import hashlib
+import heapq
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterator
+
+NO_MOD_ROOT = 0xFFFFFFFF
+# Windows FILETIME (100 ns ticks since 1601-01-01) of the Unix epoch.
+FILETIME_UNIX_EPOCH = 116444736000000000
+SHARED_CACHE_MAGIC = b"RAPS"
+SHARED_CACHE_VERSION = 1
+SHARED_CACHE_HEADER = struct.Struct("<4sIQQQ")  # magic, version, cache file size, mtime (ns), payload length
+DATA_PREFIX = "data\\"
+RAP2_MAGIC = b"RAP2"
+RAP2_VERSION = 4
+RAP2_HEADER_SIZE = 12
+# The uncompressed section directory follows the header: u16 directory version, u16 entry
+# size, u32 count, then one entry per section. Newer directory versions may only append
+# fields to an entry. Each section is stored on its own at its file offset, so a reader
+# seeks to and inflates only the sections it needs.
+SECTION_DIRECTORY_VERSION = 1
+SECTION_DIRECTORY = struct.Struct("<HHI")
+# type, CRC-32 and codec, then file offset, stored length and length of the payload.
+SECTION_ENTRY = struct.Struct("<4sIIQQQ")
+SECTION_CODEC_STORED = 0
+SECTION_CODEC_ZLIB = 1
+SECTION_PATHS = b"PATH"
+SECTION_ENTRY_STATS = b"STAT"
+SECTION_MOD_ROOTS = b"ORIG"
+SECTION_METADATA = b"META"
+SECTION_HOT_SET = b"HOTS"
+PACK_U16 = struct.Struct("<H")
+PACK_U32 = struct.Struct("<I")
+PACK_U64 = struct.Struct("<Q")
+ENGINE_DATA_SUBDIRS = frozenset({
+    "textures", "meshes", "facegen", "interface", "music", "sound",
+    "scripts", "maxheights", "vis", "grass", "strings", "shadersfx",
+})
+
+
+def _normalize_path(raw: str) -> str:
+    stripped = raw.strip(" \t")
+    lowered = stripped.replace("/", "\\").lower()
+    while "\\\\" in lowered:
+        lowered = lowered.replace("\\\\", "\\")
+    lowered = lowered.lstrip("\\")
+    lowered = lowered.rstrip("\\")
+    if not lowered.startswith(DATA_PREFIX):
+        lowered = DATA_PREFIX + lowered
+    return lowered
+
+
+def _compute_rapid_hash64(path: str) -> int:
+    return _compute_rapid_hash64_utf8(_normalize_path(path).encode("utf-8"))
+
+
+def _compute_rapid_hash64_utf8(normalized: bytes) -> int:
+    """BSA-style hash over normalized UTF-8 bytes, byte-for-byte the SKSE ComputeRapidHash64."""
+    dot = normalized.rfind(b".")
+    if dot == -1:
+        root = normalized
+        ext = b""
+    else:
+        root = normalized[:dot]
+        ext = normalized[dot:]
+
+    low = 0
+    if root:
+        low = root[-1]
+        if len(root) > 2:
+            low |= root[-2] << 8
+        low |= (len(root) & 0xFFFFFFFF) << 16
+        low |= root[0] << 24
+        low &= 0xFFFFFFFF
+
+    if ext == b".kf":
+        low |= 0x80
+    elif ext == b".nif":
+        low |= 0x8000
+    elif ext == b".dds":
+        low |= 0x8080
+    elif ext == b".wav":
+        low |= 0x80000000
+    low &= 0xFFFFFFFF
+
+    mid_hash = 0
+    for byte in root[1:-2]:
+        mid_hash = ((mid_hash * 0x1003F) + byte) & 0xFFFFFFFF
+
+    ext_hash = 0
+    for byte in ext:
+        ext_hash = ((ext_hash * 0x1003F) + byte) & 0xFFFFFFFF
+
+    high = (mid_hash + ext_hash) & 0xFFFFFFFF
+    return ((high << 32) | low) & 0xFFFFFFFFFFFFFFFF
+
+
+class _PathAccumulator:
+    """Per-worker arena of normalized UTF-8 paths plus an offset array.
+
+    Extension and engine directory counters are updated in the same pass that normalizes
+    and encodes each path, so no per-path ``str`` outlives the walk. File size, mtime (as a
+    FILETIME) and the index of the interned mod root are kept in arrays parallel to the offsets.
+    """
+
+    __slots__ = ("data", "offsets", "sizes", "mtimes", "mod_root_ids", "mod_roots", "ext_counter", "root_counter")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.sizes = array("Q")
+        self.mtimes = array("Q")
+        self.mod_root_ids = array("I")
+        self.mod_roots: dict[str, int] = {}
+        self.ext_counter: Counter[str] = Counter()
+        self.root_counter: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def add(
+        self, raw_path: str, ext: str, directory: str, size: int = 0, mtime: int = 0, mod_root: str = ""
+    ) -> bool:
+        encoded = _normalize_path(raw_path).encode("utf-8")
+        if len(encoded) > 0xFFFF:
+            return False
+        self.data += encoded
+        self.offsets.append(len(self.data))
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        if mod_root:
+            root_id = self.mod_roots.get(mod_root)
+            if root_id is None:
+                root_id = self.mod_roots[mod_root] = len(self.mod_roots)
+            self.mod_root_ids.append(root_id)
+        else:
+            self.mod_root_ids.append(NO_MOD_ROOT)
+        self.ext_counter[ext or "(no ext)"] += 1
+        self.root_counter[directory] += 1
+        return True
+
+    def footprint(self) -> int:
+        """Approximate bytes held by the record arena and its parallel arrays."""
+        return len(self.data) + 28 * len(self)
+
+    def reset_records(self) -> None:
+        """Drop the accumulated records; the extension and directory counters are kept."""
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.sizes = array("Q")
+        self.mtimes = array("Q")
+        self.mod_root_ids = array("I")
+        self.mod_roots = {}
+
+    def records(self) -> Iterator[bytes]:
+        data = self.data
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield bytes(data[offsets[i] : offsets[i + 1]])
+
+
+def _serialize_path_records(
+    accumulators: list[_PathAccumulator], should_cancel: Callable[[], bool]
+) -> bytearray | None:
+    """Path records section: u64 hash, u16 length and UTF-8 path per record.
+
+    Accumulators are emptied as they are consumed.
+    """
+    out = bytearray()
+    pack_u64 = PACK_U64.pack
+    pack_u16 = PACK_U16.pack
+    for accumulator in accumulators:
+        for encoded in accumulator.records():
+            if should_cancel():
+                return None
+            out += pack_u64(_compute_rapid_hash64_utf8(encoded))
+            out += pack_u16(len(encoded))
+            out += encoded
+        accumulator.data = bytearray()
+        accumulator.offsets = array("Q", [0])
+    return out
+
+
+def _serialize_entry_stats(accumulators: list[_PathAccumulator]) -> bytearray:
+    """Entry stats section: u64 sizes, then u64 FILETIME mtimes, in record order."""
+    out = bytearray()
+    for accumulator in accumulators:
+        out += _array_bytes(accumulator.sizes)
+    for accumulator in accumulators:
+        out += _array_bytes(accumulator.mtimes)
+        accumulator.sizes = array("Q")
+        accumulator.mtimes = array("Q")
+    return out
+
+
+def _serialize_mod_roots(accumulators: list[_PathAccumulator]) -> bytearray:
+    """Mod roots section: interned root table (u32 n, u16 len + utf8 each), then one u32 root
+    index per record (NO_MOD_ROOT for archive or unresolved entries)."""
+    roots: dict[str, int] = {}
+    remaps: list[list[int]] = []
+    for accumulator in accumulators:
+        remap = []
+        for mod_root in accumulator.mod_roots:
+            root_id = roots.get(mod_root)
+            if root_id is None:
+                root_id = roots[mod_root] = len(roots)
+            remap.append(root_id)
+        remaps.append(remap)
+    out = _serialize_root_table(roots)
+    for accumulator, remap in zip(accumulators, remaps):
+        if remap != list(range(len(remap))):
+            accumulator.mod_root_ids = array(
+                "I", (NO_MOD_ROOT if root_id == NO_MOD_ROOT else remap[root_id] for root_id in accumulator.mod_root_ids)
+            )
+        out += _array_bytes(accumulator.mod_root_ids)
+        accumulator.mod_root_ids = array("I")
+        accumulator.mod_roots = {}
+    return out
+
+
+def _serialize_root_table(roots: dict[str, int]) -> bytearray:
+    out = bytearray(PACK_U32.pack(len(roots)))
+    for mod_root in roots:
+        encoded = mod_root.encode("utf-8")
+        out += PACK_U16.pack(len(encoded))
+        out += encoded
+    return out
+
+
+class AccessProfile:
+    """Lookup counts per normalized UTF-8 path, taken from a lookup trace, for access ordering.
+
+    The build fills in hot_records (the size of the hot set it wrote) and hot_lookups (the
+    traced lookups those records answered).
+    """
+
+    __slots__ = ("counts", "lookups", "hot_set_size", "hot_records", "hot_lookups")
+
+    def __init__(self, counts: dict[bytes, int], hot_set_size: int):
+        self.counts = counts
+        self.lookups = sum(counts.values())
+        self.hot_set_size = hot_set_size
+        self.hot_records = 0
+        self.hot_lookups = 0
+
+    def coverage(self) -> float:
+        """Share of the traced lookups answered by the hot set."""
+        return self.hot_lookups / self.lookups if self.lookups else 0.0
+
+
+def _order_by_access(accumulators: list[_PathAccumulator], profile: AccessProfile) -> _PathAccumulator:
+    """Merge accumulators into one whose records run from most to least looked up.
+
+    Traced records come first by descending lookup count (ties keep build order), then
+    every other record in build order; the first profile.hot_set_size of them form the hot
+    set. The merged arena is built before the sources are dropped, so this briefly holds
+    the records twice.
+    """
+    traced: list[tuple[int, int, int]] = []
+    counts = profile.counts
+    for source, accumulator in enumerate(accumulators):
+        data = accumulator.data
+        offsets = accumulator.offsets
+        for i in range(len(accumulator)):
+            count = counts.get(bytes(data[offsets[i] : offsets[i + 1]]))
+            if count:
+                traced.append((-count, source, i))
+    traced.sort()
+    hot = traced[: profile.hot_set_size]
+    profile.hot_records = len(hot)
+    profile.hot_lookups = -sum(count for count, _, _ in hot)
+
+    ordered = _PathAccumulator()
+    root_names = [list(accumulator.mod_roots) for accumulator in accumulators]
+
+    def append(source: int, i: int) -> None:
+        accumulator = accumulators[source]
+        ordered.data += accumulator.data[accumulator.offsets[i] : accumulator.offsets[i + 1]]
+        ordered.offsets.append(len(ordered.data))
+        ordered.sizes.append(accumulator.sizes[i])
+        ordered.mtimes.append(accumulator.mtimes[i])
+        root_id = accumulator.mod_root_ids[i]
+        if root_id != NO_MOD_ROOT:
+            root_id = ordered.mod_roots.setdefault(root_names[source][root_id], len(ordered.mod_roots))
+        ordered.mod_root_ids.append(root_id)
+
+    traced_records = [set() for _ in accumulators]
+    for _, source, i in traced:
+        append(source, i)
+        traced_records[source].add(i)
+    for source, accumulator in enumerate(accumulators):
+        skip = traced_records[source]
+        for i in range(len(accumulator)):
+            if i not in skip:
+                append(source, i)
+        ordered.ext_counter.update(accumulator.ext_counter)
+        ordered.root_counter.update(accumulator.root_counter)
+    accumulators.clear()
+    return ordered
+
+
+def _serialize_hot_set(entries: list[tuple[int, int]]) -> bytearray:
+    """Hot set section: u32 n, n u64 path hashes in ascending order, then the u32 record index
+    of each. A loader can search it before it has indexed the full path section."""
+    entries = sorted(entries)
+    out = bytearray(PACK_U32.pack(len(entries)))
+    out += _array_bytes(array("Q", (path_hash for path_hash, _ in entries)))
+    out += _array_bytes(array("I", (record for _, record in entries)))
+    return out
+
+
+def _cache_header(path_count: int, sections: list[tuple[bytes, int, int, int, int]]) -> bytes:
+    """The RAP2 header and section directory for sections given as (type, length, crc32,
+    stored length, codec).
+
+    Stored payloads follow the directory back to back in the given order, and each entry
+    holds its section's absolute file offset.
+    """
+    out = bytearray(RAP2_MAGIC)
+    out += PACK_U32.pack(RAP2_VERSION)
+    out += PACK_U32.pack(path_count)
+    out += SECTION_DIRECTORY.pack(SECTION_DIRECTORY_VERSION, SECTION_ENTRY.size, len(sections))
+    offset = len(out) + SECTION_ENTRY.size * len(sections)
+    for section_type, length, crc, stored_length, codec in sections:
+        out += SECTION_ENTRY.pack(section_type, crc, codec, offset, stored_length, length)
+        offset += stored_length
+    return bytes(out)
+
+
+class EntryStats:
+    """Per-record file size and mtime (FILETIME, 0 when unknown), parallel to the cache paths."""
+
+    __slots__ = ("sizes", "mtimes")
+
+    def __init__(self, sizes: array, mtimes: array):
+        self.sizes = sizes
+        self.mtimes = mtimes
+
+    @classmethod
+    def parse(cls, payload: bytes, count: int) -> "EntryStats | None":
+        """Parse an entry stats section; None when it does not match the record count."""
+        if len(payload) != 16 * count:
+            return None
+        return cls(_array_from(payload, "Q", 0, count), _array_from(payload, "Q", 8 * count, count))
+
+    def bytes_by_engine_directory(self, paths: list[str]) -> Counter[str]:
+        totals: Counter[str] = Counter()
+        for path, size in zip(paths, self.sizes):
+            totals[_engine_directory_from_path(path)] += size
+        return totals
+
+
+class PhysicalSources:
+    """Maps cached virtual paths to the physical file MO2 resolved them to at build time.
+
+    Each record stores an index into an interned table of mod root folders; the physical
+    path is that root joined with the record's path below ``data\\``.
+    """
+
+    __slots__ = ("paths", "roots", "root_ids", "_records")
+
+    def __init__(self, paths: list[str], roots: list[str], root_ids: array):
+        self.paths = paths
+        self.roots = roots
+        self.root_ids = root_ids
+        self._records: dict[str, int] | None = None
+
+    @classmethod
+    def parse(cls, raw: bytes, paths: list[str]) -> "PhysicalSources | None":
+        """Parse a mod roots section; None when it is malformed or does not match paths."""
+        if len(raw) < 4:
+            return None
+        (num_roots,) = struct.unpack_from("<I", raw, 0)
+        off = 4
+        roots: list[str] = []
+        for _ in range(num_roots):
+            if off + 2 > len(raw):
+                return None
+            (slen,) = struct.unpack_from("<H", raw, off)
+            off += 2
+            if off + slen > len(raw):
+                return None
+            roots.append(raw[off : off + slen].decode("utf-8"))
+            off += slen
+        if off + 4 * len(paths) != len(raw):
+            return None
+        return cls(paths, roots, _array_from(raw, "I", off, len(paths)))
+
+    def record_physical(self, record: int) -> str | None:
+        root_id = self.root_ids[record]
+        if root_id == NO_MOD_ROOT or root_id >= len(self.roots):
+            return None
+        return os.path.join(self.roots[root_id], *self.paths[record][len(DATA_PREFIX):].split("\\"))
+
+    def resolve_physical(self, path: str) -> str | None:
+        """Physical file behind a virtual path, or None when it is not cached or came from an archive."""
+        if self._records is None:
+            self._records = {cached: record for record, cached in enumerate(self.paths)}
+        record = self._records.get(_normalize_path(path))
+        return None if record is None else self.record_physical(record)
+
+    def verify(self) -> tuple[list[tuple[str, str]], int]:
+        """Return (missing (virtual, physical) pairs, unrecorded entry count).
+
+        Each physical directory is listed once rather than stat'ing every file.
+        """
+        listings: dict[str, set[str] | None] = {}
+        missing: list[tuple[str, str]] = []
+        unrecorded = 0
+        for record, path in enumerate(self.paths):
+            physical = self.record_physical(record)
+            if physical is None:
+                unrecorded += 1
+                continue
+            parent, name = os.path.split(physical)
+            names = listings.get(parent, False)
+            if names is False:
+                try:
+                    names = listings[parent] = {entry.lower() for entry in os.listdir(parent)}
+                except OSError:
+                    names = listings[parent] = None
+            if names is None or name.lower() not in names:
+                missing.append((path, physical))
+        return missing, unrecorded
+
+
+class ModContribution:
+    """Entries, loose bytes and extension breakdown one mod supplies to the cache."""
+
+    __slots__ = ("entries", "bytes", "ext_counter")
+
+    def __init__(self, entries: int = 0, size: int = 0, ext_counter: Counter[str] | None = None):
+        self.entries = entries
+        self.bytes = size
+        self.ext_counter: Counter[str] = ext_counter if ext_counter is not None else Counter()
+
+    def merge(self, other: "ModContribution") -> None:
+        self.entries += other.entries
+        self.bytes += other.bytes
+        self.ext_counter.update(other.ext_counter)
+
+
+def _pack_counter(parts: list[bytes], counter: Counter[str]) -> None:
+    items = counter.most_common()
+    parts.append(PACK_U32.pack(len(items)))
+    for key, count in items:
+        b = key.encode("utf-8")
+        parts.append(PACK_U16.pack(len(b)))
+        parts.append(b)
+        parts.append(PACK_U32.pack(count))
+
+
+def _unpack_counter(meta: bytes, off: int) -> tuple[Counter[str], int] | None:
+    if off + 4 > len(meta):
+        return None
+    (num_items,) = struct.unpack_from("<I", meta, off)
+    off += 4
+    counter: Counter[str] = Counter()
+    for _ in range(num_items):
+        if off + 2 > len(meta):
+            return None
+        (slen,) = struct.unpack_from("<H", meta, off)
+        off += 2
+        if off + slen + 4 > len(meta):
+            return None
+        counter[meta[off : off + slen].decode("utf-8")] = struct.unpack_from("<I", meta, off + slen)[0]
+        off += slen + 4
+    return counter, off
+
+
+def _pack_mod_contributions(parts: list[bytes], contributions: dict[str, ModContribution]) -> None:
+    items = sorted(contributions.items(), key=lambda item: item[1].entries, reverse=True)
+    parts.append(PACK_U32.pack(len(items)))
+    for mod_name, contribution in items:
+        b = mod_name.encode("utf-8")
+        parts.append(PACK_U16.pack(len(b)))
+        parts.append(b)
+        parts.append(PACK_U32.pack(contribution.entries))
+        parts.append(PACK_U64.pack(contribution.bytes))
+        _pack_counter(parts, contribution.ext_counter)
+
+
+def _unpack_mod_contributions(meta: bytes, off: int) -> tuple[dict[str, ModContribution], int] | None:
+    if off + 4 > len(meta):
+        return None
+    (num_mods,) = struct.unpack_from("<I", meta, off)
+    off += 4
+    contributions: dict[str, ModContribution] = {}
+    for _ in range(num_mods):
+        if off + 2 > len(meta):
+            return None
+        (slen,) = struct.unpack_from("<H", meta, off)
+        off += 2
+        if off + slen + 12 > len(meta):
+            return None
+        mod_name = meta[off : off + slen].decode("utf-8")
+        entries, size = struct.unpack_from("<IQ", meta, off + slen)
+        unpacked = _unpack_counter(meta, off + slen + 12)
+        if unpacked is None:
+            return None
+        ext_counter, off = unpacked
+        contributions[mod_name] = ModContribution(entries, size, ext_counter)
+    return contributions, off
+
+
+def _serialize_metadata(
+    build_time_ms: int,
+    ext_counter: Counter[str],
+    root_counter: Counter[str],
+    filter_counter: Counter[str],
+    mod_contributions: dict[str, ModContribution],
+    load_order_fingerprint: str = "",
+) -> bytes:
+    parts = [PACK_U64.pack(build_time_ms)]
+    _pack_counter(parts, ext_counter)
+    _pack_counter(parts, root_counter)
+    _pack_counter(parts, filter_counter)
+    _pack_mod_contributions(parts, mod_contributions)
+    fingerprint = load_order_fingerprint.encode("ascii")
+    parts.append(PACK_U16.pack(len(fingerprint)))
+    parts.append(fingerprint)
+    return b"".join(parts)
+
+
+def _compute_path_counters(paths: list[str]) -> tuple[Counter[str], Counter[str]]:
+    ext_counter: Counter[str] = Counter()
+    root_counter: Counter[str] = Counter()
+    for path in paths:
+        _, ext = os.path.splitext(path)
+        ext_counter[ext.lower() if ext else "(no ext)"] += 1
+        root_counter[_engine_directory_from_path(path)] += 1
+    return ext_counter, root_counter
+
+
+def _engine_directory_from_path(path: str) -> str:
+    parts = path.split("\\", 2)
+    if len(parts) > 1 and parts[0] == "data":
+        return parts[1]
+    if parts and parts[0]:
+        return parts[0]
+    return "(unknown)"
+
+
+def _compute_extension_counters_by_engine_directory(paths: list[str]) -> dict[str, Counter[str]]:
+    counters: dict[str, Counter[str]] = {}
+    for path in paths:
+        root = _engine_directory_from_path(path)
+        _, ext = os.path.splitext(path)
+        ext_key = ext.lower() if ext else "(no ext)"
+        if root not in counters:
+            counters[root] = Counter()
+        counters[root][ext_key] += 1
+    return counters
+
+
+def _root_counter_has_invalid_metadata(root_counter: Counter[str], path_count: int) -> bool:
+    if not root_counter:
+        return True
+    if sum(root_counter.values()) != path_count:
+        return True
+    if any(count <= 0 for count in root_counter.values()):
+        return True
+    valid_roots = set(ENGINE_DATA_SUBDIRS)
+    valid_roots.add("(unknown)")
+    return any(root not in valid_roots for root in root_counter)
+
+
+def _parse_metadata(
+    meta: bytes,
+) -> tuple[int, Counter[str], Counter[str], Counter[str], dict[str, ModContribution], str] | None:
+    off = 0
+    if off + 8 > len(meta):
+        return None
+    (build_time_ms,) = struct.unpack_from("<Q", meta, off)
+    off += 8
+    unpacked = _unpack_counter(meta, off)
+    if unpacked is None:
+        return None
+    ext_counter, off = unpacked
+    unpacked = _unpack_counter(meta, off)
+    if unpacked is None:
+        return None
+    root_counter, off = unpacked
+    # Caches written before directory rules or mod attribution existed end early.
+    filter_counter: Counter[str] = Counter()
+    if off < len(meta):
+        unpacked = _unpack_counter(meta, off)
+        if unpacked is None:
+            return None
+        filter_counter, off = unpacked
+    mod_contributions: dict[str, ModContribution] = {}
+    if off < len(meta):
+        unpacked_mods = _unpack_mod_contributions(meta, off)
+        if unpacked_mods is None:
+            return None
+        mod_contributions, off = unpacked_mods
+    load_order_fingerprint = ""
+    if off + 2 <= len(meta):
+        (slen,) = struct.unpack_from("<H", meta, off)
+        if off + 2 + slen > len(meta):
+            return None
+        load_order_fingerprint = meta[off + 2 : off + 2 + slen].decode("ascii")
+    return (build_time_ms, ext_counter, root_counter, filter_counter, mod_contributions, load_order_fingerprint)
+
+
+class _CompressedCacheWriter:
+    """Streams a cache into a file one section at a time, each through its own zlib level 1
+    stream.
+
+    begin() reserves room for the header and section directory, which finish() fills in
+    once every section's length and checksum is known. The content digest covers the header
+    and every section but the metadata, in the order the records were written. Bounded-memory
+    builds write them sorted by path and in-memory builds in scan order, so the same files
+    built both ways get different digests; only two sorted builds of them are sure to match.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "wb")
+        self._digest = hashlib.sha256()
+        self._path_count = 0
+        self._section_count = 0
+        self._sections: list[tuple[bytes, int, int, int, int]] = []
+        self._section_type = b""
+        self._compressor = zlib.compressobj(level=1)
+        self._pending = bytearray()
+        self._length = 0
+        self._stored_length = 0
+        self._crc = 0
+
+    def begin(self, path_count: int, section_count: int) -> None:
+        """Start a cache of path_count records and section_count sections, metadata included."""
+        self._path_count = path_count
+        self._section_count = section_count
+        self._digest.update(RAP2_MAGIC + PACK_U32.pack(RAP2_VERSION) + PACK_U32.pack(path_count))
+        self._file.seek(RAP2_HEADER_SIZE + SECTION_DIRECTORY.size + SECTION_ENTRY.size * section_count)
+
+    def begin_section(self, section_type: bytes) -> None:
+        self._section_type = section_type
+        self._compressor = zlib.compressobj(level=1)
+        self._length = self._stored_length = self._crc = 0
+
+    def write(self, data: bytes, hashed: bool = True) -> None:
+        if hashed:
+            self._digest.update(data)
+        self._crc = zlib.crc32(data, self._crc)
+        self._length += len(data)
+        self._pending += data
+        if len(self._pending) >= 1 << 20:
+            self._drain()
+
+    def copy_from(self, path: str) -> None:
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                self.write(chunk)
+
+    def _drain(self) -> None:
+        self._emit(self._compressor.compress(self._pending))
+        self._pending = bytearray()
+
+    def _emit(self, compressed: bytes) -> None:
+        self._file.write(compressed)
+        self._stored_length += len(compressed)
+
+    def end_section(self) -> None:
+        self._drain()
+        self._emit(self._compressor.flush())
+        self._sections.append(
+            (self._section_type, self._length, self._crc, self._stored_length, SECTION_CODEC_ZLIB)
+        )
+
+    def finish(self, metadata_payload: bytes) -> str:
+        """Append the metadata section, write the directory, close the file and return the
+        content digest."""
+        self.begin_section(SECTION_METADATA)
+        self.write(metadata_payload, hashed=False)
+        self.end_section()
+        if len(self._sections) != self._section_count:
+            raise ValueError(f"wrote {len(self._sections)} sections, expected {self._section_count}")
+        self._file.seek(0)
+        self._file.write(_cache_header(self._path_count, self._sections))
+        self._file.close()
+        return self._digest.hexdigest()
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _RunSpiller:
+    """Bounded-memory builds: workers flush sorted runs of records to disk, merged at the end.
+
+    Each worker's arena is flushed once it passes threshold bytes, so peak memory follows
+    the budget instead of the file count. Run records are u16 length + path + u64 size +
+    u64 mtime + u32 mod root id, with mod roots interned globally under a lock.
+    """
+
+    RUN_RECORD = struct.Struct("<QQI")
+
+    def __init__(self, directory: str, budget_bytes: int, worker_count: int):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        # A flush briefly needs about twice the arena for its sort keys.
+        self.threshold = max(1 << 20, budget_bytes // (3 * max(1, worker_count)))
+        self.roots: dict[str, int] = {}
+        self.runs: list[tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    def flush(self, accumulator: _PathAccumulator) -> None:
+        count = len(accumulator)
+        if count == 0:
+            return
+        with self._lock:
+            global_ids = [self.roots.setdefault(mod_root, len(self.roots)) for mod_root in accumulator.mod_roots]
+            run_path = os.path.join(self.directory, f"run_{len(self.runs):05d}.bin")
+            self.runs.append((run_path, count))
+        data = accumulator.data
+        offsets = accumulator.offsets
+        sizes = accumulator.sizes
+        mtimes = accumulator.mtimes
+        root_ids = accumulator.mod_root_ids
+        order = sorted(range(count), key=lambda i: data[offsets[i] : offsets[i + 1]])
+        pack_record = self.RUN_RECORD.pack
+        pack_u16 = PACK_U16.pack
+        with open(run_path, "wb", buffering=1 << 20) as f:
+            for i in order:
+                encoded = data[offsets[i] : offsets[i + 1]]
+                root_id = root_ids[i]
+                f.write(pack_u16(len(encoded)))
+                f.write(encoded)
+                f.write(pack_record(sizes[i], mtimes[i], root_id if root_id == NO_MOD_ROOT else global_ids[root_id]))
+        accumulator.reset_records()
+
+    def _read_run(self, run_path: str, buffer_size: int) -> Iterator[tuple[bytes, int, int, int]]:
+        unpack_record = self.RUN_RECORD.unpack
+        record_size = self.RUN_RECORD.size
+        with open(run_path, "rb", buffering=buffer_size) as f:
+            read = f.read
+            while head := read(2):
+                encoded = read(PACK_U16.unpack(head)[0])
+                yield (encoded, *unpack_record(read(record_size)))
+
+    def merge_into(
+        self,
+        writer: _CompressedCacheWriter,
+        metadata_payload: bytes,
+        include_stats: bool,
+        include_roots: bool,
+        should_cancel: Callable[[], bool],
+        access: AccessProfile | None = None,
+    ) -> int | None:
+        """K-way merge the runs into writer as a RAP2 cache, in path order, up to its metadata.
+
+        The merge writes every column to a side file first, since each section is
+        compressed on its own and the stats and mod roots follow the path records. Records
+        stay in path order; with an access profile the most looked-up ones still get a hot
+        set section.
+        Returns the record count, or None when canceled; writer.finish(metadata_payload)
+        completes the cache.
+        """
+        path_count = sum(count for _, count in self.runs)
+        buffer_size = max(1 << 14, min(1 << 20, self.budget_bytes // (4 * max(1, len(self.runs)))))
+        spill = {name: os.path.join(self.directory, f"{name}.bin") for name in ("paths", "sizes", "mtimes", "roots")}
+        columns = {name: open(path, "wb", buffering=1 << 20) for name, path in spill.items()}
+        try:
+            pack_u64 = PACK_U64.pack
+            pack_u16 = PACK_U16.pack
+            pack_u32 = PACK_U32.pack
+            write_record = columns["paths"].write
+            write_size = columns["sizes"].write
+            write_mtime = columns["mtimes"].write
+            write_root = columns["roots"].write
+            counts = access.counts if access is not None else {}
+            traced: list[tuple[int, int, int]] = []
+            merged = heapq.merge(*(self._read_run(run_path, buffer_size) for run_path, _ in self.runs))
+            for n, (encoded, size, mtime, root_id) in enumerate(merged):
+                if n & 0xFFF == 0 and should_cancel():
+                    return None
+                path_hash = _compute_rapid_hash64_utf8(encoded)
+                write_record(pack_u64(path_hash) + pack_u16(len(encoded)) + encoded)
+                if count := counts.get(encoded):
+                    traced.append((count, -n, path_hash))
+                if include_stats:
+                    write_size(pack_u64(size))
+                    write_mtime(pack_u64(mtime))
+                if include_roots:
+                    write_root(pack_u32(root_id))
+        finally:
+            for column in columns.values():
+                column.close()
+
+        root_table = _serialize_root_table(self.roots)
+        layout: list[tuple[bytes, bytes, list[str]]] = []
+        if access is not None:
+            hot = heapq.nlargest(access.hot_set_size, traced)
+            access.hot_records = len(hot)
+            access.hot_lookups = sum(count for count, _, _ in hot)
+            if hot:
+                layout.append((SECTION_HOT_SET, _serialize_hot_set([(h, -n) for _, n, h in hot]), []))
+        layout.append((SECTION_PATHS, b"", [spill["paths"]]))
+        if include_stats:
+            layout.append((SECTION_ENTRY_STATS, b"", [spill["sizes"], spill["mtimes"]]))
+        if include_roots:
+            layout.append((SECTION_MOD_ROOTS, root_table, [spill["roots"]]))
+        writer.begin(path_count, len(layout) + 1)
+        for section_type, prefix, part_paths in layout:
+            if should_cancel():
+                return None
+            writer.begin_section(section_type)
+            writer.write(prefix)
+            for part_path in part_paths:
+                writer.copy_from(part_path)
+            writer.end_section()
+        return path_count
+
+
+def _serialize_in_memory(
+    accumulators: list[_PathAccumulator],
+    metadata_payload: bytes,
+    include_stats: bool,
+    include_roots: bool,
+    should_cancel: Callable[[], bool],
+    hot_records: int = 0,
+) -> tuple[bytes, str] | None:
+    """Serialize and compress the whole cache in memory; return (cache file, content digest).
+
+    With hot_records, the leading records (see _order_by_access) also go into a hot set
+    section, written ahead of the path records.
+    """
+    path_count = sum(len(accumulator) for accumulator in accumulators)
+    sections: list[tuple[bytes, bytes]] = []
+    if hot_records:
+        leading = (encoded for accumulator in accumulators for encoded in accumulator.records())
+        hot = [(_compute_rapid_hash64_utf8(encoded), record) for record, encoded in zip(range(hot_records), leading)]
+        sections.append((SECTION_HOT_SET, _serialize_hot_set(hot)))
+    records = _serialize_path_records(accumulators, should_cancel)
+    if records is None:
+        return None
+    sections.append((SECTION_PATHS, records))
+    if include_stats:
+        sections.append((SECTION_ENTRY_STATS, _serialize_entry_stats(accumulators)))
+    if include_roots:
+        sections.append((SECTION_MOD_ROOTS, _serialize_mod_roots(accumulators)))
+    accumulators.clear()
+
+    content_digest = hashlib.sha256(RAP2_MAGIC + PACK_U32.pack(RAP2_VERSION) + PACK_U32.pack(path_count))
+    for _, payload in sections:
+        content_digest.update(payload)
+    sections.append((SECTION_METADATA, metadata_payload))
+
+    directory: list[tuple[bytes, int, int, int, int]] = []
+    compressed_parts: list[bytes] = []
+    step_size = 1 << 20
+    for section_type, payload in sections:
+        compressor = zlib.compressobj(level=1)
+        first_part = len(compressed_parts)
+        view = memoryview(payload)
+        for offset in range(0, len(payload), step_size):
+            if should_cancel():
+                return None
+            compressed_parts.append(compressor.compress(view[offset : offset + step_size]))
+        view.release()
+        compressed_parts.append(compressor.flush())
+        stored_length = sum(len(part) for part in compressed_parts[first_part:])
+        directory.append((section_type, len(payload), zlib.crc32(payload), stored_length, SECTION_CODEC_ZLIB))
+    compressed_parts.insert(0, _cache_header(path_count, directory))
+    return b"".join(compressed_parts), content_digest.hexdigest()
+
+
+def _cache_incompatibility(cache_path: str) -> str | None:
+    """Return why cache_path cannot be launched with as-is, or None when it can."""
+    try:
+        with open(cache_path, "rb") as f:
+            head = f.read(1 << 16)
+    except OSError:
+        return "no cache file"
+    if head[:4] != RAP2_MAGIC:
+        # Format 3 and older compressed the header along with everything else.
+        try:
+            head = zlib.decompressobj().decompress(head, RAP2_HEADER_SIZE)
+        except zlib.error:
+            return "not a RAP2 cache"
+        if head[:4] != RAP2_MAGIC:
+            return "not a RAP2 cache"
+    if len(head) < RAP2_HEADER_SIZE:
+        return "not a RAP2 cache"
+    version, num_files = struct.unpack_from("<II", head, 4)
+    if version != RAP2_VERSION:
+        return f"format version {version}, expected {RAP2_VERSION}"
+    if num_files == 0:
+        return "empty cache"
+    return None
+
+
+def _read_cache_directory(f) -> tuple[int, list[tuple[bytes, int, int, int, int, int]]] | None:
+    """Read the header and section directory of an open cache file.
+
+    Returns (path count, [(type, crc, codec, offset, stored length, length), ...]) in
+    directory order, or None when the file is not a current RAP2 cache.
+    """
+    head = f.read(RAP2_HEADER_SIZE + SECTION_DIRECTORY.size)
+    if len(head) < RAP2_HEADER_SIZE + SECTION_DIRECTORY.size or head[:4] != RAP2_MAGIC:
+        return None
+    version, path_count = struct.unpack_from("<II", head, 4)
+    _, entry_size, section_count = SECTION_DIRECTORY.unpack_from(head, RAP2_HEADER_SIZE)
+    if version != RAP2_VERSION or entry_size < SECTION_ENTRY.size:
+        return None
+    entries = f.read(entry_size * section_count)
+    if len(entries) < entry_size * section_count:
+        return None
+    return path_count, [SECTION_ENTRY.unpack_from(entries, i * entry_size) for i in range(section_count)]
+
+
+def _iter_section(f, entry: tuple[bytes, int, int, int, int, int]) -> Iterator[bytes]:
+    """Yield the uncompressed payload of one section in chunks, reading it from its offset.
+
+    Raises ValueError once the payload turns out truncated, too long or fails its CRC-32.
+    """
+    section_type, crc, codec, offset, stored_length, length = entry
+    if codec == SECTION_CODEC_ZLIB:
+        decompressor = zlib.decompressobj()
+    elif codec != SECTION_CODEC_STORED:
+        raise ValueError(f"section {section_type!r} uses unknown codec {codec}")
+    f.seek(offset)
+    remaining = stored_length
+    produced = 0
+    actual_crc = 0
+    while remaining:
+        chunk = f.read(min(remaining, 1 << 20))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        if codec == SECTION_CODEC_ZLIB:
+            chunk = decompressor.decompress(chunk, length - produced + 1)
+            if decompressor.unconsumed_tail:
+                raise ValueError(f"section {section_type!r} inflates past {length} bytes")
+        produced += len(chunk)
+        actual_crc = zlib.crc32(chunk, actual_crc)
+        yield chunk
+    if remaining or produced != length or actual_crc != crc:
+        raise ValueError(f"section {section_type!r} is truncated or fails its checksum")
+
+
+def _read_cache_sections(
+    cache_path: str, wanted: frozenset[bytes] | None = None
+) -> tuple[int, dict[bytes, bytes]] | None:
+    """Read a RAP2 cache; return (path count, {section type: payload}) or None.
+
+    Only the wanted section types are read and inflated (every section when None); each is
+    stored on its own, so reading the metadata never touches the path records. Unknown
+    section types are skipped; a section whose CRC-32 does not match fails the read.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            read = _read_cache_directory(f)
+            if read is None:
+                return None
+            path_count, entries = read
+            sections: dict[bytes, bytes] = {}
+            for entry in entries:
+                if (wanted is None or entry[0] in wanted) and entry[0] not in sections:
+                    sections[entry[0]] = b"".join(_iter_section(f, entry))
+    except (OSError, ValueError, zlib.error):
+        return None
+    return path_count, sections
+
+
+def _replace_metadata(cache_path: str, output_path: str, metadata_payload: bytes) -> None:
+    """Write cache_path to output_path with its metadata section replaced by metadata_payload.
+
+    The other sections are copied as stored, without inflating them, so the content digest
+    is unchanged. Raises ValueError when cache_path is not a current cache.
+    """
+    compressed = zlib.compress(metadata_payload, 1)
+    with open(cache_path, "rb") as f:
+        read = _read_cache_directory(f)
+        if read is None:
+            raise ValueError(f"{cache_path!r} is not a current RAP2 cache")
+        path_count, entries = read
+        kept = [entry for entry in entries if entry[0] != SECTION_METADATA]
+        directory = [
+            (section_type, length, crc, stored_length, codec)
+            for section_type, crc, codec, _, stored_length, length in kept
+        ]
+        crc = zlib.crc32(metadata_payload)
+        directory.append((SECTION_METADATA, len(metadata_payload), crc, len(compressed), SECTION_CODEC_ZLIB))
+        with open(output_path, "wb") as out:
+            out.write(_cache_header(path_count, directory))
+            for _, _, _, offset, stored_length, _ in kept:
+                f.seek(offset)
+                while stored_length:
+                    chunk = f.read(min(stored_length, 1 << 20))
+                    if not chunk:
+                        raise ValueError(f"{cache_path!r} is truncated")
+                    out.write(chunk)
+                    stored_length -= len(chunk)
+            out.write(compressed)
+
+
+def _parse_path_records(records: bytes, count: int) -> list[str] | None:
+    paths: list[str] = []
+    offset = 0
+    for _ in range(count):
+        if offset + 10 > len(records):
+            return None
+        (path_len,) = struct.unpack_from("<H", records, offset + 8)
+        offset += 10
+        if offset + path_len > len(records):
+            return None
+        paths.append(_normalize_path(records[offset : offset + path_len].decode("utf-8")))
+        offset += path_len
+    return paths
+
+
+def _read_cache_paths(
+    cache_path: str, extra_sections: tuple[bytes, ...] = ()
+) -> tuple[list[str], dict[bytes, bytes]] | None:
+    """Read a cache's normalized paths plus any extra_sections present; None when invalid."""
+    read = _read_cache_sections(cache_path, frozenset((SECTION_PATHS, *extra_sections)))
+    if read is None:
+        return None
+    path_count, sections = read
+    records = sections.get(SECTION_PATHS)
+    paths = None if records is None else _parse_path_records(records, path_count)
+    if paths is None:
+        return None
+    return paths, sections
+
+
+def read_physical_sources(cache_path: str) -> PhysicalSources | None:
+    """Load the physical source table of a cache; None when the cache is invalid or has none."""
+    read = _read_cache_paths(cache_path, (SECTION_MOD_ROOTS,))
+    if read is None:
+        return None
+    paths, sections = read
+    payload = sections.get(SECTION_MOD_ROOTS)
+    return None if payload is None else PhysicalSources.parse(payload, paths)
+
+
+def read_cache_stats(
+    cache_path: str,
+) -> tuple[
+    list[str],
+    Counter[str],
+    Counter[str],
+    Counter[str],
+    dict[str, ModContribution],
+    EntryStats | None,
+    int | None,
+] | None:
+    """Read and parse rapid_vfs_cache.bin.
+
+    Returns (paths, ext_counter, root_counter, filter_counter, mod_contributions,
+    entry_stats, build_time_utc_ms) or None.
+    """
+    read = _read_cache_paths(cache_path, (SECTION_ENTRY_STATS, SECTION_METADATA))
+    if read is None:
+        return None
+    paths, sections = read
+    entry_stats = None
+    if SECTION_ENTRY_STATS in sections:
+        entry_stats = EntryStats.parse(sections[SECTION_ENTRY_STATS], len(paths))
+    parsed = None
+    if SECTION_METADATA in sections:
+        parsed = _parse_metadata(sections[SECTION_METADATA])
+    if parsed is not None:
+        build_time_ms, ext_counter, root_counter, filter_counter, mod_contributions, _ = parsed
+        if _root_counter_has_invalid_metadata(root_counter, len(paths)):
+            _, root_counter = _compute_path_counters(paths)
+    else:
+        build_time_ms = None
+        ext_counter, root_counter = _compute_path_counters(paths)
+        filter_counter = Counter()
+        mod_contributions = {}
+
+    return (paths, ext_counter, root_counter, filter_counter, mod_contributions, entry_stats, build_time_ms)
+
+
+def _read_record_hashes(records: bytes, count: int) -> array | None:
+    """Return the stored 64-bit hash of every path record, in record order."""
+    hashes = array("Q")
+    offset = 0
+    unpack_record = struct.Struct("<QH").unpack_from
+    for _ in range(count):
+        if offset + 10 > len(records):
+            return None
+        path_hash, path_len = unpack_record(records, offset)
+        hashes.append(path_hash)
+        offset += 10 + path_len
+    return hashes
+
+
+def _cache_uncompressed_size(cache_path: str) -> int | None:
+    """Size of the cache with every section stored uncompressed; see _iter_uncompressed_cache."""
+    try:
+        with open(cache_path, "rb") as f:
+            read = _read_cache_directory(f)
+    except OSError:
+        return None
+    if read is None:
+        return None
+    _, entries = read
+    size = RAP2_HEADER_SIZE + SECTION_DIRECTORY.size + SECTION_ENTRY.size * len(entries)
+    return size + sum(length for *_, length in entries)
+
+
+def _iter_uncompressed_cache(cache_path: str) -> Iterator[bytes]:
+    """Yield cache_path rewritten with every section stored uncompressed, in chunks.
+
+    The result is itself a RAP2 cache, one a reader can use in place without inflating
+    anything. Raises ValueError when the cache is invalid.
+    """
+    with open(cache_path, "rb") as f:
+        read = _read_cache_directory(f)
+        if read is None:
+            raise ValueError(f"{cache_path!r} is not a current RAP2 cache")
+        path_count, entries = read
+        stored = [
+            (section_type, length, crc, length, SECTION_CODEC_STORED) for section_type, crc, _, _, _, length in entries
+        ]
+        yield _cache_header(path_count, stored)
+        for entry in entries:
+            yield from _iter_section(f, entry)
+
+
+def _array_from(raw: bytes, typecode: str, offset: int, count: int) -> array:
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    if end > len(raw):
+        raise ValueError("search index truncated")
+    values.frombytes(raw[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _array_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,41 @@
+"""Plugin names and setting defaults, shared by the plugin shells and the engine.
+
+Imported at MO2 startup, so it must stay free of heavy imports.
+"""
+
+HOOK_PLUGIN_NAME = "RAPID - Pre-Launch Game Hook"
+DEFAULT_CACHE_STORE_BUDGET_MB = 0
+MIN_MEMORY_BUDGET_MB = 16
+SHARED_CACHE_NAME = "RAPID_VFS_Cache"
+DEFAULT_SHARED_CACHE_TIMEOUT_S = 600
+DEFAULT_SAMPLE_DIRECTORIES = 300
+DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT = 95
+DEFAULT_HOT_SET_SIZE = 4096
+STALENESS_TOLERANCE = 0.01  # share of cached files in changed directories a clean sample rules out
+
+EXCLUDED_EXTENSIONS = (
+    '.esp', '.esm', '.esl',
+    '.bsa', '.ba2', '.exe',
+    '.psc', '.skse','.dll',
+    '.md', '.pdf', '.bak', 
+    '.tmp', '.temp', '.orig',
+    '.log', '.gitignore', '.gitattributes',
+    '.manifest', '.url', '.lnk',
+    '.db', '.lock', '.vsidx',
+    '.7z', '.license', '.bak2',
+    '.original', '.def', '.old',
+    '.zip', '.hkxbak', '.psd',
+    '.mohidden', '.cpp', '.fla',
+    '.vortex_backup', '.backup', '.hidden',
+)
+
+# Per engine directory include rules, "<dir>=<item>,<item>;...". ".ext" or a glob allows,
+# a leading "!" denies. A directory with any allow item only keeps matching files.
+# Globs match the file name unless they contain a backslash. "*" applies to every directory.
+# The defaults only deny known junk: mods ship real assets under names and extensions an
+# allowlist would miss (licenseplate.nif, .lst, .btt, .hko, OAR config.json).
+DEFAULT_DIRECTORY_RULES = (
+    "*=!readme*.txt,!*changelog*.txt,!*license*.txt",
+    "textures=!.png,!.psd,!.xcf",
+    "meshes=!.blend,!.blend1,!.max,!.fbx,!.obj",
+)
@@ -0,0 +1,2127 @@
+"""Cache building, the cache store, launch history, staleness checks and the shared-memory handoff.
+
+Needs neither mobase nor Qt; the organizer is only passed in.
+"""
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import hashlib
+import heapq
+import json
+import math
+import os
+import queue
+import random
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, TypeVar
+
+try:
+    import sqlite3
+except ImportError:  # Python builds without the _sqlite3 extension
+    sqlite3 = None
+
+if TYPE_CHECKING:
+    import mobase
+
+from .cache_format import (
+    AccessProfile,
+    DATA_PREFIX,
+    ENGINE_DATA_SUBDIRS,
+    FILETIME_UNIX_EPOCH,
+    ModContribution,
+    PACK_U32,
+    RAP2_VERSION,
+    SECTION_METADATA,
+    SECTION_PATHS,
+    SHARED_CACHE_HEADER,
+    SHARED_CACHE_MAGIC,
+    SHARED_CACHE_VERSION,
+    _CompressedCacheWriter,
+    _PathAccumulator,
+    _RunSpiller,
+    _array_bytes,
+    _array_from,
+    _cache_uncompressed_size,
+    _compute_path_counters,
+    _compute_rapid_hash64,
+    _iter_uncompressed_cache,
+    _normalize_path,
+    _order_by_access,
+    _parse_metadata,
+    _read_cache_paths,
+    _read_cache_sections,
+    _read_record_hashes,
+    _replace_metadata,
+    _root_counter_has_invalid_metadata,
+    _serialize_in_memory,
+    _serialize_metadata,
+    read_cache_stats,
+)
+from .defaults import (
+    DEFAULT_CACHE_STORE_BUDGET_MB,
+    DEFAULT_DIRECTORY_RULES,
+    DEFAULT_HOT_SET_SIZE,
+    DEFAULT_SAMPLE_DIRECTORIES,
+    DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT,
+    EXCLUDED_EXTENSIONS,
+    MIN_MEMORY_BUDGET_MB,
+    SHARED_CACHE_NAME,
+    STALENESS_TOLERANCE,
+)
+
+CACHE_FILENAME = "rapid_vfs_cache.bin"
+CACHE_SUBDIR = ("SKSE", "Plugins", "RAPID")
+CACHE_STORE_SUBDIR = ("RAPID", "cache_store")
+CACHE_STORE_INDEX = "index.json"
+CACHE_STORE_VERSION = 2
+CACHE_REPLACE_ATTEMPTS = 30
+CACHE_REPLACE_RETRY_SECONDS = 2.0
+RUNS_DIR_SUFFIX = ".runs"
+LAUNCH_HISTORY_FILENAME = "launch_history.sqlite3"
+LAUNCH_HISTORY_LIMIT = 200
+SKSE_LOG_FILENAME = "RAPID.log"
+LOOKUP_TRACE_FILENAME = "rapid_lookup_trace.tsv"
+PROFILE_SUFFIX = ".folded"
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_TOP_N = 25
+NEW_DIRECTORY_SEARCH_DEPTH = 8  # levels below a new directory searched for kept files
+SEARCH_INDEX_SUFFIX = ".search"
+SEARCH_INDEX_MAGIC = b"RAPX"
+SEARCH_INDEX_VERSION = 1
+SEARCH_BLOCK_SIZE = 256
+EXTENSION_BLACKLIST_RULE = "extension_blacklist"
+UNKNOWN_ORIGIN = "(unknown)"
+
+
+def _list_file_stats(directory: str) -> dict[str, tuple[int, int]]:
+    """Map lower-cased file names to (size, FILETIME mtime); one scandir, no per-file stat on Windows."""
+    stats: dict[str, tuple[int, int]] = {}
+    try:
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if dir_entry.is_file():
+                    st = dir_entry.stat()
+                    stats[dir_entry.name.lower()] = (st.st_size, st.st_mtime_ns // 100 + FILETIME_UNIX_EPOCH)
+    except OSError:
+        pass
+    return stats
+
+
+def _winning_origins(organizer: mobase.IOrganizer, directory_path: str) -> dict[str, tuple[str, str]]:
+    """Map each lowercased file name of one virtual directory to its (origin mod, physical path).
+
+    One findFileInfos call resolves the whole directory. Files served from archives get no
+    physical path.
+    """
+    winners: dict[str, tuple[str, str]] = {}
+    for info in organizer.findFileInfos(directory_path, lambda _info: True):
+        if info.origins:
+            physical = "" if info.archive else info.filePath
+            winners[os.path.basename(info.filePath).lower()] = (info.origins[0], physical)
+    return winners
+
+
+def _resolve_directory_entries(
+    winners: dict[str, tuple[str, str]],
+    names: list[str],
+    with_stats: bool,
+) -> list[tuple[str, str, int, int]]:
+    """Return (origin mod, physical path, size, mtime) for each file name of one virtual directory.
+
+    winners comes from _winning_origins. With with_stats, each physical directory it points
+    into is listed once; otherwise, and for files without a physical path, size and mtime are 0.
+    """
+    if not with_stats:
+        unknown = (UNKNOWN_ORIGIN, "")
+        return [(*winners.get(name.lower(), unknown), 0, 0) for name in names]
+    stats_by_directory: dict[str, dict[str, tuple[int, int]]] = {}
+    resolved: list[tuple[str, str, int, int]] = []
+    for name in names:
+        key = name.lower()
+        origin, physical = winners.get(key, (UNKNOWN_ORIGIN, ""))
+        size = mtime = 0
+        if physical:
+            parent = os.path.dirname(physical)
+            stats = stats_by_directory.get(parent)
+            if stats is None:
+                stats = stats_by_directory[parent] = _list_file_stats(parent)
+            size, mtime = stats.get(key, (0, 0))
+        resolved.append((origin, physical, size, mtime))
+    return resolved
+
+
+def _mod_root_of(physical: str, entry_path: str) -> str:
+    """Strip the virtual entry path off its physical file path; "" when they do not line up."""
+    suffix_len = len(entry_path) + 1
+    if not physical or len(physical) <= suffix_len:
+        return ""
+    tail = physical[-suffix_len:].replace("/", "\\").lower()
+    if tail != "\\" + entry_path.replace("/", "\\").lower():
+        return ""
+    return physical[:-suffix_len]
+
+
+def get_rapid_cache_path(organizer: mobase.IOrganizer, settings_plugin_name: str) -> str:
+    """Resolve the cache file path from the output_to_mod setting (Overwrite or a mod name)."""
+    raw = organizer.pluginSetting(settings_plugin_name, "output_to_mod")
+    if raw is None:
+        raw = ""
+    value = (raw or "").strip()
+    if not value or value.lower() == "overwrite" or value == "__overwrite__":
+        base_dir = organizer.overwritePath()
+    else:
+        mod_list = organizer.modList()
+        mod = mod_list.getMod(value)
+        if mod is not None:
+            base_dir = mod.absolutePath()
+        else:
+            base_dir = None
+            for internal_name in mod_list.allMods():
+                if mod_list.displayName(internal_name) == value:
+                    mod = mod_list.getMod(internal_name)
+                    if mod is not None:
+                        base_dir = mod.absolutePath()
+                    break
+            if base_dir is None:
+                print(f"RAPID: unknown output mod {value!r}, using Overwrite.")
+                base_dir = organizer.overwritePath()
+    return os.path.join(base_dir, *CACHE_SUBDIR, CACHE_FILENAME)
+
+
+def _get_cache_path_candidates(organizer: mobase.IOrganizer, settings_plugin_name: str) -> list[str]:
+    candidates: list[str] = []
+    output_path = get_rapid_cache_path(organizer, settings_plugin_name)
+    candidates.append(output_path)
+    overwrite_path = os.path.join(organizer.overwritePath(), *CACHE_SUBDIR, CACHE_FILENAME)
+    if overwrite_path not in candidates:
+        candidates.append(overwrite_path)
+    try:
+        game = organizer.managedGame()
+        if game is not None:
+            data_dir = game.dataDirectory()
+            if data_dir is not None:
+                data_path = os.path.join(data_dir.absolutePath(), *CACHE_SUBDIR, CACHE_FILENAME)
+                if data_path not in candidates:
+                    candidates.append(data_path)
+    except Exception:
+        pass
+    return candidates
+
+
+def _get_excluded_extensions_for_settings(organizer: mobase.IOrganizer, settings_plugin_name: str) -> frozenset[str]:
+    raw = organizer.pluginSetting(settings_plugin_name, "extension_blacklist")
+    if raw is None or not raw.strip():
+        return frozenset(EXCLUDED_EXTENSIONS)
+    excluded: set[str] = set()
+    for part in raw.split(","):
+        ext = part.strip().lower()
+        if not ext:
+            continue
+        if not ext.startswith("."):
+            ext = "." + ext
+        excluded.add(ext)
+    return frozenset(excluded)
+
+
+class _DirectoryFilter:
+    """Compiled include rules for one engine directory, evaluated once per file in the walker.
+
+    Globs without a backslash match the file name, globs with one match the whole
+    ``textures\\...`` path.
+    """
+
+    __slots__ = (
+        "directory",
+        "excluded_extensions",
+        "deny_extensions",
+        "allow_extensions",
+        "deny_name_re",
+        "deny_path_re",
+        "allow_name_re",
+        "allow_path_re",
+        "allow_label",
+        "_deny_name_labels",
+        "_deny_path_labels",
+        "_has_allow_rules",
+        "_has_glob_rules",
+    )
+
+    def __init__(
+        self,
+        directory: str,
+        excluded_extensions: frozenset[str],
+        deny_extensions: dict[str, str],
+        allow_extensions: frozenset[str],
+        deny_globs: list[tuple[str, str]],
+        allow_globs: list[str],
+        allow_label: str,
+    ):
+        self.directory = directory
+        self.excluded_extensions = excluded_extensions
+        self.deny_extensions = deny_extensions
+        self.allow_extensions = allow_extensions
+        deny_name = [(glob, label) for glob, label in deny_globs if "\\" not in glob]
+        deny_path = [(glob, label) for glob, label in deny_globs if "\\" in glob]
+        self.deny_name_re = _compile_glob_alternation([glob for glob, _ in deny_name])
+        self.deny_path_re = _compile_glob_alternation([glob for glob, _ in deny_path])
+        self.allow_name_re = _compile_glob_alternation([glob for glob in allow_globs if "\\" not in glob])
+        self.allow_path_re = _compile_glob_alternation([glob for glob in allow_globs if "\\" in glob])
+        self.allow_label = allow_label
+        self._deny_name_labels = [label for _, label in deny_name]
+        self._deny_path_labels = [label for _, label in deny_path]
+        self._has_allow_rules = bool(allow_extensions or allow_globs)
+        self._has_glob_rules = bool(deny_globs or allow_globs)
+
+    def rejection(self, path: str, name: str, ext: str) -> str | None:
+        """Return the label of the rule removing this entry, or None to keep it."""
+        if ext in self.excluded_extensions:
+            return EXTENSION_BLACKLIST_RULE
+        label = self.deny_extensions.get(ext)
+        if label is not None:
+            return label
+        if not self._has_glob_rules:
+            if not self._has_allow_rules or ext in self.allow_extensions:
+                return None
+            return self.allow_label
+        name = name.lower()
+        path = path.lower()
+        if self.deny_name_re is not None:
+            match = self.deny_name_re.match(name)
+            if match is not None:
+                return self._deny_name_labels[int(match.lastgroup[1:])]
+        if self.deny_path_re is not None:
+            match = self.deny_path_re.match(path)
+            if match is not None:
+                return self._deny_path_labels[int(match.lastgroup[1:])]
+        if not self._has_allow_rules or ext in self.allow_extensions:
+            return None
+        if self.allow_name_re is not None and self.allow_name_re.match(name) is not None:
+            return None
+        if self.allow_path_re is not None and self.allow_path_re.match(path) is not None:
+            return None
+        return self.allow_label
+
+
+def _compile_glob_alternation(globs: list[str]) -> re.Pattern[str] | None:
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?P<g{i}>{fnmatch.translate(glob)})" for i, glob in enumerate(globs)))
+
+
+def _parse_directory_rules(raw: str) -> dict[str, list[str]]:
+    rules: dict[str, list[str]] = {}
+    for part in raw.split(";"):
+        name, sep, items = part.partition("=")
+        name = name.strip().lower().strip("\\/")
+        if not sep or not name:
+            continue
+        bucket = rules.setdefault(name, [])
+        for item in items.split(","):
+            item = item.strip().lower().replace("/", "\\")
+            if item and item != "!":
+                bucket.append(item)
+    return rules
+
+
+def _compile_directory_filters(
+    raw_rules: str, excluded_extensions: frozenset[str]
+) -> dict[str, _DirectoryFilter]:
+    """Compile the directory_rules setting into one filter per engine directory."""
+    rules = _parse_directory_rules(raw_rules)
+    shared = rules.pop("*", [])
+    filters: dict[str, _DirectoryFilter] = {}
+    for directory in ENGINE_DATA_SUBDIRS:
+        deny_extensions: dict[str, str] = {}
+        allow_extensions: set[str] = set()
+        deny_globs: list[tuple[str, str]] = []
+        allow_globs: list[str] = []
+        items = [("*", item) for item in shared] + [(directory, item) for item in rules.get(directory, [])]
+        for owner, item in items:
+            deny = item.startswith("!")
+            pattern = item[1:] if deny else item
+            is_glob = any(c in pattern for c in "*?[")
+            if not is_glob and not pattern.startswith("."):
+                pattern = "." + pattern
+            if deny and is_glob:
+                deny_globs.append((pattern, f"{owner}: !{pattern}"))
+            elif deny:
+                deny_extensions.setdefault(pattern, f"{owner}: !{pattern}")
+            elif is_glob:
+                allow_globs.append(pattern)
+            else:
+                allow_extensions.add(pattern)
+        filters[directory] = _DirectoryFilter(
+            directory,
+            excluded_extensions,
+            deny_extensions,
+            frozenset(allow_extensions),
+            deny_globs,
+            allow_globs,
+            f"{directory}: not allowed",
+        )
+    return filters
+
+
+def _get_directory_filters_for_settings(
+    organizer: mobase.IOrganizer, settings_plugin_name: str
+) -> dict[str, _DirectoryFilter]:
+    excluded_extensions = _get_excluded_extensions_for_settings(organizer, settings_plugin_name)
+    raw = organizer.pluginSetting(settings_plugin_name, "directory_rules")
+    if raw is None:
+        raw = ";".join(DEFAULT_DIRECTORY_RULES)
+    return _compile_directory_filters(raw, excluded_extensions)
+
+
+def compute_load_order_fingerprint(organizer: mobase.IOrganizer, settings_plugin_name: str) -> str:
+    """Hash what decides the cache contents: active mods in priority order, their install
+    state, the game data directory and the settings that shape the file.
+
+    Only mod folders and meta.ini are stamped, so files added inside a mod's subfolders or
+    in Overwrite do not change the fingerprint; callers that trust a match (the cache
+    store) run the sampled staleness check on top.
+    """
+    return _hash_load_order(_snapshot_load_order(organizer, settings_plugin_name))
+
+
+def _snapshot_load_order(organizer: mobase.IOrganizer, settings_plugin_name: str) -> tuple[str, list[tuple[str, str]]]:
+    """What compute_load_order_fingerprint hashes, read from MO2 without touching the disk:
+    the settings and data directory lines, and the active mods (name, folder) by priority.
+
+    Stamping the mod folders is left to _hash_load_order, so it can run off the GUI thread.
+    """
+    lines = []
+    for key in (
+        "extension_blacklist",
+        "directory_rules",
+        "mod_attribution",
+        "entry_stats",
+        "physical_paths",
+        "access_ordering",
+        "hot_set_size",
+        "memory_budget_mb",
+    ):
+        lines.append(f"{key}={organizer.pluginSetting(settings_plugin_name, key)!r}\n")
+    try:
+        game = organizer.managedGame()
+        if game is not None:
+            lines.append(f"data={game.dataDirectory().absolutePath()}\n")
+    except Exception:
+        pass
+    import mobase  # Only available inside MO2; the rest of the engine does not need it.
+
+    mods = []
+    mod_list = organizer.modList()
+    for name in mod_list.allModsByProfilePriority():
+        if not mod_list.state(name) & mobase.ModState.ACTIVE:
+            continue
+        mod = mod_list.getMod(name)
+        mods.append((name, mod.absolutePath() if mod is not None else ""))
+    return "".join(lines), mods
+
+
+def _hash_load_order(snapshot: tuple[str, list[tuple[str, str]]]) -> str:
+    """The load order fingerprint of a _snapshot_load_order, with each mod folder stamped."""
+    header, mods = snapshot
+    h = hashlib.sha256()
+    h.update(PACK_U32.pack(RAP2_VERSION))
+    h.update(header.encode("utf-8"))
+    for name, mod_path in mods:
+        # meta.ini is rewritten whenever MO2 installs or updates the mod.
+        stamps = []
+        for candidate in (mod_path, os.path.join(mod_path, "meta.ini")):
+            try:
+                stamps.append(os.stat(candidate).st_mtime_ns)
+            except OSError:
+                stamps.append(0)
+        h.update(f"mod={name}|{mod_path}|{stamps[0]}|{stamps[1]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _temp_path_beside(path: str) -> str:
+    """Create an empty, uniquely named file next to path to write and then os.replace over it.
+
+    A fixed name like path + ".tmp" would let a background rebuild, a store materialize and
+    a foreground build clobber each other's half-written files.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory or ".")
+    os.close(fd)
+    return tmp_path
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class RapidCacheStore:
+    """Content-addressed store of built caches keyed by load-order fingerprint.
+
+    Objects are named by the SHA-256 of the cache's path records, so profiles that index the
+    same files in the same record order share one object. Bounded-memory builds sort their
+    records by path; in-memory builds keep the order the workers scanned in, so two of them
+    seldom match. The metadata section (fingerprint, build time, attribution) is kept per
+    fingerprint and swapped into the object when it is materialized. Fingerprints are
+    evicted least recently used first once the objects exceed the disk budget.
+    """
+
+    def __init__(self, root: str, budget_bytes: int):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._index_path = os.path.join(root, CACHE_STORE_INDEX)
+        self._objects_dir = os.path.join(root, "objects")
+        self._metadata_dir = os.path.join(root, "metadata")
+        self._entries: dict[str, dict] = self._load_index()
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_STORE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = _temp_path_beside(self._index_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_STORE_VERSION, "entries": self._entries}, f, indent=1)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest + ".bin")
+
+    def _metadata_path(self, fingerprint: str) -> str:
+        return os.path.join(self._metadata_dir, fingerprint + ".bin")
+
+    def lookup(self, fingerprint: str) -> str | None:
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            return None
+        object_path = self._object_path(entry["object"])
+        if not os.path.isfile(object_path) or not os.path.isfile(self._metadata_path(fingerprint)):
+            del self._entries[fingerprint]
+            self._save_index()
+            return None
+        return object_path
+
+    def materialize(self, fingerprint: str, output_path: str) -> bool:
+        """Write the cache stored for fingerprint, with its own metadata, to output_path.
+
+        The object is linked (or copied) when it already carries that metadata, which is
+        the case for the fingerprint that built it.
+        """
+        object_path = self.lookup(fingerprint)
+        if object_path is None:
+            return False
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            tmp_path = _temp_path_beside(output_path)
+            with open(self._metadata_path(fingerprint), "rb") as f:
+                metadata_payload = f.read()
+            read = _read_cache_sections(object_path, frozenset((SECTION_METADATA,)))
+            if read is not None and read[1].get(SECTION_METADATA) == metadata_payload:
+                os.remove(tmp_path)  # os.link needs the name free; it stays unique to this call.
+                try:
+                    os.link(object_path, tmp_path)
+                except OSError:
+                    shutil.copyfile(object_path, tmp_path)
+            else:
+                _replace_metadata(object_path, tmp_path, metadata_payload)
+            os.replace(tmp_path, output_path)
+        except (OSError, ValueError, zlib.error) as e:
+            if tmp_path is not None:
+                _remove_quietly(tmp_path)
+            print(f"RAPID cache store: failed to materialize {object_path!r}: {e!r}")
+            return False
+        self._entries[fingerprint]["last_used"] = time.time()
+        self._save_index()
+        return True
+
+    def put(self, fingerprint: str, cache_path: str, digest: str) -> None:
+        read = _read_cache_sections(cache_path, frozenset((SECTION_METADATA,)))
+        if read is None or SECTION_METADATA not in read[1]:
+            print(f"RAPID cache store: {cache_path!r} has no readable metadata; not storing it.")
+            return
+        object_path = self._object_path(digest)
+        if not os.path.isfile(object_path):
+            os.makedirs(self._objects_dir, exist_ok=True)
+            tmp_path = _temp_path_beside(object_path)
+            try:
+                shutil.copyfile(cache_path, tmp_path)
+                os.replace(tmp_path, object_path)
+            except BaseException:
+                _remove_quietly(tmp_path)
+                raise
+        metadata_path = self._metadata_path(fingerprint)
+        os.makedirs(self._metadata_dir, exist_ok=True)
+        tmp_path = _temp_path_beside(metadata_path)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(read[1][SECTION_METADATA])
+            os.replace(tmp_path, metadata_path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        self._entries[fingerprint] = {"object": digest, "last_used": time.time()}
+        self._evict(keep=fingerprint)
+        self._save_index()
+
+    def _evict(self, keep: str) -> None:
+        def object_sizes() -> dict[str, int]:
+            sizes: dict[str, int] = {}
+            for entry in self._entries.values():
+                try:
+                    sizes[entry["object"]] = os.path.getsize(self._object_path(entry["object"]))
+                except OSError:
+                    sizes[entry["object"]] = 0
+            return sizes
+
+        sizes = object_sizes()
+        by_age = sorted(
+            (fp for fp in self._entries if fp != keep), key=lambda fp: self._entries[fp]["last_used"]
+        )
+        while sum(sizes.values()) > self.budget_bytes and by_age:
+            evicted = by_age.pop(0)
+            del self._entries[evicted]
+            sizes = object_sizes()
+        referenced_objects = {entry["object"] for entry in self._entries.values()}
+        for directory, referenced in ((self._objects_dir, referenced_objects), (self._metadata_dir, self._entries)):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                key, ext = os.path.splitext(name)
+                if ext == ".bin" and key not in referenced:
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError as e:
+                        print(f"RAPID cache store: failed to evict {name!r}: {e!r}")
+
+
+def _get_cache_store_for_settings(organizer: mobase.IOrganizer, settings_plugin_name: str) -> RapidCacheStore | None:
+    location = _get_cache_store_location(organizer, settings_plugin_name)
+    return None if location is None else RapidCacheStore(*location)
+
+
+def _get_cache_store_location(organizer: mobase.IOrganizer, settings_plugin_name: str) -> tuple[str, int] | None:
+    """(root, budget in bytes) of the cache store, or None when it is disabled; reads only MO2."""
+    raw = organizer.pluginSetting(settings_plugin_name, "cache_store_budget_mb")
+    budget_mb = DEFAULT_CACHE_STORE_BUDGET_MB if raw is None else int(raw)
+    if budget_mb <= 0:
+        return None
+    return os.path.join(organizer.pluginDataPath(), *CACHE_STORE_SUBDIR), budget_mb << 20
+
+
+_SKSE_LOG_LINE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})\] \[[^\]]*\] \[\w+\] \[[^\]]*\] (.*)$")
+_SKSE_LOG_SETTINGS = re.compile(r"Settings loaded from .* \(enabled=(true|false)")
+_SKSE_LOG_CACHE_LOADED = re.compile(
+    r"R\.A\.P\.I\.D\. cache loaded from .*: (\d+) paths \(format=\d+, inflated=(\d+) bytes"
+    r"(?:, read=([\d.]+) ms, inflate=([\d.]+) ms, index=([\d.]+) ms)?\)"
+)
+_SKSE_LOG_INJECTED = re.compile(r"injected (\d+) cached loose-file paths in ([\d.]+) ms")
+_SKSE_LOG_NATIVE = re.compile(r"native traversal events=(\d+), .*totalTraversalTimeMs=([\d.]+)")
+_SKSE_LOG_DATA_LOADED = re.compile(r"Time from plugin load to kDataLoaded: (\d+) ms")
+
+
+def _parse_skse_log_lines(lines: list[str], metrics: dict) -> None:
+    """Fold RAPID SKSE log lines into metrics (launches table column -> value)."""
+    for line in lines:
+        match = _SKSE_LOG_LINE.match(line)
+        if match is None:
+            continue
+        stamp, message = match.groups()
+        if (found := _SKSE_LOG_SETTINGS.search(message)) is not None:
+            metrics["rapid_enabled"] = int(found.group(1) == "true")
+        elif "R.A.P.I.D. cache lookup path:" in message:
+            metrics["_lookup_at"] = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S.%f")
+        elif (found := _SKSE_LOG_CACHE_LOADED.search(message)) is not None:
+            metrics["path_count"] = int(found.group(1))
+            metrics["inflated_bytes"] = int(found.group(2))
+            if found.group(3) is not None:
+                metrics["inflate_ms"] = float(found.group(4))
+                metrics["load_ms"] = float(found.group(3)) + float(found.group(4)) + float(found.group(5))
+            elif "_lookup_at" in metrics:
+                # DLLs that predate the load timings: time from the lookup line to this one.
+                loaded_at = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S.%f")
+                metrics["load_ms"] = (loaded_at - metrics["_lookup_at"]).total_seconds() * 1000
+        elif (found := _SKSE_LOG_INJECTED.search(message)) is not None:
+            metrics["path_count"] = int(found.group(1))
+            metrics["inject_ms"] = float(found.group(2))
+        elif "using native traversal for this session" in message:
+            metrics["native_fallbacks"] = metrics.get("native_fallbacks", 0) + 1
+        elif (found := _SKSE_LOG_NATIVE.search(message)) is not None:
+            metrics["native_traversals"] = int(found.group(1))
+            metrics["native_traversal_ms"] = float(found.group(2))
+        elif (found := _SKSE_LOG_DATA_LOADED.search(message)) is not None:
+            metrics["data_loaded_ms"] = float(found.group(1))
+
+
+# What LaunchHistory raises besides OSError, so callers need not import sqlite3. Without
+# sqlite3 there is no history to fail (get_launch_history returns None).
+LaunchHistoryError: type[Exception] = sqlite3.Error if sqlite3 is not None else OSError
+
+
+class LaunchHistory:
+    """SQLite history of game launches, one row per launch.
+
+    The plugin side (pre-launch time, cache size, load order) is recorded at launch; the
+    SKSE side (cache load, inject, native fallbacks) is parsed from the RAPID SKSE log after
+    the game exits and attached to the launch that produced that log session. The byte
+    offset reached in each session is kept, so a later parse of the same session seeks past
+    the lines already read.
+    """
+
+    LOG_COLUMNS = (
+        "rapid_enabled",
+        "path_count",
+        "inflated_bytes",
+        "load_ms",
+        "inflate_ms",
+        "inject_ms",
+        "native_fallbacks",
+        "native_traversals",
+        "native_traversal_ms",
+        "data_loaded_ms",
+    )
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS launches ("
+        "id INTEGER PRIMARY KEY, launched_at REAL, profile TEXT, load_order TEXT, prelaunch_ms REAL, "
+        "cache_bytes INTEGER, exit_code INTEGER, session TEXT, rapid_enabled INTEGER, path_count INTEGER, "
+        "inflated_bytes INTEGER, load_ms REAL, inflate_ms REAL, inject_ms REAL, native_fallbacks INTEGER, "
+        "native_traversals INTEGER, native_traversal_ms REAL, data_loaded_ms REAL)",
+        "CREATE TABLE IF NOT EXISTS log_state (log_path TEXT PRIMARY KEY, session TEXT, offset INTEGER, launch_id INTEGER)",
+    )
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _connect(self) -> "sqlite3.Connection":
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    def record(
+        self,
+        log_path: str,
+        launched_at: float,
+        profile: str,
+        load_order: str,
+        prelaunch_ms: float,
+        cache_bytes: int,
+        exit_code: int,
+    ) -> dict:
+        """Store this launch and fold in what is new in log_path; return the launch row.
+
+        The plugin side is always stored. The SKSE side is attached only when log_path holds a
+        session no earlier launch has claimed: a game that dies before SKSE rewrites the log
+        leaves the previous session there, and its new lines, if any, go to that launch.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                state = connection.execute(
+                    "SELECT session, offset, launch_id FROM log_state WHERE log_path = ?", (log_path,)
+                ).fetchone()
+                log = self._read_new_lines(log_path, state)
+                values: dict = {}
+                if log is not None:
+                    session, resume, text, offset = log
+                    metrics: dict = {} if resume else {"native_fallbacks": 0}
+                    _parse_skse_log_lines(text.splitlines(), metrics)
+                    log_values = {column: metrics[column] for column in self.LOG_COLUMNS if column in metrics}
+                    if not resume:
+                        values = {**log_values, "session": session}
+                    elif log_values:
+                        assignments = ", ".join(
+                            "native_fallbacks = IFNULL(native_fallbacks, 0) + ?" if column == "native_fallbacks"
+                            else f"{column} = ?"
+                            for column in log_values
+                        )
+                        connection.execute(
+                            f"UPDATE launches SET {assignments} WHERE id = ?",
+                            (*log_values.values(), state["launch_id"]),
+                        )
+                values.update(
+                    launched_at=launched_at,
+                    profile=profile,
+                    load_order=load_order,
+                    prelaunch_ms=prelaunch_ms,
+                    cache_bytes=cache_bytes,
+                    exit_code=exit_code,
+                )
+                launch_id = connection.execute(
+                    f"INSERT INTO launches ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                    tuple(values.values()),
+                ).lastrowid
+                if log is not None:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO log_state (log_path, session, offset, launch_id) VALUES (?, ?, ?, ?)",
+                        (log_path, session, offset, state["launch_id"] if resume else launch_id),
+                    )
+            return dict(connection.execute("SELECT * FROM launches WHERE id = ?", (launch_id,)).fetchone())
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _read_new_lines(log_path: str, state) -> tuple[str, bool, str, int] | None:
+        """(session, resume, text, offset) for the complete lines log_path gained since state.
+
+        resume is True when the log still holds the session state recorded; reading then
+        starts at the stored byte offset instead of the top. offset is where the last
+        complete line ends. None when the log cannot be read.
+        """
+        try:
+            with open(log_path, "rb") as f:
+                session = f.readline().decode("utf-8", "replace")[:25]
+                size = os.fstat(f.fileno()).st_size
+                resume = state is not None and state["session"] == session and state["offset"] <= size
+                start = state["offset"] if resume else 0
+                f.seek(start)
+                raw = f.read()
+        except OSError:
+            return None
+        complete = raw.rfind(b"\n") + 1
+        return session, resume, raw[:complete].decode("utf-8", "replace"), start + complete
+
+    def launches(self, profile: str | None = None, limit: int = LAUNCH_HISTORY_LIMIT) -> list[dict]:
+        """The most recent launches, oldest first."""
+        if not os.path.isfile(self.db_path):
+            return []
+        connection = self._connect()
+        try:
+            if profile is None:
+                rows = connection.execute("SELECT * FROM launches ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = connection.execute(
+                    "SELECT * FROM launches WHERE profile = ? ORDER BY id DESC LIMIT ?", (profile, limit)
+                ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in reversed(rows)]
+
+
+def get_launch_history(organizer: mobase.IOrganizer) -> LaunchHistory | None:
+    """The launch history in MO2's plugin data folder; None when Python has no sqlite3."""
+    if sqlite3 is None:
+        return None
+    return LaunchHistory(os.path.join(organizer.pluginDataPath(), CACHE_STORE_SUBDIR[0], LAUNCH_HISTORY_FILENAME))
+
+
+def get_skse_log_path(organizer: mobase.IOrganizer) -> str | None:
+    """The RAPID SKSE log: My Games\\<game>\\SKSE\\RAPID.log."""
+    try:
+        game = organizer.managedGame()
+        if game is None:
+            return None
+        return os.path.join(game.documentsDirectory().absolutePath(), "SKSE", SKSE_LOG_FILENAME)
+    except Exception:
+        return None
+
+
+def _get_lookup_trace_path(organizer: mobase.IOrganizer) -> str | None:
+    """The SKSE lookup trace, written next to RAPID.log while PerformanceDiagnostics is on."""
+    log_path = get_skse_log_path(organizer)
+    return None if log_path is None else os.path.join(os.path.dirname(log_path), LOOKUP_TRACE_FILENAME)
+
+
+def read_lookup_counts(trace_path: str) -> Counter[bytes] | None:
+    """Lookups per normalized UTF-8 path in a lookup trace (or a list of one path per line).
+
+    Misses are counted too: a path the previous cache did not have may be in the next one.
+    None when the trace cannot be read.
+    """
+    counts: Counter[bytes] = Counter()
+    normalized: dict[str, bytes] = {}
+    try:
+        with open(trace_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                raw_path = line.rstrip("\n").split("\t", 4)[-1]
+                path = normalized.get(raw_path)
+                if path is None:
+                    path = normalized[raw_path] = _normalize_path(raw_path).encode("utf-8")
+                counts[path] += 1
+    except OSError:
+        return None
+    return counts
+
+
+def _get_access_source_for_settings(
+    organizer: mobase.IOrganizer, settings_plugin_name: str
+) -> tuple[str | None, int] | None:
+    """(lookup trace path, hot set size) when access_ordering is on; read it with _read_access_profile."""
+    if not organizer.pluginSetting(settings_plugin_name, "access_ordering"):
+        return None
+    hot_set_size = organizer.pluginSetting(settings_plugin_name, "hot_set_size")
+    hot_set_size = DEFAULT_HOT_SET_SIZE if hot_set_size is None else max(0, int(hot_set_size))
+    return _get_lookup_trace_path(organizer), hot_set_size
+
+
+def _read_access_profile(trace_path: str | None, hot_set_size: int) -> AccessProfile | None:
+    counts = None if trace_path is None else read_lookup_counts(trace_path)
+    if not counts:
+        print(
+            f"RAPID access ordering: no lookup trace at {trace_path!r}; building in scan order. "
+            "Set PerformanceDiagnostics = true in the SKSE config.ini and launch once to record one."
+        )
+        return None
+    return AccessProfile(counts, hot_set_size)
+
+
+def load_launch_history(organizer: mobase.IOrganizer) -> list[dict] | None:
+    """Launches of the current profile for the History tab; None when history is unavailable."""
+    history = get_launch_history(organizer)
+    if history is None:
+        return None
+    try:
+        return history.launches(organizer.profileName())
+    except (OSError, LaunchHistoryError) as e:
+        print(f"RAPID launch history: failed to read {history.db_path!r}: {e!r}")
+        return None
+
+
+class _CacheBuildResult:
+    """Outcome of one VFS scan: the compressed cache, or the worker errors that stopped it.
+
+    Bounded-memory builds leave the compressed cache in compressed_path instead of
+    compressed_data.
+    """
+
+    __slots__ = ("compressed_data", "path_count", "filtered_count", "content_digest", "errors", "compressed_path")
+
+    def __init__(
+        self,
+        compressed_data: bytes,
+        path_count: int,
+        filtered_count: int,
+        content_digest: str | None,
+        errors: list[str],
+        compressed_path: str | None = None,
+    ):
+        self.compressed_data = compressed_data
+        self.path_count = path_count
+        self.filtered_count = filtered_count
+        self.content_digest = content_digest
+        self.errors = errors
+        self.compressed_path = compressed_path
+
+
+class _BuildPlan:
+    """Everything a cache build reads from MO2 before the scan starts; see _plan_build."""
+
+    __slots__ = (
+        "roots",
+        "directory_filters",
+        "configured_workers",
+        "attribute_mods",
+        "record_entry_stats",
+        "record_physical_paths",
+        "memory_budget_mb",
+        "output_path",
+        "load_order_fingerprint",
+        "access",
+        "load_order",
+        "access_source",
+    )
+
+    def __init__(
+        self,
+        roots: list[tuple[mobase.IFileTree, _DirectoryFilter]],
+        directory_filters: dict[str, _DirectoryFilter],
+        configured_workers: int,
+        attribute_mods: bool,
+        record_entry_stats: bool,
+        record_physical_paths: bool,
+        memory_budget_mb: int,
+        output_path: str,
+        load_order_fingerprint: str | None,
+        access: AccessProfile | None,
+        load_order: tuple[str, list[tuple[str, str]]] | None = None,
+        access_source: tuple[str | None, int] | None = None,
+    ):
+        self.roots = roots
+        self.directory_filters = directory_filters
+        self.configured_workers = configured_workers
+        self.attribute_mods = attribute_mods
+        self.record_entry_stats = record_entry_stats
+        self.record_physical_paths = record_physical_paths
+        self.memory_budget_mb = memory_budget_mb
+        self.output_path = output_path
+        self.load_order_fingerprint = load_order_fingerprint
+        self.access = access
+        # Taken by _plan_build and turned into the two above by _read_plan_inputs.
+        self.load_order = load_order
+        self.access_source = access_source
+
+
+def _plan_build(organizer: mobase.IOrganizer, settings_plugin_name: str) -> _BuildPlan:
+    """Read the settings, the load order and the top-level VFS directories from MO2.
+
+    Call it from the GUI thread; the scan itself only touches MO2 per directory. The disk
+    reads the plan needs (mod folder stamps, the lookup trace) wait for the build.
+    """
+    vfs_tree = organizer.virtualFileTree()
+    directory_filters = _get_directory_filters_for_settings(organizer, settings_plugin_name)
+    roots = []
+    for entry in vfs_tree:
+        if entry.isDir():
+            directory_filter = directory_filters.get(entry.name().lower())
+            if directory_filter is not None:
+                roots.append((entry, directory_filter))
+
+    cpu_count = os.cpu_count() or 4
+    return _BuildPlan(
+        roots,
+        directory_filters,
+        max(1, min(int(organizer.pluginSetting(settings_plugin_name, "worker_threads")), cpu_count)),
+        organizer.pluginSetting(settings_plugin_name, "mod_attribution") is not False,
+        bool(organizer.pluginSetting(settings_plugin_name, "entry_stats")),
+        organizer.pluginSetting(settings_plugin_name, "physical_paths") is not False,
+        int(organizer.pluginSetting(settings_plugin_name, "memory_budget_mb") or 0),
+        get_rapid_cache_path(organizer, settings_plugin_name),
+        None,
+        None,
+        # Taken before the scan, so changes made while it runs still read as stale later.
+        _snapshot_load_order(organizer, settings_plugin_name),
+        _get_access_source_for_settings(organizer, settings_plugin_name),
+    )
+
+
+def _read_plan_inputs(plan: _BuildPlan) -> None:
+    """Do the disk reads _plan_build left for the build: stamp the mod folders for the load
+    order fingerprint and read the lookup trace. Needs no MO2 calls, so any thread will do."""
+    if plan.load_order is not None:
+        plan.load_order_fingerprint = _hash_load_order(plan.load_order)
+        plan.load_order = None
+    if plan.access_source is not None:
+        plan.access = _read_access_profile(*plan.access_source)
+        plan.access_source = None
+
+
+def _build_cache_payload(
+    organizer: mobase.IOrganizer,
+    settings_plugin_name: str,
+    on_scan_progress: Callable[[int, int], bool],
+    on_build_progress: Callable[[], bool],
+) -> _CacheBuildResult | None:
+    """Scan the VFS and serialize the compressed cache without touching any UI.
+
+    on_scan_progress(processed_dirs, discovered_dirs) is polled from the calling thread while
+    the workers run and on_build_progress() between serialization steps; either returning
+    True cancels the build and None is returned. Worker errors stop before serialization.
+    """
+    return _build_from_plan(
+        organizer, _plan_build(organizer, settings_plugin_name), on_scan_progress, on_build_progress
+    )
+
+
+def _build_from_plan(
+    organizer: mobase.IOrganizer,
+    plan: _BuildPlan,
+    on_scan_progress: Callable[[int, int], bool],
+    on_build_progress: Callable[[], bool],
+    call_on_gui: Callable[[Callable[[], _T]], _T] | None = None,
+) -> _CacheBuildResult | None:
+    """_build_cache_payload for a plan that is already taken.
+
+    With call_on_gui, every tree listing and findFileInfos call is handed to it, so a build
+    running off the GUI thread still reaches MO2 only from there.
+    """
+    _read_plan_inputs(plan)
+    dir_queue = queue.Queue()
+    for root in plan.roots:
+        dir_queue.put(root)
+    worker_count = min(dir_queue.qsize(), plan.configured_workers)
+    spiller = None
+    if plan.memory_budget_mb > 0:
+        runs_dir = plan.output_path + RUNS_DIR_SUFFIX
+        shutil.rmtree(runs_dir, ignore_errors=True)
+        os.makedirs(runs_dir)
+        budget_bytes = max(plan.memory_budget_mb, MIN_MEMORY_BUDGET_MB) << 20
+        spiller = _RunSpiller(runs_dir, budget_bytes, worker_count)
+    try:
+        return _scan_and_serialize(
+            organizer,
+            dir_queue,
+            worker_count,
+            plan.directory_filters,
+            plan.attribute_mods,
+            plan.record_entry_stats,
+            plan.record_physical_paths,
+            spiller,
+            plan.output_path,
+            plan.load_order_fingerprint,
+            plan.access,
+            on_scan_progress,
+            on_build_progress,
+            call_on_gui,
+        )
+    finally:
+        if spiller is not None:
+            shutil.rmtree(spiller.directory, ignore_errors=True)
+
+
+def _scan_and_serialize(
+    organizer: mobase.IOrganizer,
+    dir_queue: queue.Queue,
+    worker_count: int,
+    directory_filters: dict[str, _DirectoryFilter],
+    attribute_mods: bool,
+    record_entry_stats: bool,
+    record_physical_paths: bool,
+    spiller: _RunSpiller | None,
+    output_path: str,
+    load_order_fingerprint: str,
+    access: AccessProfile | None,
+    on_scan_progress: Callable[[int, int], bool],
+    on_build_progress: Callable[[], bool],
+    call_on_gui: Callable[[Callable[[], _T]], _T] | None = None,
+) -> _CacheBuildResult | None:
+    """The body of _build_from_plan; with a spiller, records stream through sorted runs.
+
+    With an access profile, records are ordered by lookup count (in-memory builds) and the
+    most looked-up ones are written to a hot set section.
+    """
+    accumulators: list[_PathAccumulator] = []
+    filter_counter: Counter[str] = Counter()
+    mod_contributions: dict[str, ModContribution] = {}
+    lock = threading.Lock()
+    errors = []
+    error_lock = threading.Lock()
+    progress_lock = threading.Lock()
+    cancel_event = threading.Event()
+
+    discovered_dirs = dir_queue.qsize()
+    processed_dirs = 0
+
+    resolve_entries = attribute_mods or record_entry_stats or record_physical_paths
+
+    def list_directory(node, directory_filter):
+        """Every MO2 call one directory needs: its children, and the winning origins of its kept files."""
+        subdirectories = []
+        kept: list[tuple[str, str, str]] = []
+        filtered: Counter[str] = Counter()
+        for entry in node:
+            if cancel_event.is_set():
+                break
+            if entry.isDir():
+                subdirectories.append(entry)
+            else:
+                entry_path = entry.path('\\')
+                name = entry.name()
+                dot = name.rfind(".")
+                ext = name[dot:].lower() if dot > 0 else ""
+                rejected_by = directory_filter.rejection(entry_path, name, ext)
+                if rejected_by is None:
+                    kept.append((entry_path, name, ext))
+                else:
+                    filtered[rejected_by] += 1
+        winners = _winning_origins(organizer, node.path('\\')) if kept and resolve_entries else {}
+        return subdirectories, kept, filtered, winners
+
+    def worker():
+        nonlocal discovered_dirs, processed_dirs
+        accumulator = _PathAccumulator()
+        local_filtered: Counter[str] = Counter()
+        # Attribution is counted per (origin, extension) and folded into ModContributions at the end.
+        local_origin_exts: Counter[tuple[str, str]] = Counter()
+        local_origin_bytes: Counter[str] = Counter()
+        # A mod's loose files all sit under one folder, so its root is derived once per origin.
+        mod_roots: dict[str, str] = {}
+        while True:
+            try:
+                item = dir_queue.get(timeout=0.1)
+            except queue.Empty:
+                if cancel_event.is_set():
+                    break
+                continue
+            try:
+                if item is None:
+                    break
+                if cancel_event.is_set():
+                    continue
+                node, directory_filter = item
+                with progress_lock:
+                    processed_dirs += 1
+                if call_on_gui is None:
+                    subdirectories, kept, filtered, winners = list_directory(node, directory_filter)
+                else:
+                    subdirectories, kept, filtered, winners = call_on_gui(
+                        lambda: list_directory(node, directory_filter)
+                    )
+                for subdirectory in subdirectories:
+                    dir_queue.put((subdirectory, directory_filter))
+                with progress_lock:
+                    discovered_dirs += len(subdirectories)
+                local_filtered.update(filtered)
+                if not kept:
+                    continue
+                if resolve_entries:
+                    resolved = _resolve_directory_entries(winners, [name for _, name, _ in kept], record_entry_stats)
+                else:
+                    resolved = [(UNKNOWN_ORIGIN, "", 0, 0)] * len(kept)
+                attributed = []
+                for (entry_path, _name, ext), (origin, physical, size, mtime) in zip(kept, resolved):
+                    mod_root = ""
+                    if record_physical_paths and physical:
+                        mod_root = mod_roots.get(origin, "")
+                        if len(physical) != len(mod_root) + len(entry_path) + 1:
+                            mod_root = _mod_root_of(physical, entry_path)
+                            if mod_root:
+                                mod_roots[origin] = mod_root
+                    if not accumulator.add(entry_path, ext, directory_filter.directory, size, mtime, mod_root):
+                        continue
+                    if attribute_mods:
+                        attributed.append((origin, ext or "(no ext)"))
+                        if size:
+                            local_origin_bytes[origin] += size
+                local_origin_exts.update(attributed)
+                if spiller is not None and accumulator.footprint() >= spiller.threshold:
+                    spiller.flush(accumulator)
+            except Exception as e:
+                error_message = f"Worker failed while indexing VFS node: {e!r}"
+                print(f"RAPID worker error while indexing VFS: {e!r}")
+                with error_lock:
+                    errors.append(error_message)
+            finally:
+                dir_queue.task_done()
+        if spiller is not None and not cancel_event.is_set():
+            try:
+                spiller.flush(accumulator)
+            except Exception as e:
+                print(f"RAPID worker error while spilling records: {e!r}")
+                with error_lock:
+                    errors.append(f"Worker failed while spilling records: {e!r}")
+        with lock:
+            accumulators.append(accumulator)
+            filter_counter.update(local_filtered)
+            for (mod_name, ext), count in local_origin_exts.items():
+                contribution = mod_contributions.get(mod_name)
+                if contribution is None:
+                    contribution = mod_contributions[mod_name] = ModContribution()
+                contribution.entries += count
+                contribution.ext_counter[ext] += count
+            for mod_name, size in local_origin_bytes.items():
+                mod_contributions[mod_name].bytes += size
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(worker_count)]
+    for t in threads:
+        t.start()
+
+    last_update = 0.0
+    while True:
+        now = time.monotonic()
+        if now - last_update >= 0.05:
+            with progress_lock:
+                current_processed = processed_dirs
+                current_discovered = discovered_dirs
+            if on_scan_progress(current_processed, current_discovered):
+                cancel_event.set()
+            last_update = now
+
+        if dir_queue.unfinished_tasks == 0:
+            break
+
+        if cancel_event.wait(0.01):
+            continue
+
+    for _ in range(worker_count):
+        dir_queue.put(None)
+    for t in threads:
+        t.join()
+
+    if cancel_event.is_set():
+        print("RAPID indexing canceled by user; launching without RAPID cache.")
+        return None
+
+    if on_build_progress():
+        print("RAPID cache build canceled by user; launching without RAPID cache.")
+        return None
+
+    filtered_count = sum(filter_counter.values())
+    if errors:
+        return _CacheBuildResult(b"", 0, filtered_count, None, errors)
+
+    ext_counter: Counter[str] = Counter()
+    root_counter: Counter[str] = Counter()
+    for accumulator in accumulators:
+        ext_counter.update(accumulator.ext_counter)
+        root_counter.update(accumulator.root_counter)
+    path_count = sum(len(accumulator) for accumulator in accumulators)
+
+    build_time_ms = int(time.time() * 1000)
+    metadata_payload = _serialize_metadata(
+        build_time_ms, ext_counter, root_counter, filter_counter, mod_contributions, load_order_fingerprint
+    )
+
+    if spiller is not None:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        writer = _CompressedCacheWriter(_temp_path_beside(output_path))
+        try:
+            path_count = spiller.merge_into(
+                writer, metadata_payload, record_entry_stats, record_physical_paths, on_build_progress, access
+            )
+            if path_count is None:
+                writer.abort()
+                print("RAPID cache build canceled by user; launching without RAPID cache.")
+                return None
+            content_digest = writer.finish(metadata_payload)
+        except BaseException:
+            writer.abort()
+            raise
+        _report_access_ordering(access)
+        return _CacheBuildResult(b"", path_count, filtered_count, content_digest, [], compressed_path=writer.path)
+
+    hot_records = 0
+    if access is not None:
+        accumulators = [_order_by_access(accumulators, access)]
+        hot_records = access.hot_records
+    serialized = _serialize_in_memory(
+        accumulators, metadata_payload, record_entry_stats, record_physical_paths, on_build_progress, hot_records
+    )
+    if serialized is None:
+        print("RAPID cache build canceled by user; launching without RAPID cache.")
+        return None
+    _report_access_ordering(access)
+    compressed_data, content_digest = serialized
+    return _CacheBuildResult(compressed_data, path_count, filtered_count, content_digest, [])
+
+
+def _report_access_ordering(access: AccessProfile | None) -> None:
+    if access is None:
+        return
+    print(
+        f"RAPID access ordering: {len(access.counts):,} traced paths, hot set of {access.hot_records:,} "
+        f"records answers {access.coverage():.1%} of the {access.lookups:,} traced lookups."
+    )
+
+
+def _write_cache_file(output_path: str, result: _CacheBuildResult, attempts: int = 1) -> None:
+    """Write beside output_path and swap it in.
+
+    Bounded-memory builds have already streamed the cache to result.compressed_path. The
+    old file may be a hard link into the cache store, or open in a running game, which on
+    Windows makes the swap fail until it is closed; attempts retries for that case.
+    """
+    tmp_path = result.compressed_path
+    try:
+        if tmp_path is None:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            tmp_path = _temp_path_beside(output_path)
+            with open(tmp_path, "wb") as f:
+                f.write(result.compressed_data)
+        for attempt in range(attempts):
+            try:
+                os.replace(tmp_path, output_path)
+                return
+            except PermissionError:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(CACHE_REPLACE_RETRY_SECONDS)
+    except BaseException:
+        if tmp_path is not None:
+            _remove_quietly(tmp_path)
+        raise
+
+
+def _store_built_cache(
+    cache_store: "RapidCacheStore | None", fingerprint: str | None, output_path: str, result: _CacheBuildResult
+) -> None:
+    if cache_store is None or fingerprint is None:
+        return
+    try:
+        cache_store.put(fingerprint, output_path, result.content_digest)
+    except OSError as e:
+        print(f"RAPID cache store: failed to store cache: {e!r}")
+
+
+class _SamplingProfiler:
+    """Samples the Python stack of every thread at a fixed interval while a cache build runs.
+
+    Sampling through sys._current_frames sees the worker threads on every Python version
+    (cProfile is per thread, and exclusive on 3.12+) and leaves the hot loops unslowed.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter[tuple] = Counter()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "_SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="RAPID profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                codes.append("main" if ident == main else "worker")
+                self.stacks[tuple(reversed(codes))] += 1
+            self.ticks += 1
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def report(self, cache_path: str, top_n: int = PROFILE_TOP_N) -> None:
+        """Write folded stacks next to the cache and print the top hotspots to MO2's log."""
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        lines = []
+        for stack, count in self.stacks.items():
+            labels = [stack[0]] + [self._label(code) for code in stack[1:]]
+            lines.append(f"{';'.join(labels)} {count}")
+            if len(labels) > 1:
+                own[labels[-1]] += count
+            for label in set(labels[1:]):
+                total[label] += count
+        samples = sum(self.stacks.values())
+        profile_path = cache_path + PROFILE_SUFFIX
+        try:
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            with open(profile_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(sorted(lines)))
+                f.write("\n")
+        except OSError as e:
+            print(f"RAPID build profile: failed to write {profile_path}: {e!r}")
+            profile_path = "(not written)"
+        print(
+            f"RAPID build profile: {self.elapsed:.2f} s, {self.ticks:,} ticks, {samples:,} thread samples; "
+            f"folded stacks in {profile_path}"
+        )
+        print(f"RAPID build profile: top {top_n} functions by own samples (own% / total% of thread samples)")
+        for label, count in own.most_common(top_n):
+            print(f"  {100 * count / samples:5.1f}% {100 * total[label] / samples:5.1f}%  {label}")
+
+
+_T = TypeVar("_T")
+
+
+def _profile_build(organizer: mobase.IOrganizer, settings_plugin_name: str, build: Callable[[], _T]) -> _T:
+    """Run build() under the sampling profiler when profile_builds is on; a plain call otherwise."""
+    return _run_profiled(
+        bool(organizer.pluginSetting(settings_plugin_name, "profile_builds")),
+        get_rapid_cache_path(organizer, settings_plugin_name),
+        build,
+    )
+
+
+def _run_profiled(enabled: bool, output_path: str, build: Callable[[], _T]) -> _T:
+    """_profile_build with the setting and the cache path (the report goes beside it) already read."""
+    if not enabled:
+        return build()
+    profiler = _SamplingProfiler()
+    try:
+        with profiler:
+            return build()
+    finally:
+        profiler.report(output_path)
+
+
+def _existing_cache_verified(organizer: mobase.IOrganizer, settings_plugin_name: str) -> bool:
+    """Run the sampled staleness check on the current cache; True when it can be launched as-is."""
+    sample_size = organizer.pluginSetting(settings_plugin_name, "sample_directories")
+    min_confidence = organizer.pluginSetting(settings_plugin_name, "sample_min_confidence")
+    try:
+        report = verify_cache_sample(
+            organizer,
+            settings_plugin_name,
+            get_rapid_cache_path(organizer, settings_plugin_name),
+            int(sample_size if sample_size is not None else DEFAULT_SAMPLE_DIRECTORIES),
+            int(min_confidence if min_confidence is not None else DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT) / 100,
+        )
+    except Exception as e:
+        print(f"RAPID sampled check failed, rebuilding: {e!r}")
+        return False
+    print(report.summary())
+    for difference in report.differences[:10]:
+        print(f"  {difference}")
+    return report.current
+
+
+def start_revalidation(
+    organizer: mobase.IOrganizer,
+    settings_plugin_name: str,
+    call_on_gui: Callable[[Callable[[], _T]], _T],
+) -> threading.Thread:
+    """Start rebuilding the cache in the background; call it from the GUI thread.
+
+    Only MO2 is read here: the settings, the load order and the top of the VFS tree. The
+    thread stamps the mod folders, reads the lookup trace and opens the cache store itself,
+    and reaches MO2 only through call_on_gui, which must run each call on the GUI thread so
+    the scan never races MO2's own directory refresh.
+    """
+    plan = _plan_build(organizer, settings_plugin_name)
+    store_location = _get_cache_store_location(organizer, settings_plugin_name)
+    profile = bool(organizer.pluginSetting(settings_plugin_name, "profile_builds"))
+    thread = threading.Thread(
+        target=_revalidate_cache,
+        args=(organizer, plan, store_location, profile, call_on_gui),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def _revalidate_cache(
+    organizer: mobase.IOrganizer,
+    plan: _BuildPlan,
+    store_location: tuple[str, int] | None,
+    profile: bool,
+    call_on_gui: Callable[[Callable[[], _T]], _T],
+) -> None:
+    """Rebuild the cache off the UI thread and swap it in for the next launch.
+
+    Logs how stale the cache used for the current launch was (paths added and removed).
+    """
+    _run_profiled(
+        profile,
+        plan.output_path,
+        lambda: _rebuild_and_compare(organizer, plan, store_location, call_on_gui),
+    )
+
+
+def _rebuild_and_compare(
+    organizer: mobase.IOrganizer,
+    plan: _BuildPlan,
+    store_location: tuple[str, int] | None,
+    call_on_gui: Callable[[Callable[[], _T]], _T],
+) -> None:
+    output_path = plan.output_path
+    t0 = time.monotonic()
+    try:
+        cache_store = None if store_location is None else RapidCacheStore(*store_location)
+        previous = read_cache_stats(output_path)
+        previous_paths = set(previous[0]) if previous is not None else set()
+        result = _build_from_plan(organizer, plan, lambda _p, _d: False, lambda: False, call_on_gui)
+        if result is None:
+            return
+        if result.errors:
+            print(
+                f"RAPID background rebuild failed with {len(result.errors)} error(s); "
+                "keeping the cache used at launch."
+            )
+            for error in result.errors[:5]:
+                print(f"  {error}")
+            return
+        try:
+            _write_cache_file(output_path, result, attempts=CACHE_REPLACE_ATTEMPTS)
+        except PermissionError:
+            print(
+                f"RAPID background rebuild: {output_path!r} was still in use after "
+                f"{CACHE_REPLACE_ATTEMPTS * CACHE_REPLACE_RETRY_SECONDS:.0f} s; keeping the cache used at launch."
+            )
+            return
+        _store_built_cache(cache_store, plan.load_order_fingerprint, output_path, result)
+        refreshed = read_cache_stats(output_path)
+        current_paths = set(refreshed[0]) if refreshed is not None else set()
+    except Exception as e:
+        print(f"RAPID background rebuild failed: {e!r}")
+        return
+
+    added = sorted(current_paths - previous_paths)
+    removed = sorted(previous_paths - current_paths)
+    elapsed = time.monotonic() - t0
+    if not added and not removed:
+        print(f"RAPID background rebuild finished in {elapsed:.1f} s; the cache used at launch was current.")
+        return
+    print(
+        f"RAPID background rebuild finished in {elapsed:.1f} s; the cache used at launch was stale: "
+        f"{len(added):,} path(s) added, {len(removed):,} removed. The refreshed cache applies next launch."
+    )
+    for path in added[:10]:
+        print(f"  + {path}")
+    for path in removed[:10]:
+        print(f"  - {path}")
+
+
+class StalenessReport:
+    """Outcome of a sampled staleness check; see verify_cache_sample."""
+
+    def __init__(
+        self,
+        current: bool,
+        confidence: float,
+        reason: str,
+        sampled_directories: int = 0,
+        total_directories: int = 0,
+        differences: list[str] | None = None,
+    ):
+        self.current = current
+        self.confidence = confidence
+        self.reason = reason
+        self.sampled_directories = sampled_directories
+        self.total_directories = total_directories
+        self.differences = differences or []
+        self.elapsed_ms = 0.0
+
+    def summary(self) -> str:
+        verdict = "current" if self.current else "stale"
+        checked = ""
+        if self.total_directories:
+            checked = f", {self.sampled_directories:,} of {self.total_directories:,} directories checked"
+        return (
+            f"RAPID sampled check: cache looks {verdict} ({self.reason}; confidence {self.confidence:.1%}"
+            f"{checked} in {self.elapsed_ms:.0f} ms)."
+        )
+
+
+def _sample_confidence(draws_per_share: float) -> float:
+    """Confidence that under STALENESS_TOLERANCE of the cached files sit in changed directories.
+
+    An engine directory holding share w of the cached files gets n draws weighted by file
+    count, so a change touching p of its files survives them with probability at most
+    (1 - p) ** n <= exp(-n * p). Summed over engine directories that stays below
+    exp(-STALENESS_TOLERANCE * min(n / w)); directories checked in full never miss.
+    """
+    if draws_per_share == math.inf:
+        return 1.0
+    return 1.0 - math.exp(-STALENESS_TOLERANCE * draws_per_share)
+
+
+def _stratified_directory_sample(
+    directories: dict[str, set[str]],
+    root_counter: Counter[str],
+    sample_size: int,
+    rng: random.Random,
+) -> tuple[list[str], float]:
+    """Pick about sample_size cached directories, split across engine directories by their
+    file counts (root_counter) and weighted by file count within each one.
+
+    Shares are rounded up, so no engine directory gets fewer draws than its file count calls
+    for. Returns the sample and the fewest draws per share of the cached files among the
+    engine directories not checked in full (inf when every one was); see _sample_confidence.
+    """
+    strata: dict[str, list[str]] = {}
+    for directory in directories:
+        strata.setdefault(directory.split("\\", 1)[0], []).append(directory)
+    total = sum(root_counter.get(stratum, 0) for stratum in strata) or 1
+    sample: list[str] = []
+    draws_per_share = math.inf
+    for stratum, members in strata.items():
+        weight = root_counter.get(stratum, 0) / total
+        share = max(1, math.ceil(sample_size * weight))
+        if share >= len(members):
+            sample.extend(members)
+            continue
+        if weight > 0:
+            draws_per_share = min(draws_per_share, share / weight)
+        # Weighted sampling without replacement: the share largest of u ** (1 / weight).
+        sample.extend(
+            heapq.nlargest(share, members, key=lambda d: rng.random() ** (1.0 / len(directories[d])))
+        )
+    return sample, draws_per_share
+
+
+def _verify_sample(
+    vfs_tree,
+    directory_filters: dict[str, _DirectoryFilter],
+    paths: list[str],
+    root_counter: Counter[str],
+    sample_size: int,
+    rng: random.Random,
+) -> StalenessReport:
+    """Compare a stratified sample of the cached directories with the live VFS tree.
+
+    A sampled directory differs when files were added or removed or when it is gone. Its
+    ancestors are compared the same way, and any of them differs when it gained a subdirectory
+    the cache has never seen that holds files the rules keep, directly or up to
+    NEW_DIRECTORY_SEARCH_DEPTH levels down. Engine directories that now hold kept files but
+    have no cached entries are checked as well.
+    """
+    directories: dict[str, set[str]] = {}
+    for path in paths:
+        directory, _, name = path[len(DATA_PREFIX) :].rpartition("\\")
+        if directory:
+            names = directories.get(directory)
+            if names is None:
+                names = directories[directory] = set()
+            names.add(name)
+    known = set()
+    for directory in directories:
+        while directory and directory not in known:
+            known.add(directory)
+            directory = directory.rpartition("\\")[0]
+
+    children_by_directory: dict[str, dict[str, object]] = {}
+
+    def children(directory: str):
+        listing = children_by_directory.get(directory)
+        if listing is not None:
+            return listing
+        if not directory:
+            node = vfs_tree
+        else:
+            parent, _, name = directory.rpartition("\\")
+            node = children(parent).get(name) if children(parent) is not None else None
+            if node is None or not node.isDir():
+                children_by_directory[directory] = None
+                return None
+        listing = children_by_directory[directory] = {entry.name().lower(): entry for entry in node}
+        return listing
+
+    def kept_files(directory: str, listing: dict[str, object]) -> set[str]:
+        directory_filter = directory_filters[directory.split("\\", 1)[0]]
+        kept = set()
+        for name, entry in listing.items():
+            if entry.isDir():
+                continue
+            dot = name.rfind(".")
+            ext = name[dot:] if dot > 0 else ""
+            if directory_filter.rejection(entry.path("\\"), name, ext) is None:
+                kept.add(name)
+        return kept
+
+    def has_kept_files(directory: str, depth: int) -> bool:
+        listing = children(directory)
+        if listing is None:
+            return False
+        if kept_files(directory, listing):
+            return True
+        return depth > 0 and any(
+            entry.isDir() and has_kept_files(f"{directory}\\{name}", depth - 1) for name, entry in listing.items()
+        )
+
+    differences: list[str] = []
+    top = children("") or {}
+    for name, entry in top.items():
+        if (
+            entry.isDir()
+            and name in directory_filters
+            and name not in known
+            and has_kept_files(name, NEW_DIRECTORY_SEARCH_DEPTH)
+        ):
+            differences.append(f"{name}: new engine directory")
+
+    sample, draws_per_share = _stratified_directory_sample(directories, root_counter, sample_size, rng)
+    listed_subdirectories: set[str] = set()
+    for directory in sample:
+        if directory.split("\\", 1)[0] not in directory_filters:
+            differences.append(f"{directory}: no longer indexed by the directory rules")
+            continue
+        listing = children(directory)
+        if listing is None:
+            differences.append(f"{directory}: directory removed")
+            continue
+        parent = directory
+        while parent and parent not in listed_subdirectories:
+            listed_subdirectories.add(parent)
+            parent_listing = children(parent) or {}
+            # Ancestors with no cached files of their own must still hold no kept files.
+            current = kept_files(parent, parent_listing)
+            cached = directories.get(parent, set())
+            if current != cached:
+                differences.append(
+                    f"{parent}: {len(current - cached):,} file(s) added, {len(cached - current):,} removed"
+                )
+            for name, entry in parent_listing.items():
+                subdirectory = f"{parent}\\{name}"
+                if (
+                    entry.isDir()
+                    and subdirectory not in known
+                    and has_kept_files(subdirectory, NEW_DIRECTORY_SEARCH_DEPTH)
+                ):
+                    differences.append(f"{subdirectory}: new directory")
+            parent = parent.rpartition("\\")[0]
+
+    if differences:
+        return StalenessReport(False, 0.0, f"{len(differences)} difference(s)", len(sample), len(directories), differences)
+    confidence = _sample_confidence(draws_per_share)
+    return StalenessReport(True, confidence, "no differences in the sample", len(sample), len(directories))
+
+
+def verify_cache_sample(
+    organizer: mobase.IOrganizer,
+    settings_plugin_name: str,
+    cache_path: str,
+    sample_size: int = DEFAULT_SAMPLE_DIRECTORIES,
+    min_confidence: float = DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT / 100,
+    rng: random.Random | None = None,
+) -> StalenessReport:
+    """Check whether cache_path still matches the VFS without rebuilding it.
+
+    The load-order fingerprint recorded at build time must match the current mod list and
+    filter settings; then a stratified sample of cached directories is compared with the
+    VFS tree. The report is current only when nothing differs and its confidence reaches
+    min_confidence.
+    """
+    t0 = time.perf_counter()
+    report = _verify_cache_sample(organizer, settings_plugin_name, cache_path, sample_size, rng)
+    if report.current and report.confidence < min_confidence:
+        report.current = False
+        report.reason = f"no differences, but confidence is below {min_confidence:.0%}"
+    report.elapsed_ms = (time.perf_counter() - t0) * 1000
+    return report
+
+
+def _verify_cache_sample(
+    organizer: mobase.IOrganizer,
+    settings_plugin_name: str,
+    cache_path: str,
+    sample_size: int,
+    rng: random.Random | None,
+) -> StalenessReport:
+    read = _read_cache_paths(cache_path, (SECTION_METADATA,))
+    if read is None:
+        return StalenessReport(False, 0.0, "no readable cache")
+    paths, sections = read
+    parsed = _parse_metadata(sections[SECTION_METADATA]) if SECTION_METADATA in sections else None
+    if parsed is None or not parsed[5]:
+        return StalenessReport(False, 0.0, "the cache records no load-order fingerprint")
+    root_counter, recorded_fingerprint = parsed[2], parsed[5]
+    if recorded_fingerprint != compute_load_order_fingerprint(organizer, settings_plugin_name):
+        return StalenessReport(False, 0.0, "the mod list or filter settings changed")
+    if _root_counter_has_invalid_metadata(root_counter, len(paths)):
+        _, root_counter = _compute_path_counters(paths)
+    return _verify_sample(
+        organizer.virtualFileTree(),
+        _get_directory_filters_for_settings(organizer, settings_plugin_name),
+        paths,
+        root_counter,
+        sample_size,
+        rng or random.Random(),
+    )
+
+
+class SharedCacheHandoff:
+    """Publishes the uncompressed cache in a named shared-memory segment while the game runs.
+
+    Experimental: a loader could map the segment instead of reading and inflating the cache
+    file, which is still written as the fallback, but the SKSE loader does not read it yet. The segment starts with SHARED_CACHE_HEADER, whose magic
+    is written last so a reader never takes a half-filled segment for a valid one; the
+    cache file's size and mtime let a reader check the segment against the file it would
+    otherwise load. The segment is released when the game exits, after timeout_s, or when
+    the next cache is published.
+    """
+
+    def __init__(self, name: str = SHARED_CACHE_NAME):
+        self.name = name
+        self._segment: shared_memory.SharedMemory | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def publish(self, cache_path: str, timeout_s: float) -> bool:
+        payload_length = _cache_uncompressed_size(cache_path)
+        if payload_length is None:
+            print(f"RAPID shared cache: {cache_path!r} is not a current cache; not publishing.")
+            return False
+        stat = os.stat(cache_path)
+        with self._lock:
+            self._release_locked()
+            segment = self._create(SHARED_CACHE_HEADER.size + payload_length)
+            try:
+                self._fill(segment, cache_path, payload_length)
+            except (OSError, ValueError, zlib.error) as e:
+                print(f"RAPID shared cache: failed to publish {cache_path!r}: {e!r}")
+                self._close(segment)
+                return False
+            SHARED_CACHE_HEADER.pack_into(
+                segment.buf, 0, bytes(4), SHARED_CACHE_VERSION, stat.st_size, stat.st_mtime_ns, payload_length
+            )
+            segment.buf[:4] = SHARED_CACHE_MAGIC
+            self._segment = segment
+            if timeout_s > 0:
+                self._timer = threading.Timer(timeout_s, self.release)
+                self._timer.daemon = True
+                self._timer.start()
+        print(f"RAPID shared cache: published {payload_length:,} bytes as {self.name!r}.")
+        return True
+
+    def _create(self, size: int) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(self.name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by an MO2 that did not shut down cleanly (POSIX only).
+            stale = shared_memory.SharedMemory(self.name)
+            stale.close()
+            stale.unlink()
+            return shared_memory.SharedMemory(self.name, create=True, size=size)
+
+    @staticmethod
+    def _fill(segment: shared_memory.SharedMemory, cache_path: str, payload_length: int) -> None:
+        offset = SHARED_CACHE_HEADER.size
+        end = offset + payload_length
+        for data in _iter_uncompressed_cache(cache_path):
+            if offset + len(data) > end:
+                raise ValueError("cache inflates past its section directory")
+            segment.buf[offset : offset + len(data)] = data
+            offset += len(data)
+        if offset != end:
+            raise ValueError(f"cache inflated to {offset - SHARED_CACHE_HEADER.size} bytes, expected {payload_length}")
+
+    def release(self) -> None:
+        with self._lock:
+            self._release_locked()
+
+    def _release_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._segment is not None:
+            self._close(self._segment)
+            self._segment = None
+            print("RAPID shared cache: released.")
+
+    @staticmethod
+    def _close(segment: shared_memory.SharedMemory) -> None:
+        segment.buf[:4] = bytes(4)
+        segment.close()
+        try:
+            segment.unlink()  # No-op on Windows, where the last handle frees the mapping.
+        except FileNotFoundError:
+            pass
+
+
+def _trigram_codes(text: bytes) -> set[int]:
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(text, text[1:], text[2:]))}
+
+
+def _literal_runs(glob: str) -> list[str]:
+    """Literal fragments of a glob that every match must contain."""
+    return [run for run in re.split(r"\*|\?|\[[^\]]*\]", glob) if run]
+
+
+class PathSearchIndex:
+    """Trigram index over cache paths in fixed-size blocks, plus a sorted hash table.
+
+    A query intersects the posting lists of its trigrams to pick candidate blocks and only
+    verifies paths inside them. The index is persisted next to the cache and keyed by the
+    cache file's digest, so later opens skip the build.
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        digest: bytes,
+        sorted_hashes: array,
+        hash_ids: array,
+        postings: dict[int, array] | None,
+    ):
+        self.paths = paths
+        self.digest = digest
+        self.sorted_hashes = sorted_hashes
+        self.hash_ids = hash_ids
+        self.postings = postings
+        self.block_count = (len(paths) + SEARCH_BLOCK_SIZE - 1) // SEARCH_BLOCK_SIZE
+
+    @classmethod
+    def unindexed(cls, paths: list[str]) -> "PathSearchIndex":
+        """Full-scan stand-in used while the real index is still building; no hash lookups."""
+        return cls(paths, b"", array("Q"), array("I"), None)
+
+    @classmethod
+    def build(cls, paths: list[str], records: bytes, digest: bytes) -> "PathSearchIndex":
+        hashes = _read_record_hashes(records, len(paths))
+        if hashes is None:
+            hashes = array("Q", (_compute_rapid_hash64(path) for path in paths))
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        sorted_hashes = array("Q", (hashes[i] for i in order))
+        hash_ids = array("I", order)
+        postings: dict[int, array] = {}
+        for block in range((len(paths) + SEARCH_BLOCK_SIZE - 1) // SEARCH_BLOCK_SIZE):
+            start = block * SEARCH_BLOCK_SIZE
+            text = "\n".join(paths[start : start + SEARCH_BLOCK_SIZE]).encode("utf-8")
+            for code in _trigram_codes(text):
+                posting = postings.get(code)
+                if posting is None:
+                    posting = postings[code] = array("I")
+                posting.append(block)
+        return cls(paths, digest, sorted_hashes, hash_ids, postings)
+
+    @classmethod
+    def load_or_build(cls, cache_path: str, paths: list[str]) -> "PathSearchIndex":
+        with open(cache_path, "rb") as f:
+            compressed = f.read()
+        digest = hashlib.sha256(compressed).digest()
+        index_path = cache_path + SEARCH_INDEX_SUFFIX
+        index = cls._load(index_path, paths, digest)
+        if index is not None:
+            return index
+        read = _read_cache_sections(cache_path, frozenset((SECTION_PATHS,)))
+        records = read[1].get(SECTION_PATHS, b"") if read is not None else b""
+        index = cls.build(paths, records, digest)
+        try:
+            index._save(index_path)
+        except OSError as e:
+            print(f"RAPID: failed to persist search index {index_path!r}: {e!r}")
+        return index
+
+    @classmethod
+    def _load(cls, index_path: str, paths: list[str], digest: bytes) -> "PathSearchIndex | None":
+        try:
+            with open(index_path, "rb") as f:
+                raw = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        header_size = 4 + 4 + 32 + 4 + 4 + 4
+        if len(raw) < header_size or raw[:4] != SEARCH_INDEX_MAGIC:
+            return None
+        version, = struct.unpack_from("<I", raw, 4)
+        stored_digest = raw[8:40]
+        path_count, block_size, num_trigrams = struct.unpack_from("<III", raw, 40)
+        if (
+            version != SEARCH_INDEX_VERSION
+            or stored_digest != digest
+            or path_count != len(paths)
+            or block_size != SEARCH_BLOCK_SIZE
+        ):
+            return None
+        offset = header_size
+        try:
+            sorted_hashes = _array_from(raw, "Q", offset, path_count)
+            offset += 8 * path_count
+            hash_ids = _array_from(raw, "I", offset, path_count)
+            offset += 4 * path_count
+            directory = _array_from(raw, "I", offset, 2 * num_trigrams)
+            offset += 8 * num_trigrams
+            postings: dict[int, array] = {}
+            for i in range(num_trigrams):
+                code, length = directory[2 * i], directory[2 * i + 1]
+                postings[code] = _array_from(raw, "I", offset, length)
+                offset += 4 * length
+        except ValueError:
+            return None
+        return cls(paths, digest, sorted_hashes, hash_ids, postings)
+
+    def _save(self, index_path: str) -> None:
+        directory = array("I")
+        for code, posting in self.postings.items():
+            directory.append(code)
+            directory.append(len(posting))
+        parts = [
+            SEARCH_INDEX_MAGIC,
+            PACK_U32.pack(SEARCH_INDEX_VERSION),
+            self.digest,
+            struct.pack("<III", len(self.paths), SEARCH_BLOCK_SIZE, len(self.postings)),
+            _array_bytes(self.sorted_hashes),
+            _array_bytes(self.hash_ids),
+            _array_bytes(directory),
+        ]
+        parts.extend(_array_bytes(posting) for posting in self.postings.values())
+        tmp_path = _temp_path_beside(index_path)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(b"".join(parts), 1))
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+    def _candidate_blocks(self, literals: list[str]) -> Iterator[int]:
+        if self.postings is None:
+            return iter(range(self.block_count))
+        codes: set[int] = set()
+        for literal in literals:
+            codes |= _trigram_codes(literal.encode("utf-8"))
+        if not codes:
+            return iter(range(self.block_count))
+        postings = sorted((self.postings.get(code, ()) for code in codes), key=len)
+        blocks = set(postings[0])
+        for posting in postings[1:]:
+            if not blocks:
+                break
+            blocks.intersection_update(posting)
+        return iter(sorted(blocks))
+
+    def _scan(self, literals: list[str], matches: Callable[[str], bool]) -> list[int]:
+        paths = self.paths
+        results: list[int] = []
+        for block in self._candidate_blocks(literals):
+            start = block * SEARCH_BLOCK_SIZE
+            for path_id in range(start, min(start + SEARCH_BLOCK_SIZE, len(paths))):
+                if matches(paths[path_id]):
+                    results.append(path_id)
+        return results
+
+    def find_substring(self, query: str) -> list[int]:
+        needle = query.strip().replace("/", "\\").lower()
+        if not needle:
+            return []
+        return self._scan([needle], lambda path: needle in path)
+
+    def find_glob(self, query: str) -> list[int]:
+        """Match a glob against whole paths; globs not starting with '*' are relative to data\\."""
+        pattern = query.strip().replace("/", "\\").lower()
+        if not pattern:
+            return []
+        if not pattern.startswith("*") and not pattern.startswith(DATA_PREFIX):
+            pattern = DATA_PREFIX + pattern.lstrip("\\")
+        regex = re.compile(fnmatch.translate(pattern))
+        return self._scan(_literal_runs(pattern), lambda path: regex.match(path) is not None)
+
+    def find_hash(self, value: int) -> list[int]:
+        lo = bisect.bisect_left(self.sorted_hashes, value)
+        hi = bisect.bisect_right(self.sorted_hashes, value)
+        return sorted(self.hash_ids[lo:hi])
+
+    def search(self, query: str, mode: str = "auto") -> list[int]:
+        """Run a "substring", "glob", "hash" or "auto" query and return matching path ids."""
+        text = query.strip()
+        if mode == "auto":
+            if _parse_hash_query(text) is not None:
+                mode = "hash"
+            elif any(c in text for c in "*?["):
+                mode = "glob"
+            else:
+                mode = "substring"
+        if mode == "hash":
+            value = _parse_hash_query(text)
+            return self.find_hash(value) if value is not None else []
+        if mode == "glob":
+            return self.find_glob(text)
+        return self.find_substring(text)
+
+
+def _parse_hash_query(text: str) -> int | None:
+    text = text.lower()
+    if re.fullmatch(r"0x[0-9a-f]{1,16}", text):
+        return int(text, 16)
+    if re.fullmatch(r"[0-9a-f]{16}", text):
+        return int(text, 16)
+    return None
@@ -0,0 +1,404 @@
+"""The plugin shells MO2 instantiates at startup.
+
+Everything heavier (the cache format, the build engine and the Qt dialogs) is imported on
+first use: when a launch hook fires or a tool is opened.
+"""
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import mobase
+
+from .defaults import (
+    DEFAULT_CACHE_STORE_BUDGET_MB,
+    DEFAULT_DIRECTORY_RULES,
+    DEFAULT_HOT_SET_SIZE,
+    DEFAULT_SAMPLE_DIRECTORIES,
+    DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT,
+    DEFAULT_SHARED_CACHE_TIMEOUT_S,
+    EXCLUDED_EXTENSIONS,
+    HOOK_PLUGIN_NAME,
+    MIN_MEMORY_BUDGET_MB,
+    SHARED_CACHE_NAME,
+    STALENESS_TOLERANCE,
+)
+
+if TYPE_CHECKING:
+    from PyQt6.QtGui import QIcon
+
+    from .ui import GuiThreadCaller
+
+
+class PreLaunchGameHook(mobase.IPlugin):
+    def __init__(self):
+        super().__init__()
+        self._organizer = None
+        self._revalidate_thread: threading.Thread | None = None
+        self._gui_thread_caller: "GuiThreadCaller | None" = None
+        self._pending_launch: dict | None = None
+        self._shared_cache = None  # engine.SharedCacheHandoff, created on first publish
+
+    def init(self, organizer: mobase.IOrganizer) -> bool:
+        self._organizer = organizer
+        self._organizer.onAboutToRun(self._on_about_to_run)
+        self._organizer.onFinishedRun(self._on_finished_run)
+        self._organizer.onPluginSettingChanged(self._on_setting_changed)
+        return True
+
+    def name(self) -> str:
+        return HOOK_PLUGIN_NAME
+
+    def author(self) -> str:
+        return "Raziell74"
+
+    def description(self) -> str:
+        return "Generates a compressed binary cache of the current virtual file system."
+
+    def icon(self):
+        return tuple() # Adding a custom PyQt6 icon here just to be fancy
+
+    def version(self) -> mobase.VersionInfo:
+        return mobase.VersionInfo(1, 0, 0, mobase.ReleaseType.FINAL)
+
+    def isActive(self) -> bool:
+        return True
+
+    def settings(self) -> list[mobase.PluginSetting]:
+        cpu_count = os.cpu_count() or 4
+        return [
+            mobase.PluginSetting(
+                "worker_threads",
+                f"How many threads to use when scanning your mod files (1–{cpu_count}). "
+                "Higher values are faster up to your CPU's thread count — going beyond that won't help.",
+                min(8, cpu_count)
+            ),
+            mobase.PluginSetting(
+                "extension_blacklist",
+                "File extensions to exclude from the cache (comma-separated). Pre-filled with defaults (plugins, archives, executables, etc.). Remove an extension to include it; add more to exclude.",
+                ",".join(EXCLUDED_EXTENSIONS)
+            ),
+            mobase.PluginSetting(
+                "directory_rules",
+                "Per engine directory include rules (';'-separated, e.g. 'textures=.dds;meshes=!*.png'). "
+                "'.ext' or a glob allows, a leading '!' denies, '*' applies to every directory. "
+                "A directory with any allow entry keeps only matching files. Clear to disable.",
+                ";".join(DEFAULT_DIRECTORY_RULES)
+            ),
+            mobase.PluginSetting(
+                "output_to_mod",
+                "Where to write the cache file (always under SKSE/Plugins/RAPID in that folder). "
+                "Leave empty or type 'Overwrite' for MO2's Overwrite folder (default). "
+                "To write into a specific mod, type the exact mod name as shown in the left pane.",
+                ""
+            ),
+            mobase.PluginSetting(
+                "cache_store_budget_mb",
+                "Disk budget (MB) for remembered caches, one per load order. Switching back to a "
+                "previously built profile reuses its cache instead of re-indexing. "
+                "A reused cache must pass the sampled staleness check first. "
+                "The least recently used caches are removed first. 0 (default) disables the store.",
+                DEFAULT_CACHE_STORE_BUDGET_MB
+            ),
+            mobase.PluginSetting(
+                "mod_attribution",
+                "Record which mod supplies each cached file (entry counts and extensions per mod, plus loose "
+                "bytes with entry_stats) for the cache stats Mods tab.",
+                True
+            ),
+            mobase.PluginSetting(
+                "entry_stats",
+                "Record each cached file's size and modification time. The cache stats dialog uses them for "
+                "loose bytes per engine directory and per mod. Lists every mod folder the cache draws from, "
+                "so it slows the scan; off by default.",
+                False
+            ),
+            mobase.PluginSetting(
+                "physical_paths",
+                "Record the mod folder each cached file comes from, so a loader can open the physical file "
+                "without going through the virtual file system.",
+                True
+            ),
+            mobase.PluginSetting(
+                "profile_builds",
+                "Sample every build thread while indexing. Writes folded stacks next to the cache "
+                "(rapid_vfs_cache.bin.folded) and prints the top hotspots to MO2's log.",
+                False
+            ),
+            mobase.PluginSetting(
+                "stale_while_revalidate",
+                "Launch immediately with the existing cache and rebuild it in the background for the next launch. "
+                "A blocking build still runs when there is no usable cache.",
+                False
+            ),
+            mobase.PluginSetting(
+                "launch_history",
+                "After the game exits, read cache load and inject times from the RAPID SKSE log into a local "
+                "history (RAPID cache stats > History).",
+                True
+            ),
+            mobase.PluginSetting(
+                "memory_budget_mb",
+                "Cap build memory for very large load orders (0 = build in memory). Workers spill sorted runs "
+                f"to disk and merge them into the cache; budgets below {MIN_MEMORY_BUDGET_MB} MB are raised to it.",
+                0
+            ),
+            mobase.PluginSetting(
+                "sample_verification",
+                "Before rebuilding at launch, compare the existing cache with a sample of VFS directories and "
+                "the mod list, and keep it when nothing differs and the confidence is high enough.",
+                False
+            ),
+            mobase.PluginSetting(
+                "sample_directories",
+                "How many cached directories the sampled check compares with the VFS, split across engine "
+                "directories by their file counts.",
+                DEFAULT_SAMPLE_DIRECTORIES
+            ),
+            mobase.PluginSetting(
+                "sample_min_confidence",
+                "Confidence (percent) the sampled check needs to skip the rebuild. It is the chance that a change "
+                f"touching {STALENESS_TOLERANCE:.0%} of the cached files would have been caught.",
+                DEFAULT_SAMPLE_MIN_CONFIDENCE_PCT
+            ),
+            mobase.PluginSetting(
+                "shared_memory_handoff",
+                f"Experimental: also publish the uncompressed cache in shared memory ({SHARED_CACHE_NAME!r}). "
+                "The SKSE loader does not read it yet, and publishing inflates the whole cache before every "
+                "launch, so leave this off unless you are testing a loader that maps it.",
+                False
+            ),
+            mobase.PluginSetting(
+                "shared_memory_timeout_s",
+                "Release the shared-memory cache this many seconds after launch if the game has not exited "
+                "by then (0 = keep it until the game exits).",
+                DEFAULT_SHARED_CACHE_TIMEOUT_S
+            ),
+            mobase.PluginSetting(
+                "access_ordering",
+                "Order cache records by how often the game looked them up, from the SKSE lookup trace "
+                "(rapid_lookup_trace.tsv, recorded with PerformanceDiagnostics), and add a hot set section "
+                "the loader answers lookups from while its full index builds.",
+                False
+            ),
+            mobase.PluginSetting(
+                "hot_set_size",
+                "How many of the most looked-up records go into the hot set section (access_ordering).",
+                DEFAULT_HOT_SET_SIZE
+            )
+        ]
+
+    def _on_setting_changed(self, plugin_name: str, key: str, old_value, new_value) -> None:
+        if plugin_name != self.name() or key != "worker_threads":
+            return
+        cpu_count = os.cpu_count() or 4
+        if int(new_value) > cpu_count:
+            self._organizer.setPluginSetting(self.name(), "worker_threads", cpu_count)
+
+    def index_vfs(self) -> bool:
+        from .ui import run_index_vfs
+
+        return run_index_vfs(self._organizer, self.name())
+
+    def _on_about_to_run(self, app_path: str) -> bool:
+        exe_name = os.path.basename(app_path).lower()
+
+        target_executables = [
+            "skyrimse.exe",
+            "skse64_loader.exe"
+        ]
+
+        if exe_name in target_executables:
+            t0 = time.monotonic()
+            if self._organizer.pluginSetting(self.name(), "stale_while_revalidate") and self._launch_with_existing_cache():
+                launching = True
+            else:
+                launching = self.index_vfs()
+            if launching:
+                self._note_launch((time.monotonic() - t0) * 1000)
+                self._publish_shared_cache()
+            return launching
+
+        return True
+
+    def _note_launch(self, prelaunch_ms: float) -> None:
+        """Remember the plugin side of this launch for the history row written after exit."""
+        self._pending_launch = None
+        if self._organizer.pluginSetting(self.name(), "launch_history") is False:
+            return
+        from . import engine
+
+        cache_path = engine.get_rapid_cache_path(self._organizer, self.name())
+        try:
+            cache_bytes = os.path.getsize(cache_path)
+        except OSError:
+            cache_bytes = 0
+        try:
+            self._pending_launch = {
+                "launched_at": time.time(),
+                "profile": self._organizer.profileName(),
+                "load_order": engine.compute_load_order_fingerprint(self._organizer, self.name())[:12],
+                "prelaunch_ms": prelaunch_ms,
+                "cache_bytes": cache_bytes,
+            }
+        except Exception as e:
+            print(f"RAPID launch history: not recording this launch: {e!r}")
+
+    def _publish_shared_cache(self) -> None:
+        if not self._organizer.pluginSetting(self.name(), "shared_memory_handoff"):
+            return
+        from . import engine
+
+        timeout_s = self._organizer.pluginSetting(self.name(), "shared_memory_timeout_s")
+        if timeout_s is None:
+            timeout_s = DEFAULT_SHARED_CACHE_TIMEOUT_S
+        if self._shared_cache is None:
+            self._shared_cache = engine.SharedCacheHandoff()
+        try:
+            self._shared_cache.publish(engine.get_rapid_cache_path(self._organizer, self.name()), float(timeout_s))
+        except (OSError, ValueError) as e:
+            print(f"RAPID shared cache: not published, the game will read the cache file: {e!r}")
+
+    def _on_finished_run(self, app_path: str, exit_code: int) -> None:
+        if os.path.basename(app_path).lower() not in ("skyrimse.exe", "skse64_loader.exe"):
+            return
+        if self._shared_cache is not None:
+            self._shared_cache.release()
+        pending = self._pending_launch
+        if pending is None:
+            return
+        self._pending_launch = None
+        from . import engine
+
+        history = engine.get_launch_history(self._organizer)
+        log_path = engine.get_skse_log_path(self._organizer)
+        if history is None or log_path is None:
+            print("RAPID launch history: unavailable (no sqlite3 module or no game documents folder).")
+            return
+        try:
+            launch = history.record(log_path, exit_code=exit_code, **pending)
+        except (OSError, engine.LaunchHistoryError) as e:
+            print(f"RAPID launch history: failed to record launch: {e!r}")
+            return
+        if launch["session"] is None:
+            print(f"RAPID launch history: no new SKSE log session at {log_path!r}; recorded the pre-launch side only.")
+        figures = [f"pre-launch {launch['prelaunch_ms']:.0f} ms"]
+        if launch["load_ms"] is not None:
+            figures.append(f"cache load {launch['load_ms']:.0f} ms")
+        if launch["inject_ms"] is not None:
+            figures.append(f"inject {launch['inject_ms']:.0f} ms")
+        if launch["native_fallbacks"]:
+            figures.append(f"{launch['native_fallbacks']} native fallback(s)")
+        print(f"RAPID launch history: {', '.join(figures)}.")
+
+    def _launch_with_existing_cache(self) -> bool:
+        """Stale-while-revalidate: keep the current cache for this launch and rebuild in the background."""
+        from . import engine
+        from .cache_format import _cache_incompatibility
+        from .ui import GuiThreadCaller
+
+        output_path = engine.get_rapid_cache_path(self._organizer, self.name())
+        reason = _cache_incompatibility(output_path)
+        if reason is not None:
+            print(f"RAPID: cannot launch with the existing cache ({reason}); building before launch.")
+            return False
+        if self._revalidate_thread is not None and self._revalidate_thread.is_alive():
+            print("RAPID: background rebuild still running; launching with the existing cache.")
+            return True
+        print("RAPID: launching with the existing cache; rebuilding in the background for the next launch.")
+        if self._gui_thread_caller is None:
+            self._gui_thread_caller = GuiThreadCaller()
+        self._revalidate_thread = engine.start_revalidation(self._organizer, self.name(), self._gui_thread_caller)
+        return True
+
+
+class RapidCacheTool(mobase.IPluginTool):
+    """Tool that runs the same cache build as the pre-launch hook (Build RAPID cache)."""
+
+    def __init__(self):
+        super().__init__()
+        self._organizer = None
+
+    def init(self, organizer: mobase.IOrganizer) -> bool:
+        self._organizer = organizer
+        return True
+
+    def name(self) -> str:
+        return "RAPID - Build Cache Tool"
+
+    def author(self) -> str:
+        return "Raziell74"
+
+    def description(self) -> str:
+        return "Manually trigger RAPID VFS cache building (same as pre-launch)."
+
+    def version(self) -> mobase.VersionInfo:
+        return mobase.VersionInfo(1, 0, 0, mobase.ReleaseType.FINAL)
+
+    def isActive(self) -> bool:
+        return True
+
+    def settings(self) -> list[mobase.PluginSetting]:
+        return []
+
+    def displayName(self) -> str:
+        return "RAPID - Build cache"
+
+    def tooltip(self) -> str:
+        return "Manually build the RAPID VFS cache (same as when launching the game)."
+
+    def icon(self) -> "QIcon":
+        from PyQt6.QtGui import QIcon
+
+        return QIcon()
+
+    def display(self) -> None:
+        from .ui import show_build_tool
+
+        show_build_tool(self._organizer, self._parentWidget() if hasattr(self, "_parentWidget") else None)
+
+
+class RapidCacheViewerTool(mobase.IPluginTool):
+    """Tool that opens a dialog showing RAPID cache stats (RAPID - View Cache Stats)."""
+
+    def __init__(self):
+        super().__init__()
+        self._organizer = None
+
+    def init(self, organizer: mobase.IOrganizer) -> bool:
+        self._organizer = organizer
+        return True
+
+    def name(self) -> str:
+        return "RAPID - View Cache Stats"
+
+    def author(self) -> str:
+        return "Raziell74"
+
+    def description(self) -> str:
+        return "View decompressed RAPID cache stats (extensions, engine directories)."
+
+    def version(self) -> mobase.VersionInfo:
+        return mobase.VersionInfo(1, 0, 0, mobase.ReleaseType.FINAL)
+
+    def isActive(self) -> bool:
+        return True
+
+    def settings(self) -> list[mobase.PluginSetting]:
+        return []
+
+    def displayName(self) -> str:
+        return "RAPID - View Cache Stats"
+
+    def tooltip(self) -> str:
+        return "View decompressed RAPID cache stats (extensions, engine directories)."
+
+    def icon(self) -> "QIcon":
+        from PyQt6.QtGui import QIcon
+
+        return QIcon()
+
+    def display(self) -> None:
+        from .ui import show_cache_viewer
+
+        show_cache_viewer(self._organizer, self._parentWidget() if hasattr(self, "_parentWidget") else None)
@@ -0,0 +1,804 @@
+"""Qt dialogs: build progress, error prompts and the cache stats viewer, plus the UI-driven build."""
+import mobase
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from mobase.widgets import TaskDialog, TaskDialogButton
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, QPointF, QRectF, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QMovie, QPainter, QPen
+from PyQt6.QtWidgets import (
+    QApplication,
+    QComboBox,
+    QDialog,
+    QGroupBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QListView,
+    QMessageBox,
+    QProgressBar,
+    QProgressDialog,
+    QTabWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .cache_format import (
+    EntryStats,
+    FILETIME_UNIX_EPOCH,
+    ModContribution,
+    _compute_extension_counters_by_engine_directory,
+    _compute_rapid_hash64,
+    read_cache_stats,
+)
+from .defaults import HOOK_PLUGIN_NAME
+from .engine import (
+    PathSearchIndex,
+    _build_cache_payload,
+    _existing_cache_verified,
+    _get_cache_path_candidates,
+    _get_cache_store_for_settings,
+    _parse_hash_query,
+    _profile_build,
+    _remove_quietly,
+    _store_built_cache,
+    _write_cache_file,
+    compute_load_order_fingerprint,
+    get_rapid_cache_path,
+    load_launch_history,
+)
+
+GUI_CALL_TIMEOUT_SECONDS = 60.0
+SPINNER_RESOURCE_CANDIDATES = (
+    ":/qt-project.org/styles/commonstyle/images/working-32.gif",
+    ":/qt-project.org/styles/commonstyle/images/working-16.gif",
+)
+
+
+def _create_progress_dialog() -> QProgressDialog:
+    dialog = QProgressDialog("Scanning virtual file system…", "Cancel", 0, 1)
+    dialog.setWindowTitle("RAPID - Indexing Loose Files")
+    dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+    dialog.setWindowFlags(dialog.windowFlags() | Qt.WindowType.Dialog)
+    dialog.setMinimumDuration(0)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setMinimumWidth(440)
+    dialog.setMinimumHeight(140)
+    dialog.setStyleSheet(
+        "QProgressDialog { padding: 14px; }\n"
+        "QProgressBar { min-height: 10px; }"
+    )
+    spinner_label = QLabel(dialog)
+    spinner_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    spinner_label.setMinimumHeight(36)
+    spinner_label.hide()
+
+    spinner_movie = None
+    for resource_path in SPINNER_RESOURCE_CANDIDATES:
+        candidate = QMovie(resource_path)
+        if candidate.isValid():
+            spinner_movie = candidate
+            break
+    if spinner_movie is not None:
+        spinner_label.setMovie(spinner_movie)
+
+    layout = dialog.layout()
+    if layout is not None:
+        layout.addWidget(spinner_label)
+
+    dialog._rapid_spinner_label = spinner_label
+    dialog._rapid_spinner_movie = spinner_movie
+    dialog._rapid_progress_bar = dialog.findChild(QProgressBar)
+    return dialog
+
+
+def _set_build_spinner_enabled(dialog: QProgressDialog, enabled: bool) -> None:
+    spinner_label = getattr(dialog, "_rapid_spinner_label", None)
+    spinner_movie = getattr(dialog, "_rapid_spinner_movie", None)
+    progress_bar = getattr(dialog, "_rapid_progress_bar", None)
+    show_spinner = enabled and spinner_movie is not None
+
+    if progress_bar is not None:
+        progress_bar.setVisible(not show_spinner)
+    if spinner_label is None:
+        return
+
+    spinner_label.setVisible(show_spinner)
+    if spinner_movie is None:
+        return
+    if show_spinner:
+        if spinner_movie.state() != QMovie.MovieState.Running:
+            spinner_movie.start()
+        return
+    if spinner_movie.state() != QMovie.MovieState.NotRunning:
+        spinner_movie.stop()
+
+
+def _update_progress_dialog(
+    dialog: QProgressDialog,
+    label_text: str,
+    value: int,
+    maximum: int,
+    *,
+    indeterminate: bool = False,
+    build_spinner: bool = False,
+) -> bool:
+    _set_build_spinner_enabled(dialog, build_spinner)
+    dialog.setLabelText(label_text)
+    if indeterminate:
+        dialog.setMinimum(0)
+        dialog.setMaximum(0)
+        dialog.setValue(0)
+    else:
+        maximum = max(1, maximum)
+        value = max(0, min(value, maximum))
+        dialog.setMinimum(0)
+        if dialog.maximum() != maximum:
+            dialog.setMaximum(maximum)
+        dialog.setValue(value)
+    QApplication.processEvents()
+    return dialog.wasCanceled()
+
+
+def _prompt_continue_without_rapid(errors: list[str]) -> bool:
+    details = "\n".join(errors[:10])
+    if len(errors) > 10:
+        details += f"\n...and {len(errors) - 10} more error(s)."
+    dialog = TaskDialog(
+        title="RAPID Indexing Error",
+        main="RAPID failed to build a complete VFS cache.",
+        content="Continue launching without RAPID performance gains?",
+        details=details,
+        icon=QMessageBox.Icon.Warning
+    )
+    dialog.addButton(TaskDialogButton("Yes", QMessageBox.StandardButton.Yes))
+    dialog.addButton(TaskDialogButton("No", QMessageBox.StandardButton.No))
+    result = dialog.exec()
+    return result == QMessageBox.StandardButton.Yes
+
+
+class GuiThreadCaller(QObject):
+    """Runs callables on the thread that created it (the GUI thread) for background threads.
+
+    Calling an instance blocks until the event loop has run the callable, then returns its
+    result or raises its exception. A call the event loop has not run within timeout_s
+    raises TimeoutError, and so does every call after it until that one has run, so a busy
+    GUI thread fails a background build quickly instead of stalling each of its workers.
+    """
+
+    _submitted = pyqtSignal(object)
+
+    def __init__(self, timeout_s: float = GUI_CALL_TIMEOUT_SECONDS):
+        super().__init__()
+        self._timeout_s = timeout_s
+        self._stalled: threading.Event | None = None
+        self._submitted.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def _run(self, call: Callable[[], None]) -> None:
+        call()
+
+    def __call__(self, function: Callable[[], object]) -> object:
+        stalled = self._stalled
+        if stalled is not None and not stalled.is_set():
+            raise TimeoutError("the GUI thread has not run an earlier call yet")
+        done = threading.Event()
+        outcome: list = []
+
+        def call():
+            try:
+                outcome.append((True, function()))
+            except BaseException as e:
+                outcome.append((False, e))
+            finally:
+                done.set()
+
+        self._submitted.emit(call)
+        if not done.wait(self._timeout_s):
+            self._stalled = done
+            raise TimeoutError(f"the GUI thread did not run the call within {self._timeout_s:g} s")
+        succeeded, value = outcome[0]
+        if not succeeded:
+            raise value
+        return value
+
+
+def run_index_vfs(organizer: mobase.IOrganizer, settings_plugin_name: str, force_rebuild: bool = False) -> bool:
+    """Run VFS indexing and write rapid_vfs_cache.bin to the configured output (Overwrite or named mod).
+
+    When the cache store already holds a cache for the current load-order fingerprint it is
+    linked into place instead, unless force_rebuild is set.
+    """
+    return _profile_build(
+        organizer,
+        settings_plugin_name,
+        lambda: _run_index_vfs(organizer, settings_plugin_name, force_rebuild),
+    )
+
+
+def _run_index_vfs(organizer: mobase.IOrganizer, settings_plugin_name: str, force_rebuild: bool) -> bool:
+    if not force_rebuild and organizer.pluginSetting(settings_plugin_name, "sample_verification"):
+        if _existing_cache_verified(organizer, settings_plugin_name):
+            return True
+    cache_store = _get_cache_store_for_settings(organizer, settings_plugin_name)
+    fingerprint = None
+    if cache_store is not None:
+        fingerprint = compute_load_order_fingerprint(organizer, settings_plugin_name)
+        output_path = get_rapid_cache_path(organizer, settings_plugin_name)
+        if not force_rebuild and cache_store.materialize(fingerprint, output_path):
+            # The fingerprint misses files added inside mod subfolders and Overwrite.
+            if _existing_cache_verified(organizer, settings_plugin_name):
+                print(f"RAPID cache store hit for load order {fingerprint[:12]}; reused cached index.")
+                return True
+            print(f"RAPID cache store hit for load order {fingerprint[:12]} is stale; rebuilding.")
+
+    progress_dialog = _create_progress_dialog()
+    progress_dialog.show()
+    QApplication.processEvents()
+    if progress_dialog.wasCanceled():
+        print("RAPID indexing canceled by user before start; launching without RAPID cache.")
+        progress_dialog.close()
+        return True
+
+    try:
+        def on_scan_progress(processed: int, discovered: int) -> bool:
+            if discovered == 0:
+                label = "Scanning virtual file system"
+                use_indeterminate = True
+            else:
+                total = max(1, discovered)
+                pct = (100 * processed) // total
+                label = (
+                    "Scanning virtual file system\n"
+                    f"{processed:,} / {discovered:,} directories ({pct}%)"
+                )
+                use_indeterminate = False
+            return _update_progress_dialog(
+                progress_dialog,
+                label,
+                processed,
+                discovered,
+                indeterminate=use_indeterminate,
+            )
+
+        build_label = "Building RAPID cache…"
+        last_build_spinner_update = 0.0
+
+        def refresh_build_spinner() -> bool:
+            nonlocal last_build_spinner_update
+            now = time.monotonic()
+            if now - last_build_spinner_update < 0.05:
+                return False
+            last_build_spinner_update = now
+            return _update_progress_dialog(
+                progress_dialog,
+                build_label,
+                0,
+                1,
+                indeterminate=True,
+                build_spinner=True,
+            )
+
+        result = _build_cache_payload(organizer, settings_plugin_name, on_scan_progress, refresh_build_spinner)
+        if result is None:
+            return True
+
+        if result.errors:
+            try:
+                return _prompt_continue_without_rapid(result.errors)
+            except Exception as e:
+                print(f"RAPID failed to display error prompt: {e!r}")
+                return True
+
+        if _update_progress_dialog(
+            progress_dialog, "Writing cache to disk…", 0, 1, indeterminate=True, build_spinner=False
+        ):
+            if result.compressed_path is not None:
+                _remove_quietly(result.compressed_path)
+            print("RAPID cache write canceled by user; launching without RAPID cache.")
+            return True
+
+        output_path = get_rapid_cache_path(organizer, settings_plugin_name)
+        _write_cache_file(output_path, result)
+        _store_built_cache(cache_store, fingerprint, output_path, result)
+
+        _update_progress_dialog(
+            progress_dialog, "RAPID cache complete.", 1, 1, indeterminate=False, build_spinner=False
+        )
+        print(
+            f"RAPID Cache built successfully! Indexed {result.path_count} loose files "
+            f"({result.filtered_count} filtered by rules)."
+        )
+        return True
+    finally:
+        progress_dialog.close()
+
+
+def _format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size:,} bytes"
+    value = float(size)
+    for unit in ("KiB", "MiB", "GiB"):
+        value /= 1024
+        if value < 1024 or unit == "GiB":
+            break
+    return f"{value:,.1f} {unit}"
+
+
+class _SortableNumberItem(QTableWidgetItem):
+    """Table item that displays formatted text but sorts by its numeric value."""
+
+    def __init__(self, value: int, text: str):
+        super().__init__(text)
+        self._value = value
+
+    def __lt__(self, other: QTableWidgetItem) -> bool:
+        if isinstance(other, _SortableNumberItem):
+            return self._value < other._value
+        return super().__lt__(other)
+
+
+class _PathListModel(QAbstractListModel):
+    """Virtualized list of search results; rows are resolved to paths only when painted."""
+
+    def __init__(self, paths: list[str], entry_stats: EntryStats | None = None, parent: QWidget | None = None):
+        super().__init__(parent)
+        self._paths = paths
+        self._entry_stats = entry_stats
+        self._ids: list[int] = []
+
+    def set_ids(self, ids: list[int]) -> None:
+        self.beginResetModel()
+        self._ids = ids
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+        record = self._ids[index.row()]
+        path = self._paths[record]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return path
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tooltip = f"hash 0x{_compute_rapid_hash64(path):016X}"
+            if self._entry_stats is not None:
+                tooltip += f"\n{_format_bytes(self._entry_stats.sizes[record])}"
+                tooltip += f", modified {_format_filetime(self._entry_stats.mtimes[record])}"
+            return tooltip
+        return None
+
+
+def _format_filetime(filetime: int) -> str:
+    if filetime == 0:
+        return "unknown"
+    return _format_build_time((filetime - FILETIME_UNIX_EPOCH) // 10_000)
+
+
+def _format_build_time(build_time_utc_ms: int | None) -> str:
+    if build_time_utc_ms is None:
+        return "unknown"
+    dt = datetime.fromtimestamp(build_time_utc_ms / 1000.0, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+HISTORY_METRICS: tuple[tuple[str, str, Callable], ...] = (
+    ("Inject (ms)", "inject_ms", lambda value: f"{value:,.0f}"),
+    ("Cache load (ms)", "load_ms", lambda value: f"{value:,.0f}"),
+    ("Inflate (ms)", "inflate_ms", lambda value: f"{value:,.0f}"),
+    ("Pre-launch (ms)", "prelaunch_ms", lambda value: f"{value:,.0f}"),
+    ("Cache file", "cache_bytes", _format_bytes),
+    ("Paths", "path_count", lambda value: f"{value:,}"),
+    ("Native fallbacks", "native_fallbacks", lambda value: f"{value:,}"),
+    ("Native traversal (ms)", "native_traversal_ms", lambda value: f"{value:,.0f}"),
+)
+
+
+class _TrendChart(QWidget):
+    """Line chart of one launch-history metric, with markers where the load order changed."""
+
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self._values: list[float | None] = []
+        self._markers: list[int] = []
+        self._format: Callable = str
+
+    def set_series(self, values: list, markers: list[int], fmt: Callable) -> None:
+        self._values = values
+        self._markers = markers
+        self._format = fmt
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        palette = self.palette()
+        text_color = palette.color(palette.ColorRole.WindowText)
+        metrics = painter.fontMetrics()
+        plot = QRectF(self.rect()).adjusted(metrics.horizontalAdvance("0" * 10) + 8, 8, -8, -metrics.height() - 8)
+        painter.setPen(QPen(text_color, 1))
+        painter.drawRect(plot)
+
+        points = [(i, value) for i, value in enumerate(self._values) if value is not None]
+        if not points:
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, "No data for this metric")
+            painter.end()
+            return
+        low = min(value for _, value in points)
+        high = max(value for _, value in points)
+        span = (high - low) or max(abs(high), 1)
+        last = max(len(self._values) - 1, 1)
+
+        def to_point(i: int, value: float) -> QPointF:
+            return QPointF(
+                plot.left() + plot.width() * i / last,
+                plot.bottom() - plot.height() * (value - low) / span,
+            )
+
+        marker_pen = QPen(text_color, 1, Qt.PenStyle.DashLine)
+        painter.setPen(marker_pen)
+        for i in self._markers:
+            x = plot.left() + plot.width() * i / last
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+
+        painter.setPen(QPen(palette.color(palette.ColorRole.Highlight), 2))
+        scaled = [to_point(i, value) for i, value in points]
+        for start, end in zip(scaled, scaled[1:]):
+            painter.drawLine(start, end)
+        painter.setBrush(palette.color(palette.ColorRole.Highlight))
+        for point in scaled:
+            painter.drawEllipse(point, 2.5, 2.5)
+
+        painter.setPen(QColor(text_color))
+        painter.drawText(QPointF(2, plot.top() + metrics.ascent()), self._format(high))
+        painter.drawText(QPointF(2, plot.bottom()), self._format(low))
+        painter.drawText(
+            QPointF(plot.left(), plot.bottom() + metrics.height() + 4),
+            f"{len(self._values)} launches, latest {self._format(points[-1][1])}",
+        )
+        painter.end()
+
+
+class RapidCacheStatsDialog(QDialog):
+    """Dialog showing RAPID cache stats: summary, extensions table, engine directories table."""
+
+    def __init__(
+        self,
+        cache_path: str,
+        file_size: int,
+        paths: list[str],
+        ext_counter: Counter[str],
+        root_counter: Counter[str],
+        filter_counter: Counter[str],
+        mod_contributions: dict[str, ModContribution],
+        entry_stats: EntryStats | None = None,
+        build_time_utc_ms: int | None = None,
+        launch_history: list[dict] | None = None,
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.setWindowTitle("RAPID cache stats")
+        self.setMinimumSize(560, 420)
+        layout = QVBoxLayout(self)
+
+        summary = QGroupBox("Summary")
+        summary_layout = QVBoxLayout()
+        summary_layout.addWidget(QLabel(f"Total paths: {len(paths):,}"))
+        summary_layout.addWidget(QLabel(f"Filtered by rules: {sum(filter_counter.values()):,}"))
+        if entry_stats is not None:
+            summary_layout.addWidget(QLabel(f"Loose bytes: {_format_bytes(sum(entry_stats.sizes))}"))
+        summary_layout.addWidget(QLabel(f"Cache file size: {file_size:,} bytes"))
+        summary_layout.addWidget(QLabel(f"Built: {_format_build_time(build_time_utc_ms)}"))
+        summary_layout.addWidget(QLabel(f"Cache path: {cache_path}"))
+        summary.setLayout(summary_layout)
+        layout.addWidget(summary)
+
+        tabs = QTabWidget()
+
+        # Engine directories table
+        root_group = QWidget()
+        root_layout = QVBoxLayout(root_group)
+        root_rows = root_counter.most_common(50)
+        root_bytes = entry_stats.bytes_by_engine_directory(paths) if entry_stats is not None else None
+        root_table = QTableWidget(len(root_rows), 2 if root_bytes is None else 3)
+        root_table.setHorizontalHeaderLabels(["Engine directory", "Entry files", "Loose bytes"])
+        root_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for row, (root, count) in enumerate(root_rows):
+            root_table.setItem(row, 0, QTableWidgetItem(root))
+            root_table.setItem(row, 1, _SortableNumberItem(count, f"{count:,}"))
+            if root_bytes is not None:
+                root_table.setItem(row, 2, _SortableNumberItem(root_bytes[root], _format_bytes(root_bytes[root])))
+        if root_bytes is not None:
+            root_table.setSortingEnabled(True)
+            root_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+        root_layout.addWidget(root_table)
+        tabs.addTab(root_group, "Directory Totals")
+
+        # Extensions table
+        ext_group = QWidget()
+        ext_layout = QVBoxLayout(ext_group)
+        ext_by_root = _compute_extension_counters_by_engine_directory(paths)
+        ext_tabs = QTabWidget()
+
+        totals_table = QTableWidget(len(ext_counter), 2)
+        totals_table.setHorizontalHeaderLabels(["Extension", "Count"])
+        totals_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for row, (ext, count) in enumerate(ext_counter.most_common()):
+            totals_table.setItem(row, 0, QTableWidgetItem(ext))
+            totals_table.setItem(row, 1, QTableWidgetItem(f"{count:,}"))
+        ext_tabs.addTab(totals_table, "Totals")
+
+        for root, _ in root_counter.most_common():
+            counter = ext_by_root.get(root)
+            if counter is None:
+                continue
+            root_table = QTableWidget(len(counter), 2)
+            root_table.setHorizontalHeaderLabels(["Extension", "Count"])
+            root_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            for row, (ext, count) in enumerate(counter.most_common()):
+                root_table.setItem(row, 0, QTableWidgetItem(ext))
+                root_table.setItem(row, 1, QTableWidgetItem(f"{count:,}"))
+            ext_tabs.addTab(root_table, root)
+
+        ext_layout.addWidget(ext_tabs)
+        tabs.addTab(ext_group, "Extensions")
+
+        # Rule removals table
+        filter_group = QWidget()
+        filter_layout = QVBoxLayout(filter_group)
+        filter_rows = filter_counter.most_common()
+        filter_table = QTableWidget(len(filter_rows), 2)
+        filter_table.setHorizontalHeaderLabels(["Rule", "Removed entries"])
+        filter_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for row, (rule, count) in enumerate(filter_rows):
+            filter_table.setItem(row, 0, QTableWidgetItem(rule))
+            filter_table.setItem(row, 1, QTableWidgetItem(f"{count:,}"))
+        filter_layout.addWidget(filter_table)
+        tabs.addTab(filter_group, "Filtered")
+
+        # Per-mod contributions table
+        mods_group = QWidget()
+        mods_layout = QVBoxLayout(mods_group)
+        if mod_contributions:
+            # Loose bytes per mod come from the entry stats listing; without it they are all 0.
+            columns = ["Mod", "Entry files", "Top extensions"]
+            if entry_stats is not None:
+                columns.insert(2, "Loose bytes")
+            mods_table = QTableWidget(len(mod_contributions), len(columns))
+            mods_table.setHorizontalHeaderLabels(columns)
+            mods_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+            mods_table.horizontalHeader().setStretchLastSection(True)
+            for row, (mod_name, contribution) in enumerate(mod_contributions.items()):
+                top_exts = ", ".join(f"{ext} {count:,}" for ext, count in contribution.ext_counter.most_common(4))
+                mods_table.setItem(row, 0, QTableWidgetItem(mod_name))
+                mods_table.setItem(row, 1, _SortableNumberItem(contribution.entries, f"{contribution.entries:,}"))
+                if entry_stats is not None:
+                    mods_table.setItem(row, 2, _SortableNumberItem(contribution.bytes, _format_bytes(contribution.bytes)))
+                mods_table.setItem(row, len(columns) - 1, QTableWidgetItem(top_exts))
+            mods_table.setSortingEnabled(True)
+            mods_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+            mods_table.resizeColumnToContents(0)
+            mods_layout.addWidget(mods_table)
+        else:
+            mods_layout.addWidget(QLabel("No per-mod data in this cache. Enable mod_attribution and rebuild."))
+        tabs.addTab(mods_group, "Mods")
+
+        # Path search
+        self._cache_path = cache_path
+        self._paths = paths
+        self._search_index: PathSearchIndex | None = None
+        self._search_thread: threading.Thread | None = None
+        self._search_error: str | None = None
+        search_group = QWidget()
+        search_layout = QVBoxLayout(search_group)
+        search_row = QHBoxLayout()
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText("Substring, glob (textures\\*\\*_n.dds) or hash (0x…)")
+        self._search_mode = QComboBox()
+        self._search_mode.addItems(["Auto", "Substring", "Glob", "Hash"])
+        search_row.addWidget(self._search_edit)
+        search_row.addWidget(self._search_mode)
+        search_layout.addLayout(search_row)
+        self._search_status = QLabel("The search index is built on first use and saved next to the cache.")
+        search_layout.addWidget(self._search_status)
+        self._search_model = _PathListModel(paths, entry_stats, self)
+        search_view = QListView()
+        search_view.setUniformItemSizes(True)
+        search_view.setModel(self._search_model)
+        search_layout.addWidget(search_view)
+        tabs.addTab(search_group, "Search")
+
+        # Launch history
+        history_group = QWidget()
+        history_layout = QVBoxLayout(history_group)
+        if launch_history:
+            self._history = launch_history
+            self._history_metric = QComboBox()
+            self._history_metric.addItems([label for label, _, _ in HISTORY_METRICS])
+            history_layout.addWidget(self._history_metric)
+            self._history_chart = _TrendChart()
+            history_layout.addWidget(self._history_chart, 1)
+            history_layout.addWidget(QLabel("Dashed lines mark launches where the load order changed."))
+            history_table = QTableWidget(len(launch_history), len(HISTORY_METRICS) + 1)
+            history_table.setHorizontalHeaderLabels(["Launched"] + [label for label, _, _ in HISTORY_METRICS])
+            history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+            for row, launch in enumerate(reversed(launch_history)):
+                launched_ms = int(launch["launched_at"] * 1000)
+                history_table.setItem(row, 0, _SortableNumberItem(launched_ms, _format_build_time(launched_ms)))
+                for column, (_, key, fmt) in enumerate(HISTORY_METRICS, start=1):
+                    value = launch[key]
+                    text = "" if value is None else fmt(value)
+                    history_table.setItem(row, column, _SortableNumberItem(value if value is not None else -1, text))
+            history_table.setSortingEnabled(True)
+            history_table.sortItems(0, Qt.SortOrder.DescendingOrder)
+            history_layout.addWidget(history_table, 1)
+            self._history_metric.currentIndexChanged.connect(self._show_history_metric)
+            self._show_history_metric(0)
+        elif launch_history is None:
+            history_layout.addWidget(QLabel("Launch history is unavailable: no sqlite3 module, or its database could not be read."))
+        else:
+            history_layout.addWidget(
+                QLabel("No launches recorded for this profile yet. Launch the game with launch_history enabled.")
+            )
+        tabs.addTab(history_group, "History")
+
+        self._search_debounce = QTimer(self)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(150)
+        self._search_debounce.timeout.connect(self._run_search)
+        self._search_poll = QTimer(self)
+        self._search_poll.setInterval(100)
+        self._search_poll.timeout.connect(self._poll_search_index)
+        self._search_edit.textChanged.connect(lambda _text: self._search_debounce.start())
+        self._search_mode.currentIndexChanged.connect(lambda _index: self._run_search())
+
+        layout.addWidget(tabs)
+        self.setLayout(layout)
+
+    def _show_history_metric(self, index: int) -> None:
+        _, key, fmt = HISTORY_METRICS[index]
+        changes = [
+            i for i in range(1, len(self._history))
+            if self._history[i]["load_order"] != self._history[i - 1]["load_order"]
+        ]
+        self._history_chart.set_series([launch[key] for launch in self._history], changes, fmt)
+
+    def _ensure_search_index(self) -> None:
+        if self._search_thread is not None:
+            return
+
+        def build() -> None:
+            try:
+                self._search_index = PathSearchIndex.load_or_build(self._cache_path, self._paths)
+            except Exception as e:
+                # Anything escaping here would leave the tab waiting on an index that never comes.
+                print(f"RAPID: failed to build search index: {e!r}")
+                self._search_error = f"{type(e).__name__}: {e}"
+
+        self._search_thread = threading.Thread(target=build, daemon=True)
+        self._search_thread.start()
+        self._search_poll.start()
+
+    def _poll_search_index(self) -> None:
+        if self._search_thread is not None and self._search_thread.is_alive():
+            return
+        self._search_poll.stop()
+        self._run_search()
+
+    def _run_search(self) -> None:
+        query = self._search_edit.text()
+        if not query.strip():
+            self._search_model.set_ids([])
+            return
+        self._ensure_search_index()
+        mode = self._search_mode.currentText().lower()
+        index = self._search_index
+        building = index is None and self._search_thread.is_alive()
+        failed = index is None and not building and self._search_error is not None
+        if index is None:
+            if mode == "hash" or (mode == "auto" and _parse_hash_query(query.strip()) is not None):
+                self._search_model.set_ids([])
+                if failed:
+                    self._search_status.setText(
+                        f"Search index failed to build ({self._search_error}); hash lookups are unavailable."
+                    )
+                else:
+                    self._search_status.setText("Building search index… hash lookups start when it is ready.")
+                return
+            index = PathSearchIndex.unindexed(self._paths)
+        t0 = time.perf_counter()
+        ids = index.search(query, mode)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self._search_model.set_ids(ids)
+        if failed:
+            suffix = f" (full scan, search index failed to build: {self._search_error})"
+        elif building:
+            suffix = " (full scan, index still building)"
+        else:
+            suffix = ""
+        self._search_status.setText(f"{len(ids):,} matching paths in {elapsed_ms:.1f} ms{suffix}")
+
+
+def show_build_tool(organizer: mobase.IOrganizer, parent: QWidget | None) -> None:
+    """RAPID - Build cache: rebuild, then show the stats of the new cache."""
+    if not run_index_vfs(organizer, HOOK_PLUGIN_NAME, force_rebuild=True):
+        return
+    candidates = _get_cache_path_candidates(organizer, HOOK_PLUGIN_NAME)
+    cache_path = next((path for path in candidates if os.path.isfile(path)), None)
+    if cache_path is None:
+        cache_path = get_rapid_cache_path(organizer, HOOK_PLUGIN_NAME)
+    result = read_cache_stats(cache_path)
+    if result is None:
+        QMessageBox.warning(
+            parent,
+            "RAPID cache",
+            f"The cache file is missing or invalid.\n\nPath: {cache_path}\n\nBuild was cancelled or failed.",
+        )
+        return
+    paths, ext_counter, root_counter, filter_counter, mod_contributions, entry_stats, build_time_utc_ms = result
+    file_size = os.path.getsize(cache_path) if os.path.isfile(cache_path) else 0
+    dialog = RapidCacheStatsDialog(
+        cache_path=cache_path,
+        file_size=file_size,
+        paths=paths,
+        ext_counter=ext_counter,
+        root_counter=root_counter,
+        filter_counter=filter_counter,
+        mod_contributions=mod_contributions,
+        entry_stats=entry_stats,
+        build_time_utc_ms=build_time_utc_ms,
+        launch_history=load_launch_history(organizer),
+        parent=parent,
+    )
+    dialog.exec()
+
+
+def show_cache_viewer(organizer: mobase.IOrganizer, parent: QWidget | None) -> None:
+    """RAPID - View Cache Stats: show the current cache, building it first when there is none."""
+    candidates = _get_cache_path_candidates(organizer, HOOK_PLUGIN_NAME)
+    cache_path = next((path for path in candidates if os.path.isfile(path)), None)
+    if cache_path is None:
+        if not run_index_vfs(organizer, HOOK_PLUGIN_NAME):
+            return
+        cache_path = get_rapid_cache_path(organizer, HOOK_PLUGIN_NAME)
+        if not os.path.isfile(cache_path):
+            QMessageBox.warning(
+                parent,
+                "RAPID cache",
+                f"The cache file is missing or invalid.\n\nPath: {cache_path}\n\nBuild was cancelled or failed.",
+            )
+            return
+    result = read_cache_stats(cache_path)
+    if result is None:
+        QMessageBox.warning(
+            parent,
+            "RAPID cache",
+            f"The cache file is missing or invalid.\n\nPath: {cache_path}\n\nBuild the cache first using \"Build RAPID cache\" or launch the game.",
+        )
+        return
+    paths, ext_counter, root_counter, filter_counter, mod_contributions, entry_stats, build_time_utc_ms = result
+    file_size = os.path.getsize(cache_path) if os.path.isfile(cache_path) else 0
+    dialog = RapidCacheStatsDialog(
+        cache_path=cache_path,
+        file_size=file_size,
+        paths=paths,
+        ext_counter=ext_counter,
+        root_counter=root_counter,
+        filter_counter=filter_counter,
+        mod_contributions=mod_contributions,
+        entry_stats=entry_stats,
+        build_time_utc_ms=build_time_utc_ms,
+        launch_history=load_launch_history(organizer),
+        parent=parent,
+    )
+    dialog.exec()
@@ -7,4 +7,5 @@ set(headers ${headers}
     src/cache.h
     src/location.h
     src/bsa_hash.h
+    src/trace.h
 )
\ No newline at end of file
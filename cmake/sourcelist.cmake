@@ -3,4 +3,5 @@ set(sources ${sources}
     src/hook.cpp
     src/cache.cpp
     src/location.cpp
+    src/trace.cpp
 )
\ No newline at end of file
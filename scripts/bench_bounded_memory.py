@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark cache serialization in memory vs. under a memory budget (memory_budget_mb).
+
+Each mode runs in its own subprocess on the same synthetic tree and writes a real cache
+file with entry stats and mod roots. The bounded mode flushes sorted runs the way the
+plugin's workers do and merges them into the compressed writer. The parent then reads
+both caches back and checks they hold the same records.
+
+At the default 3M files each mode takes a while: the path hash is pure Python.
+
+    python scripts/bench_bounded_memory.py [--files 3000000] [--workers 8] [--budget-mb 64]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from bench_path_accumulator import _load_plugin, _peak_rss_bytes, synthetic_entries
+
+MODES = ("memory", "bounded")
+FILETIME = 133_500_000_000_000_000
+
+
+def _accumulate(rapid, files: int, workers: int, spiller):
+    accumulators = [rapid._PathAccumulator() for _ in range(workers)]
+    for i, (raw_path, name, ext, directory) in enumerate(synthetic_entries(files)):
+        accumulator = accumulators[i % workers]
+        mod_root = f"C:\\Modding\\mods\\Mod{i % 997:03d}"
+        accumulator.add(raw_path, ext, directory, len(name) * 1024, FILETIME + i, mod_root)
+        if spiller is not None and accumulator.footprint() >= spiller.threshold:
+            spiller.flush(accumulator)
+    if spiller is not None:
+        for accumulator in accumulators:
+            spiller.flush(accumulator)
+    ext_counter: Counter[str] = Counter()
+    root_counter: Counter[str] = Counter()
+    for accumulator in accumulators:
+        ext_counter.update(accumulator.ext_counter)
+        root_counter.update(accumulator.root_counter)
+    metadata = rapid._serialize_metadata(int(time.time() * 1000), ext_counter, root_counter, Counter(), {})
+    return accumulators, metadata
+
+
+def run_memory(rapid, files: int, workers: int, budget_mb: int, output_path: str, _work_dir: str) -> int:
+    accumulators, metadata = _accumulate(rapid, files, workers, None)
+    compressed, _ = rapid._serialize_in_memory(accumulators, metadata, True, True, lambda: False)
+    with open(output_path, "wb") as f:
+        f.write(compressed)
+    return files
+
+
+def run_bounded(rapid, files: int, workers: int, budget_mb: int, output_path: str, work_dir: str) -> int:
+    spiller = rapid._RunSpiller(work_dir, budget_mb << 20, workers)
+    _, metadata = _accumulate(rapid, files, workers, spiller)
+    writer = rapid._CompressedCacheWriter(output_path)
+    path_count = spiller.merge_into(writer, metadata, True, True, lambda: False)
+    writer.finish(metadata)
+    print(f"runs: {len(spiller.runs)}", file=sys.stderr)
+    return path_count
+
+
+def record_checksum(rapid, cache_path: str) -> tuple[int, int]:
+    """Return (record count, order-independent sum of the stored path hashes) of a cache."""
+    read = rapid._read_cache_sections(cache_path, frozenset((rapid.SECTION_PATHS,)))
+    if read is None:
+        raise RuntimeError(f"{cache_path}: not a readable cache")
+    path_count, sections = read
+    hashes = rapid._read_record_hashes(sections[rapid.SECTION_PATHS], path_count)
+    if hashes is None:
+        raise RuntimeError(f"{cache_path}: truncated path records")
+    return path_count, sum(hashes) & 0xFFFFFFFFFFFFFFFF
+
+
+def _child(mode: str, files: int, workers: int, budget_mb: int, output_path: str) -> None:
+    rapid = _load_plugin()
+    runner = run_memory if mode == "memory" else run_bounded
+    work_dir = tempfile.mkdtemp(prefix="rapid_runs_")
+    try:
+        t0 = time.perf_counter()
+        path_count = runner(rapid, files, workers, budget_mb, output_path, work_dir)
+        elapsed = time.perf_counter() - t0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps({
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "path_count": path_count,
+        "cache_bytes": os.path.getsize(output_path),
+    }))
+
+
+def _spawn(mode: str, args, output_path: str) -> dict:
+    command = [
+        sys.executable, __file__, "--child", mode, "--output", output_path,
+        "--files", str(args.files), "--workers", str(args.workers), "--budget-mb", str(args.budget_mb),
+    ]
+    out = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=3_000_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--budget-mb", type=int, default=64)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--child", choices=MODES)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.files, args.workers, args.budget_mb, args.output)
+        return 0
+
+    print(
+        f"=== RAPID bounded-memory build benchmark "
+        f"({args.files:,} files, {args.workers} workers, {args.budget_mb} MB budget) ===\n"
+    )
+    rapid = _load_plugin()
+    out_dir = tempfile.mkdtemp(prefix="rapid_bench_")
+    results = {}
+    try:
+        for mode in MODES:
+            output_path = os.path.join(out_dir, f"{mode}.bin")
+            results[mode] = _spawn(mode, args, output_path)
+            results[mode]["checksum"] = record_checksum(rapid, output_path)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    if results["memory"]["checksum"] != results["bounded"]["checksum"]:
+        raise RuntimeError("in-memory and bounded builds produced different records")
+
+    print(f"{'':24}{'in memory':>16}{'bounded':>16}")
+    rows = (
+        ("wall time (s)", "seconds", "{:.2f}"),
+        ("peak RSS (MiB)", "peak_rss_bytes", "{:.1f}"),
+        ("cache size (MiB)", "cache_bytes", "{:.1f}"),
+        ("records", "path_count", "{:,}"),
+    )
+    for label, key, fmt in rows:
+        values = [
+            fmt.format(results[mode][key] / (1 << 20) if key.endswith("_bytes") else results[mode][key])
+            for mode in MODES
+        ]
+        print(f"{label:24}{values[0]:>16}{values[1]:>16}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"files": args.files, "workers": args.workers, "budget_mb": args.budget_mb, **results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
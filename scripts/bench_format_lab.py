@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""Format laboratory: re-encode a RAP2 cache in every candidate layout and compare them end to end.
+
+Takes a real rapid_vfs_cache.bin (or a synthetic cache) and re-encodes its path records
+in each layout below, compressed with each codec. Every combination is measured on:
+
+- size on disk;
+- decode: read the section directory, decompress the section and parse every path
+  record, the work ParseRap2 does in the SKSE loader;
+- index: build the hash -> record ids map LooseFileCache::Load builds. Layouts that ship
+  hashes use them; the others hash every path;
+- peak memory of decode + index under tracemalloc, not counting the compressed input.
+
+Each layout is wrapped in the RAP2 header and section directory under its own section type,
+its payload compressed on its own the way the plugin stores every section:
+
+    flat           today's PATH section: u64 hash, u16 length, path (the plugin's serializer)
+    flat-nohash    u16 length, path; the loader hashes every path
+    dir-interned   directory table (u32 n, then u16 length + directory each), then per
+                   record u64 hash, u32 directory id, u16 length, file name
+    front-coded    records sorted by path: u64 hash, u16 bytes shared with the previous
+                   path, u16 suffix length, suffix (drops the access_ordering record order)
+
+Codecs: none, zlib level 1 (what the plugin writes), zlib level 9 and lzma, plus zstd level 3
+when the zstandard package is installed. flat + zlib-1 is the baseline, the encoding of the
+path records in rapid_vfs_cache.bin, and the x columns are relative to it. Given a cache file,
+its unmodified bytes (every section) are measured too, as "as-is". Every layout has to
+decode to the input's paths and hashes, or the script fails.
+
+Times are pure Python and only meaningful as a ranking. Python hashes far slower than the
+SKSE loader, which overstates what dropping the shipped hashes costs; the peak memory pass
+of flat-nohash is the slowest step of a run (a few minutes at the default size).
+
+    python scripts/bench_format_lab.py [rapid_vfs_cache.bin] [--files 100000] [--repeats 3]
+        [--layouts flat,dir-interned] [--codecs zlib-1,lzma] [--json out.json]
+"""
+import argparse
+import gc
+import json
+import lzma
+import statistics
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+
+from bench_path_accumulator import _load_plugin, synthetic_entries
+
+try:
+    import zstandard
+except ImportError:  # optional; zstd rows are skipped without it
+    zstandard = None
+
+PACK_HEAD = struct.Struct("<QH")
+PACK_U16 = struct.Struct("<H")
+PACK_DIR_RECORD = struct.Struct("<QIH")
+PACK_FRONT_RECORD = struct.Struct("<QHH")
+BASELINE = ("flat", "zlib-1")
+
+
+class Flat:
+    name = "flat"
+    section = b"PATH"
+
+    @staticmethod
+    def encode(rapid, paths: list[bytes], hashes: array) -> bytes:
+        accumulator = rapid._PathAccumulator()
+        for path in paths:
+            accumulator.add(path.decode("utf-8"), "", "")
+        return bytes(rapid._serialize_path_records([accumulator], lambda: False))
+
+    @staticmethod
+    def decode(payload: bytes, count: int) -> tuple[list[bytes], array | None]:
+        paths: list[bytes] = []
+        hashes = array("Q")
+        unpack_head = PACK_HEAD.unpack_from
+        offset = 0
+        for _ in range(count):
+            path_hash, path_len = unpack_head(payload, offset)
+            offset += 10
+            paths.append(payload[offset : offset + path_len])
+            hashes.append(path_hash)
+            offset += path_len
+        return paths, hashes
+
+
+class FlatNoHash:
+    name = "flat-nohash"
+    section = b"PTHN"
+
+    @staticmethod
+    def encode(rapid, paths: list[bytes], hashes: array) -> bytes:
+        pack_u16 = PACK_U16.pack
+        return b"".join(pack_u16(len(path)) + path for path in paths)
+
+    @staticmethod
+    def decode(payload: bytes, count: int) -> tuple[list[bytes], array | None]:
+        paths: list[bytes] = []
+        unpack_u16 = PACK_U16.unpack_from
+        offset = 0
+        for _ in range(count):
+            (path_len,) = unpack_u16(payload, offset)
+            offset += 2
+            paths.append(payload[offset : offset + path_len])
+            offset += path_len
+        return paths, None
+
+
+class DirectoryInterned:
+    name = "dir-interned"
+    section = b"PDIR"
+
+    @staticmethod
+    def encode(rapid, paths: list[bytes], hashes: array) -> bytes:
+        directories: dict[bytes, int] = {}
+        records = []
+        pack_record = PACK_DIR_RECORD.pack
+        for path, path_hash in zip(paths, hashes):
+            directory, _, name = path.rpartition(b"\\")
+            directory_id = directories.setdefault(directory, len(directories))
+            records.append(pack_record(path_hash, directory_id, len(name)) + name)
+        table = [struct.pack("<I", len(directories))]
+        table.extend(PACK_U16.pack(len(directory)) + directory for directory in directories)
+        return b"".join(table + records)
+
+    @staticmethod
+    def decode(payload: bytes, count: int) -> tuple[list[bytes], array | None]:
+        unpack_u16 = PACK_U16.unpack_from
+        (directory_count,) = struct.unpack_from("<I", payload, 0)
+        offset = 4
+        directories: list[bytes] = []
+        for _ in range(directory_count):
+            (length,) = unpack_u16(payload, offset)
+            offset += 2
+            directories.append(payload[offset : offset + length] + b"\\")
+            offset += length
+        paths: list[bytes] = []
+        hashes = array("Q")
+        unpack_record = PACK_DIR_RECORD.unpack_from
+        for _ in range(count):
+            path_hash, directory_id, name_len = unpack_record(payload, offset)
+            offset += PACK_DIR_RECORD.size
+            paths.append(directories[directory_id] + payload[offset : offset + name_len])
+            hashes.append(path_hash)
+            offset += name_len
+        return paths, hashes
+
+
+class FrontCoded:
+    name = "front-coded"
+    section = b"PFRC"
+
+    @staticmethod
+    def encode(rapid, paths: list[bytes], hashes: array) -> bytes:
+        records = []
+        pack_record = PACK_FRONT_RECORD.pack
+        previous = b""
+        for record in sorted(range(len(paths)), key=paths.__getitem__):
+            path = paths[record]
+            shared = 0
+            limit = min(len(path), len(previous))
+            while shared < limit and path[shared] == previous[shared]:
+                shared += 1
+            records.append(pack_record(hashes[record], shared, len(path) - shared) + path[shared:])
+            previous = path
+        return b"".join(records)
+
+    @staticmethod
+    def decode(payload: bytes, count: int) -> tuple[list[bytes], array | None]:
+        paths: list[bytes] = []
+        hashes = array("Q")
+        unpack_record = PACK_FRONT_RECORD.unpack_from
+        offset = 0
+        previous = b""
+        for _ in range(count):
+            path_hash, shared, suffix_len = unpack_record(payload, offset)
+            offset += PACK_FRONT_RECORD.size
+            previous = previous[:shared] + payload[offset : offset + suffix_len]
+            paths.append(previous)
+            hashes.append(path_hash)
+            offset += suffix_len
+        return paths, hashes
+
+
+LAYOUTS = (Flat, FlatNoHash, DirectoryInterned, FrontCoded)
+CODECS = {
+    "none": (bytes, bytes),
+    "zlib-1": (lambda data: zlib.compress(data, 1), zlib.decompress),
+    "zlib-9": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+if zstandard is not None:
+    CODECS["zstd-3"] = (zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress)
+# Section codec ids; lzma and zstd are lab-only and the plugin does not read them.
+CODEC_IDS = {"none": 0, "zlib-1": 1, "zlib-9": 1, "lzma": 0x80, "zstd-3": 0x81}
+
+
+def read_input(rapid, cache_path: str) -> tuple[list[bytes], array]:
+    """The path records of a RAP2 cache, as stored (normalized UTF-8 paths and their hashes)."""
+    read = rapid._read_cache_sections(cache_path, frozenset((rapid.SECTION_PATHS,)))
+    if read is None or rapid.SECTION_PATHS not in read[1]:
+        raise ValueError(f"{cache_path}: not a readable RAP2 v{rapid.RAP2_VERSION} cache")
+    count, sections = read
+    return Flat.decode(sections[rapid.SECTION_PATHS], count)
+
+
+def synthetic_input(rapid, files: int) -> tuple[list[bytes], array]:
+    paths = [rapid._normalize_path(raw_path).encode("utf-8") for raw_path, _, _, _ in synthetic_entries(files)]
+    return paths, array("Q", (rapid._compute_rapid_hash64_utf8(path) for path in paths))
+
+
+def wrap(rapid, section: bytes, payload: bytes, count: int, codec: str) -> bytes:
+    """A RAP2 cache holding payload, compressed with codec, as its only section."""
+    stored = CODECS[codec][0](payload)
+    entry = (section, len(payload), zlib.crc32(payload), len(stored), CODEC_IDS[codec])
+    return rapid._cache_header(count, [entry]) + stored
+
+
+def decode_cache(rapid, blob: bytes, decompress, layout) -> tuple[list[bytes], array | None]:
+    """Find the layout's section in a cache, decompress it and parse it, checking the directory and CRC."""
+    if blob[:4] != rapid.RAP2_MAGIC:
+        raise ValueError("not a RAP2 cache")
+    (count,) = struct.unpack_from("<I", blob, 8)
+    _, entry_size, section_count = rapid.SECTION_DIRECTORY.unpack_from(blob, rapid.RAP2_HEADER_SIZE)
+    entries = rapid.RAP2_HEADER_SIZE + rapid.SECTION_DIRECTORY.size
+    for i in range(section_count):
+        section_type, crc, _, offset, stored_length, length = rapid.SECTION_ENTRY.unpack_from(
+            blob, entries + i * entry_size
+        )
+        if section_type == layout.section:
+            break
+    else:
+        raise ValueError(f"no {layout.section!r} section")
+    payload = decompress(blob[offset : offset + stored_length])
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError(f"{layout.section!r} section failed its checksum")
+    return layout.decode(payload, count)
+
+
+def build_index(rapid, paths: list[bytes], hashes: array | None) -> dict[int, list[int]]:
+    """hash -> record ids, like LooseFileCache::Load; hashes every path when none were shipped."""
+    if hashes is None:
+        hash_path = rapid._compute_rapid_hash64_utf8
+        hashes = (hash_path(path) for path in paths)
+    index: dict[int, list[int]] = {}
+    for record, path_hash in enumerate(hashes):
+        bucket = index.get(path_hash)
+        if bucket is None:
+            index[path_hash] = [record]
+        else:
+            bucket.append(record)
+    return index
+
+
+def measure(rapid, label: str, codec: str, blob: bytes, decompress, layout, reference, repeats: int) -> dict:
+    decode_runs = []
+    index_runs = []
+    # The index allocates a list per hash; keep collector pauses out of the timings.
+    gc.collect()
+    gc.disable()
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        paths, hashes = decode_cache(rapid, blob, decompress, layout)
+        t1 = time.perf_counter()
+        index = build_index(rapid, paths, hashes)
+        t2 = time.perf_counter()
+        decode_runs.append((t1 - t0) * 1000)
+        index_runs.append((t2 - t1) * 1000)
+    gc.enable()
+    if sorted(paths) != reference[0] or index.keys() != reference[1]:
+        raise RuntimeError(f"{label} + {codec} does not decode to the input's paths and hashes")
+    del paths, hashes, index
+
+    tracemalloc.start()
+    paths, hashes = decode_cache(rapid, blob, decompress, layout)
+    build_index(rapid, paths, hashes)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    decode_ms = statistics.median(decode_runs)
+    index_ms = statistics.median(index_runs)
+    return {
+        "layout": label,
+        "codec": codec,
+        "bytes": len(blob),
+        "decode_ms": decode_ms,
+        "index_ms": index_ms,
+        "total_ms": decode_ms + index_ms,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cache_path", nargs="?", help="rapid_vfs_cache.bin to re-encode (default: synthetic)")
+    parser.add_argument("--files", type=int, default=100_000, help="synthetic cache size without a cache_path")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--layouts", help="comma-separated subset of: " + ", ".join(l.name for l in LAYOUTS))
+    parser.add_argument("--codecs", help="comma-separated subset of: " + ", ".join(CODECS))
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    layouts = LAYOUTS
+    if args.layouts:
+        wanted = set(args.layouts.split(","))
+        layouts = tuple(layout for layout in LAYOUTS if layout.name in wanted)
+    codecs = list(CODECS)
+    if args.codecs:
+        codecs = [codec for codec in codecs if codec in set(args.codecs.split(","))]
+    if not layouts or not codecs:
+        parser.error("no known layout or codec selected")
+
+    rapid = _load_plugin()
+    if args.cache_path:
+        paths, hashes = read_input(rapid, args.cache_path)
+        source = args.cache_path
+    else:
+        paths, hashes = synthetic_input(rapid, args.files)
+        source = f"synthetic ({args.files:,} files)"
+    reference = (sorted(paths), set(hashes))
+    print(f"=== RAPID format lab: {source}, {len(paths):,} paths, median of {args.repeats} ===\n")
+
+    rows = []
+    if args.cache_path:
+        with open(args.cache_path, "rb") as f:
+            blob = f.read()
+        rows.append(measure(rapid, "as-is", "zlib-1", blob, zlib.decompress, Flat, reference, args.repeats))
+    for layout in layouts:
+        t0 = time.perf_counter()
+        payload = layout.encode(rapid, paths, hashes)
+        layout_ms = (time.perf_counter() - t0) * 1000
+        for codec in codecs:
+            t0 = time.perf_counter()
+            blob = wrap(rapid, layout.section, payload, len(paths), codec)
+            encode_ms = layout_ms + (time.perf_counter() - t0) * 1000
+            row = measure(rapid, layout.name, codec, blob, CODECS[codec][1], layout, reference, args.repeats)
+            row["encode_ms"] = encode_ms
+            rows.append(row)
+
+    baseline = next((row for row in rows if (row["layout"], row["codec"]) == BASELINE), None)
+    for row in rows:
+        row["bytes_vs_baseline"] = row["bytes"] / baseline["bytes"] if baseline else None
+        row["total_vs_baseline"] = row["total_ms"] / baseline["total_ms"] if baseline else None
+
+    print(
+        f"{'layout':14}{'codec':8}{'MiB':>8}{'x size':>8}{'decode ms':>11}{'index ms':>10}{'total ms':>10}"
+        f"{'x time':>8}{'peak MiB':>10}{'encode ms':>11}"
+    )
+    for row in rows:
+        relative = (
+            f"{row['bytes_vs_baseline']:>8.2f}" if baseline else f"{'-':>8}",
+            f"{row['total_vs_baseline']:>8.2f}" if baseline else f"{'-':>8}",
+        )
+        encode = f"{row['encode_ms']:>11,.0f}" if "encode_ms" in row else f"{'-':>11}"
+        print(
+            f"{row['layout']:14}{row['codec']:8}{row['bytes'] / (1 << 20):>8.2f}{relative[0]}"
+            f"{row['decode_ms']:>11,.0f}{row['index_ms']:>10,.0f}{row['total_ms']:>10,.0f}{relative[1]}"
+            f"{row['peak_bytes'] / (1 << 20):>10.1f}{encode}"
+        )
+    if baseline is None:
+        print(f"\n(baseline {BASELINE[0]} + {BASELINE[1]} not selected; no relative columns)")
+    if zstandard is None:
+        print("\nzstd skipped: the zstandard package is not installed.")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "source": source,
+                    "paths": len(paths),
+                    "repeats": args.repeats,
+                    "baseline": {"layout": BASELINE[0], "codec": BASELINE[1]},
+                    "rows": rows,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Benchmark build-time path accumulation: legacy str lists vs. per-worker UTF-8 arenas.
+
+Each mode runs in its own subprocess on the same synthetic tree, once plain (peak RSS,
+wall time) and once under tracemalloc (traced peak, live blocks after accumulation).
+The traced passes are slow (minutes at 1M files): every step of the pure Python path
+hash allocates an int, and tracemalloc records each one.
+
+    python scripts/bench_path_accumulator.py [--files 1000000] [--workers 8]
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MO2 Plugin")
+ROOTS = ("textures", "meshes", "sound", "interface", "scripts", "music")
+EXTS = {
+    "textures": (".dds",),
+    "meshes": (".nif", ".nif", ".nif", ".tri", ".hkx"),
+    "sound": (".wav", ".fuz", ".xwm"),
+    "interface": (".swf", ".txt"),
+    "scripts": (".pex",),
+    "music": (".xwm",),
+}
+
+
+def _load_plugin(module: str = "cache_format"):
+    """Import a plugin module that needs neither mobase nor Qt: cache_format, engine or defaults."""
+    sys.path.insert(0, PLUGIN_DIR)
+    return importlib.import_module(f"RAPID.{module}")
+
+
+def synthetic_entries(count: int):
+    """Yield (raw_path, name, ext, directory) the way the VFS walker sees them."""
+    for i in range(count):
+        directory = ROOTS[i % len(ROOTS)]
+        exts = EXTS[directory]
+        ext = exts[(i // len(ROOTS)) % len(exts)]
+        name = f"Asset_{i:07d}_Variant{ext.upper()}"
+        yield f"{directory}\\Mod{i % 997:03d}\\Sub{i % 31:02d}\\Group{i % 7}\\{name}", name, ext, directory
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.PeakWorkingSetSize
+
+
+def run_legacy(rapid, files: int, workers: int) -> bytes:
+    """The pre-arena pipeline: raw str batches, a normalized str list, counters, chunk list."""
+    batches = [[] for _ in range(workers)]
+    for i, (raw_path, _name, _ext, _directory) in enumerate(synthetic_entries(files)):
+        batches[i % workers].append(raw_path)
+    serializable_paths = []
+    for batch in batches:
+        for raw_path in batch:
+            normalized = rapid._normalize_path(raw_path)
+            if normalized and len(normalized.encode("utf-8")) <= 0xFFFF:
+                serializable_paths.append(normalized)
+    ext_counter, root_counter = rapid._compute_path_counters(serializable_paths)
+    chunks = []
+    for path in serializable_paths:
+        encoded_path = path.encode("utf-8")
+        chunks.append(rapid.PACK_U64.pack(rapid._compute_rapid_hash64(path)))
+        chunks.append(rapid.PACK_U16.pack(len(encoded_path)))
+        chunks.append(encoded_path)
+    _mark_accumulated()
+    return b"".join(chunks)
+
+
+def run_arena(rapid, files: int, workers: int) -> bytearray:
+    accumulators = [rapid._PathAccumulator() for _ in range(workers)]
+    for i, (raw_path, _name, ext, directory) in enumerate(synthetic_entries(files)):
+        accumulators[i % workers].add(raw_path, ext, directory)
+    ext_counter: Counter[str] = Counter()
+    root_counter: Counter[str] = Counter()
+    for accumulator in accumulators:
+        ext_counter.update(accumulator.ext_counter)
+        root_counter.update(accumulator.root_counter)
+    _mark_accumulated()
+    return rapid._serialize_path_records(accumulators, lambda: False)
+
+
+_live_blocks_after_accumulation = 0
+
+
+def _mark_accumulated() -> None:
+    global _live_blocks_after_accumulation
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        _live_blocks_after_accumulation = sum(stat.count for stat in snapshot.statistics("filename"))
+
+
+def _child(mode: str, files: int, workers: int, traced: bool) -> None:
+    rapid = _load_plugin()
+    runner = run_legacy if mode == "legacy" else run_arena
+    if traced:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    payload = runner(rapid, files, workers)
+    elapsed = time.perf_counter() - t0
+    result = {"mode": mode, "seconds": elapsed, "payload_bytes": len(payload)}
+    if traced:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update(traced_peak_bytes=peak, live_blocks=_live_blocks_after_accumulation)
+    else:
+        result["peak_rss_bytes"] = _peak_rss_bytes()
+    print(json.dumps(result))
+
+
+def _spawn(mode: str, files: int, workers: int, traced: bool) -> dict:
+    args = [sys.executable, __file__, "--child", mode, "--files", str(files), "--workers", str(workers)]
+    if traced:
+        args.append("--traced")
+    out = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--child", choices=("legacy", "arena"))
+    parser.add_argument("--traced", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.files, args.workers, args.traced)
+        return 0
+
+    print(f"=== RAPID path accumulation benchmark ({args.files:,} files, {args.workers} workers) ===\n")
+    results = {}
+    for mode in ("legacy", "arena"):
+        plain = _spawn(mode, args.files, args.workers, traced=False)
+        traced = _spawn(mode, args.files, args.workers, traced=True)
+        if plain["payload_bytes"] != traced["payload_bytes"]:
+            raise RuntimeError(f"{mode}: payload size differs between runs")
+        results[mode] = {**traced, **plain}
+    if results["legacy"]["payload_bytes"] != results["arena"]["payload_bytes"]:
+        raise RuntimeError("legacy and arena pipelines produced different payload sizes")
+
+    print(f"{'':24}{'legacy':>16}{'arena':>16}")
+    rows = (
+        ("wall time (s)", "seconds", "{:.2f}"),
+        ("peak RSS (MiB)", "peak_rss_bytes", "{:.1f}"),
+        ("traced peak (MiB)", "traced_peak_bytes", "{:.1f}"),
+        ("live blocks", "live_blocks", "{:,}"),
+    )
+    for label, key, fmt in rows:
+        values = []
+        for mode in ("legacy", "arena"):
+            value = results[mode][key]
+            values.append(fmt.format(value / (1 << 20) if key.endswith("_bytes") else value))
+        print(f"{label:24}{values[0]:>16}{values[1]:>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
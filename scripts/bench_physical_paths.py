@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark the build cost of recording physical source paths.
+
+Writes a synthetic mods folder to disk and runs the plugin's build (_build_from_plan) over
+it with physical_paths off and on, each alone and on top of entry_stats. That covers the
+whole resolution path: one findFileInfos per walked directory, each file's mod folder
+derived from its physical path, and with entry_stats the os.scandir listing of every
+physical directory as well. Reports build time and cache size for each, and what
+physical_paths adds per file.
+
+findFileInfos is answered from a prebuilt dictionary here (see bench_walk_resolution.py),
+so MO2's own lookup cost is not included. The listings run against a warm file system cache.
+
+    python scripts/bench_physical_paths.py [--files 300000] [--mods 400] [--workers 8] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+
+from bench_path_accumulator import _load_plugin
+from bench_staleness_check import build_tree
+from bench_walk_resolution import Organizer, run, write_mods
+
+# (label, attribute_mods, record_entry_stats, record_physical_paths)
+SCENARIOS = (
+    ("paths only", False, False, False),
+    ("physical_paths", False, False, True),
+    ("entry_stats", False, True, False),
+    ("entry_stats + physical", False, True, True),
+)
+PAIRS = (("paths only", "physical_paths"), ("entry_stats", "entry_stats + physical"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300_000)
+    parser.add_argument("--mods", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", help="Write the synthetic mods here instead of a temporary directory.")
+    args = parser.parse_args()
+
+    engine = _load_plugin("engine")
+    defaults = _load_plugin("defaults")
+    directory_filters = engine._compile_directory_filters(
+        ";".join(defaults.DEFAULT_DIRECTORY_RULES), frozenset(defaults.EXCLUDED_EXTENSIONS)
+    )
+
+    work_dir = args.dir or tempfile.mkdtemp(prefix="rapid_physical_bench_")
+    try:
+        tree = build_tree(args.files, args.seed)
+        organizer = Organizer(write_mods(tree, os.path.join(work_dir, "mods"), args.mods, args.seed))
+        print(f"=== RAPID physical path benchmark ({args.files:,} files, {args.mods:,} mods, "
+              f"{args.workers} workers) ===\n")
+        gc.freeze()
+        output_path = os.path.join(work_dir, "rapid_vfs_cache.bin")
+        run(engine, organizer, tree, directory_filters, output_path, args.workers, SCENARIOS[-1][1:])
+
+        runs: dict[str, list[tuple[float, int]]] = {label: [] for label, *_ in SCENARIOS}
+        for _ in range(args.repeat):
+            for label, *flags in SCENARIOS:
+                runs[label].append(run(engine, organizer, tree, directory_filters, output_path, args.workers, flags))
+        results = {label: min(label_runs) for label, label_runs in runs.items()}
+        print(f"{'':26}{'build':>10}{'cache':>12}")
+        for label, (elapsed, size) in results.items():
+            print(f"{label:26}{elapsed:9.2f} s{size / (1 << 20):9.2f} MiB")
+        print()
+        for without, with_roots in PAIRS:
+            (base, base_size), (elapsed, size) = results[without], results[with_roots]
+            print(f"physical_paths over {without}: {(elapsed - base) / base:+.1%}, "
+                  f"{(elapsed - base) / args.files * 1e6:.2f} us per file, "
+                  f"{(size - base_size) / (1 << 10):+,.0f} KiB of cache")
+    finally:
+        if not args.dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
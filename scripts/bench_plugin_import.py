@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark what the RAPID plugin costs MO2 at startup, and what its lazy modules cost later.
+
+Each stage runs in a fresh interpreter that first imports mobase and PyQt6 (QtCore, QtGui,
+QtWidgets), which MO2 has loaded before it loads any Python plugin, so only the plugin's own
+cost is timed:
+
+- startup: import the RAPID package, createPlugins() and each plugin's settings(), which is
+  all MO2 does with the plugin until a launch hook fires or a tool is opened;
+- cache_format, engine, ui: the modules loaded on first use, each on top of startup;
+- everything: startup plus all three, what the plugin cost before it was split.
+
+Needs mobase and PyQt6 to be importable (run it with MO2's Python, or point PYTHONPATH at them).
+
+    python scripts/bench_plugin_import.py [--repeats 10] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MO2 Plugin")
+STAGES = {
+    "startup": (),
+    "+ cache_format": ("RAPID.cache_format",),
+    "+ engine": ("RAPID.engine",),
+    "+ ui": ("RAPID.ui",),
+    "everything": ("RAPID.cache_format", "RAPID.engine", "RAPID.ui"),
+}
+
+
+def _child(stage: str) -> None:
+    import importlib
+
+    import mobase  # noqa: F401
+    import PyQt6.QtCore  # noqa: F401
+    import PyQt6.QtGui  # noqa: F401
+    import PyQt6.QtWidgets  # noqa: F401
+
+    sys.path.insert(0, PLUGIN_DIR)
+    preloaded = set(sys.modules)
+    t0 = time.perf_counter()
+    import RAPID
+
+    for plugin in RAPID.createPlugins():
+        plugin.settings()
+    startup = time.perf_counter()
+    for module in STAGES[stage]:
+        importlib.import_module(module)
+    done = time.perf_counter()
+    print(json.dumps({
+        "startup_ms": (startup - t0) * 1000,
+        "total_ms": (done - t0) * 1000,
+        "modules": sorted(set(sys.modules) - preloaded),
+    }))
+
+
+def _spawn(stage: str) -> dict:
+    command = [sys.executable, "-B", __file__, "--child", stage]
+    out = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--child", choices=STAGES)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return 0
+
+    print(f"=== RAPID plugin import benchmark (median of {args.repeats} fresh interpreters) ===\n")
+    results = {}
+    for stage in STAGES:
+        runs = [_spawn(stage) for _ in range(args.repeats)]
+        results[stage] = {
+            "ms": statistics.median(run["total_ms"] for run in runs),
+            "modules": len(runs[0]["modules"]),
+            "new_modules": runs[0]["modules"],
+        }
+    startup_ms = results["startup"]["ms"]
+    print(f"{'stage':20}{'ms':>10}{'vs. startup':>14}{'new modules':>14}")
+    for stage, result in results.items():
+        print(f"{stage:20}{result['ms']:>10.1f}{result['ms'] - startup_ms:>+14.1f}{result['modules']:>14}")
+    print(f"\nMO2 startup pays {startup_ms:.1f} ms of the {results['everything']['ms']:.1f} ms the full plugin costs.")
+    print("Modules imported at startup: " + ", ".join(results["startup"]["new_modules"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"repeats": args.repeats, **results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark the shared-memory cache handoff against reading and inflating the cache file.
+
+Writes a synthetic cache with the plugin's serializer, publishes it the way the pre-launch
+hook does (shared_memory_handoff), then times fresh consumer processes loading the path
+records both ways with scripts/shm_cache_consumer.py. "ready" is the time until the
+uncompressed bytes are available (read + inflate vs. attach + header check), "parsed"
+includes walking every path record. "end to end" adds what each path costs the producer
+per launch: nothing for the file, which is written either way, and the publish (inflating
+the whole cache into the segment, on MO2's GUI thread) for shared memory.
+
+    python scripts/bench_shm_handoff.py [--files 800000] [--repeats 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from bench_path_accumulator import _load_plugin, synthetic_entries
+
+import shm_cache_consumer
+
+MODES = ("disk", "shm")
+FILETIME = 133_500_000_000_000_000
+
+
+def write_synthetic_cache(rapid, files: int, cache_path: str) -> None:
+    accumulator = rapid._PathAccumulator()
+    for i, (raw_path, name, ext, directory) in enumerate(synthetic_entries(files)):
+        accumulator.add(raw_path, ext, directory, len(name) * 1024, FILETIME + i, f"C:\\Modding\\mods\\Mod{i % 997:03d}")
+    metadata = rapid._serialize_metadata(
+        int(time.time() * 1000), accumulator.ext_counter, accumulator.root_counter, Counter(), {}
+    )
+    compressed, _ = rapid._serialize_in_memory([accumulator], metadata, True, True, lambda: False)
+    with open(cache_path, "wb") as f:
+        f.write(compressed)
+
+
+def _child(mode: str, cache_path: str, name: str) -> None:
+    t0 = time.perf_counter()
+    if mode == "disk":
+        with open(cache_path, "rb") as f:
+            located = shm_cache_consumer.locate_paths(f.read())
+        ready = time.perf_counter()
+        records = None if located is None else shm_cache_consumer.parse_records(*located)
+    else:
+        segment = shm_cache_consumer._attach(name)
+        header = shm_cache_consumer.SHARED_CACHE_HEADER.unpack_from(segment.buf, 0)
+        stat = os.stat(cache_path)
+        if header[0] != shm_cache_consumer.SHARED_CACHE_MAGIC or (stat.st_size, stat.st_mtime_ns) != header[2:4]:
+            raise RuntimeError("published segment does not match the cache file")
+        ready = time.perf_counter()
+        records = shm_cache_consumer.parse_paths(segment.buf, shm_cache_consumer.SHARED_CACHE_HEADER.size)
+    parsed = time.perf_counter()
+    if records is None:
+        raise RuntimeError(f"{mode}: cache did not parse")
+    print(json.dumps({"ready_ms": (ready - t0) * 1000, "parsed_ms": (parsed - t0) * 1000, "paths": len(records)}))
+    if mode == "shm":
+        segment.close()
+
+
+def _spawn(mode: str, cache_path: str, name: str) -> dict:
+    command = [sys.executable, __file__, "--child", mode, "--cache", cache_path, "--name", name]
+    out = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=800_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--name", default=f"RAPID_VFS_Cache_bench_{os.getpid()}")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--child", choices=MODES)
+    parser.add_argument("--cache")
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.cache, args.name)
+        return 0
+
+    print(f"=== RAPID shared-memory handoff benchmark ({args.files:,} files, {args.repeats} runs) ===\n")
+    rapid = _load_plugin()
+    out_dir = tempfile.mkdtemp(prefix="rapid_bench_")
+    handoff = _load_plugin("engine").SharedCacheHandoff(args.name)
+    try:
+        cache_path = os.path.join(out_dir, "rapid_vfs_cache.bin")
+        write_synthetic_cache(rapid, args.files, cache_path)
+        t0 = time.perf_counter()
+        if not handoff.publish(cache_path, 0):
+            raise RuntimeError("publishing the synthetic cache failed")
+        publish_ms = (time.perf_counter() - t0) * 1000
+        # The modes take turns, so drift in machine speed hits both alike.
+        runs: dict[str, list[dict]] = {mode: [] for mode in MODES}
+        for _ in range(args.repeats):
+            for mode in MODES:
+                runs[mode].append(_spawn(mode, cache_path, args.name))
+        cache_bytes = os.path.getsize(cache_path)
+        payload_bytes = rapid._cache_uncompressed_size(cache_path)
+    finally:
+        handoff.release()
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    results = {
+        mode: {
+            "ready_ms": statistics.median(run["ready_ms"] for run in runs[mode]),
+            "parsed_ms": statistics.median(run["parsed_ms"] for run in runs[mode]),
+            "paths": runs[mode][0]["paths"],
+        }
+        for mode in MODES
+    }
+    results["disk"]["end_to_end_ms"] = results["disk"]["parsed_ms"]
+    results["shm"]["end_to_end_ms"] = publish_ms + results["shm"]["parsed_ms"]
+    if results["disk"]["paths"] != results["shm"]["paths"]:
+        raise RuntimeError("disk and shared-memory loads returned different path counts")
+
+    print(f"cache: {cache_bytes / (1 << 20):.1f} MiB compressed, {payload_bytes / (1 << 20):.1f} MiB in shared memory")
+    print(f"publish (producer, once per launch): {publish_ms:.1f} ms\n")
+    print(f"{'median of ' + str(args.repeats):24}{'disk+inflate':>16}{'shared memory':>16}")
+    for label, key in (("bytes ready (ms)", "ready_ms"), ("paths parsed (ms)", "parsed_ms")):
+        print(f"{label:24}{results['disk'][key]:>16.1f}{results['shm'][key]:>16.1f}")
+    print(f"{'end to end (ms)':24}{results['disk']['end_to_end_ms']:>16.1f}{results['shm']['end_to_end_ms']:>16.1f}")
+    print(f"{'paths':24}{results['disk']['paths']:>16,}{results['shm']['paths']:>16,}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "files": args.files,
+                    "repeats": args.repeats,
+                    "cache_bytes": cache_bytes,
+                    "payload_bytes": payload_bytes,
+                    "publish_ms": publish_ms,
+                    **results,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
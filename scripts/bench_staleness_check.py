@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Benchmark the sampled staleness check (sample_verification) on a synthetic VFS tree.
+
+Builds a synthetic tree, derives the cached paths from it with the plugin's default
+directory rules, then measures:
+
+- the cost of one sampled check against a full walk of the tree (the scan part of a rebuild,
+  without origin resolution, which makes the real rebuild slower still);
+- the detection rate for injected changes: files added or removed in random directories,
+  files added to directories that only hold subdirectories (such as a mod's top folder),
+  new directories (with the files directly inside or two levels down) and removed
+  directories, at several change counts. Directories are
+  picked uniformly, so a single change in a small directory is the hard case.
+
+An unchanged tree must never be reported stale; the script fails if it is.
+
+    python scripts/bench_staleness_check.py [--files 800000] [--sample 300] [--trials 20] [--json out.json]
+
+Each check re-reads every cached path, so the default run takes several minutes.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from bench_path_accumulator import EXTS, ROOTS, _load_plugin
+
+KINDS = ("add file", "remove file", "add file to parent", "new directory", "nested new directory", "remove directory")
+CHANGE_COUNTS = (1, 10, 100)
+
+
+class Node:
+    """Just enough of mobase.IFileTree for the verifier and the walk: name, isDir, path, iteration."""
+
+    __slots__ = ("_name", "_parent", "_is_dir", "children")
+
+    def __init__(self, name: str | None, parent: "Node | None", is_dir: bool):
+        self._name = name
+        self._parent = parent
+        self._is_dir = is_dir
+        self.children: list[Node] = []
+
+    def name(self) -> str:
+        return self._name
+
+    def isDir(self) -> bool:
+        return self._is_dir
+
+    def path(self, sep: str = "\\") -> str:
+        parts = []
+        node = self
+        while node is not None and node._name is not None:
+            parts.append(node._name)
+            node = node._parent
+        return sep.join(reversed(parts))
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def child(self, name: str, is_dir: bool) -> "Node":
+        node = Node(name, self, is_dir)
+        self.children.append(node)
+        return node
+
+
+def build_tree(files: int, seed: int) -> Node:
+    """Mods of nested directories under each engine directory, with file counts per directory
+    drawn from a long-tailed distribution (most hold a few files, some hold hundreds)."""
+    rng = random.Random(seed)
+    root = Node(None, None, True)
+    engine_directories = {directory: root.child(directory, True) for directory in ROOTS}
+    created = 0
+    mod = 0
+    while created < files:
+        directory = ROOTS[mod % len(ROOTS)]
+        exts = EXTS[directory]
+        mod_node = engine_directories[directory].child(f"Mod{mod:04d}", True)
+        for sub in range(rng.randint(1, 12)):
+            node = mod_node.child(f"Sub{sub:02d}", True)
+            if rng.random() < 0.5:
+                node = node.child(f"Group{rng.randint(0, 9)}", True)
+            for i in range(min(files - created, int(rng.paretovariate(1.2) * 4))):
+                node.child(f"Asset_{created:07d}{exts[i % len(exts)]}", False)
+                created += 1
+        mod += 1
+    return root
+
+
+def full_walk(tree: Node, directory_filters) -> list[str]:
+    """Every kept path, the way the build's workers walk the tree."""
+    paths = []
+    stack = [(entry, directory_filters[entry.name().lower()]) for entry in tree
+             if entry.isDir() and entry.name().lower() in directory_filters]
+    while stack:
+        node, directory_filter = stack.pop()
+        for entry in node:
+            if entry.isDir():
+                stack.append((entry, directory_filter))
+                continue
+            name = entry.name()
+            dot = name.rfind(".")
+            ext = name[dot:].lower() if dot > 0 else ""
+            entry_path = entry.path("\\")
+            if directory_filter.rejection(entry_path, name, ext) is None:
+                paths.append(entry_path)
+    return paths
+
+
+def _find(tree: Node, directory: str) -> Node:
+    node = tree
+    for part in directory.split("\\"):
+        node = next(entry for entry in node if entry.isDir() and entry.name().lower() == part)
+    return node
+
+
+def inject(tree: Node, kind: str, directory: str, serial: int):
+    """Apply one change in directory; return a callable that undoes it."""
+    node = _find(tree, directory)
+    files = [entry for entry in node.children if not entry.isDir()]
+    if kind == "add file":
+        added = node.child(f"Injected_{serial}{files[0].name()[files[0].name().rfind('.'):]}", False)
+        return lambda: node.children.remove(added)
+    if kind == "add file to parent":
+        ext = EXTS[directory.split("\\", 1)[0]][0]
+        added = node.child(f"Injected_{serial}{ext}", False)
+        return lambda: node.children.remove(added)
+    if kind == "remove file":
+        removed = files[serial % len(files)]
+        node.children.remove(removed)
+        return lambda: node.children.append(removed)
+    if kind == "new directory":
+        added = node.child(f"InjectedDir_{serial}", True)
+        added.child(files[0].name(), False)
+        return lambda: node.children.remove(added)
+    if kind == "nested new directory":
+        added = node.child(f"InjectedDir_{serial}", True)
+        added.child("Sub", True).child("Deeper", True).child(files[0].name(), False)
+        return lambda: node.children.remove(added)
+    parent = node._parent
+    parent.children.remove(node)
+    return lambda: parent.children.append(node)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=800_000)
+    parser.add_argument("--sample", type=int, default=300, help="directories per check (sample_directories)")
+    parser.add_argument("--trials", type=int, default=20, help="checks per change kind and count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    rapid = _load_plugin()
+    engine = _load_plugin("engine")
+    defaults = _load_plugin("defaults")
+    directory_filters = engine._compile_directory_filters(
+        ";".join(defaults.DEFAULT_DIRECTORY_RULES), frozenset(defaults.EXCLUDED_EXTENSIONS)
+    )
+    print(f"=== RAPID sampled staleness check benchmark ({args.files:,} files, {args.sample} directories) ===\n")
+    tree = build_tree(args.files, args.seed)
+    t0 = time.perf_counter()
+    paths = [rapid._normalize_path(path) for path in full_walk(tree, directory_filters)]
+    walk_ms = (time.perf_counter() - t0) * 1000
+    _, root_counter = rapid._compute_path_counters(paths)
+    directories = sorted({path[len(rapid.DATA_PREFIX) :].rpartition("\\")[0] for path in paths})
+    # Removing a directory that holds another sampled one would orphan the second change.
+    parents = {directory.rpartition("\\")[0] for directory in directories}
+    leaves = [directory for directory in directories if directory not in parents]
+    cached_directories = set(directories)
+    ancestors = set()
+    for directory in directories:
+        while directory:
+            directory = directory.rpartition("\\")[0]
+            if directory and directory not in cached_directories:
+                ancestors.add(directory)
+    candidates_by_kind = {"remove directory": leaves, "add file to parent": sorted(ancestors)}
+
+    def check(seed: int):
+        return engine._verify_sample(tree, directory_filters, paths, root_counter, args.sample, random.Random(seed))
+
+    costs = []
+    for trial in range(args.trials):
+        t0 = time.perf_counter()
+        report = check(args.seed + trial)
+        costs.append((time.perf_counter() - t0) * 1000)
+        if not report.current:
+            raise RuntimeError(f"unchanged tree reported stale: {report.differences[:3]}")
+
+    detection: dict[str, dict[int, float]] = {}
+    for kind in KINDS:
+        detection[kind] = {}
+        for count in CHANGE_COUNTS:
+            detected = 0
+            for trial in range(args.trials):
+                rng = random.Random(f"{args.seed}:{kind}:{count}:{trial}")
+                candidates = candidates_by_kind.get(kind, directories)
+                undo = [inject(tree, kind, directory, serial)
+                        for serial, directory in enumerate(rng.sample(candidates, count))]
+                if not check(rng.randrange(1 << 30)).current:
+                    detected += 1
+                for step in reversed(undo):
+                    step()
+            detection[kind][count] = detected / args.trials
+
+    check_ms = statistics.median(costs)
+    print(f"cached paths: {len(paths):,} in {len(directories):,} directories")
+    print(f"full walk of the tree: {walk_ms:,.0f} ms")
+    print(f"sampled check (median of {args.trials}): {check_ms:,.0f} ms, confidence {report.confidence:.1%}")
+    print(f"false positives on the unchanged tree: 0 of {args.trials}\n")
+    print(f"{'detection rate':24}" + "".join(f"{f'{count} change(s)':>16}" for count in CHANGE_COUNTS))
+    for kind in KINDS:
+        print(f"{kind:24}" + "".join(f"{detection[kind][count]:>16.0%}" for count in CHANGE_COUNTS))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "files": args.files,
+                    "paths": len(paths),
+                    "directories": len(directories),
+                    "sample": args.sample,
+                    "trials": args.trials,
+                    "full_walk_ms": walk_ms,
+                    "check_ms": check_ms,
+                    "confidence": report.confidence,
+                    "detection": detection,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
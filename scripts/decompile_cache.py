@@ -7,18 +7,38 @@ import zlib
 from collections import Counter
 from datetime import datetime, timezone
 
+RAP2_MAGIC = b"RAP2"
+RAP2_VERSION = 4
+SECTION_ENTRY = struct.Struct("<4sIIQQQ")  # type, CRC-32, codec, offset, stored length, length
+SECTION_CODEC_STORED = 0
+SECTION_CODEC_ZLIB = 1
 
-def _parse_metadata(raw, path_block_end):
-    remaining = len(raw) - path_block_end
-    if remaining < 4:
-        return None
-    meta_len = struct.unpack_from("<I", raw, len(raw) - 4)[0]
-    if meta_len <= 0 or meta_len > remaining - 4 or meta_len > (1 << 20):
-        return None
-    start = len(raw) - 4 - meta_len
-    if start < path_block_end:
-        return None
-    meta = raw[start : start + meta_len]
+
+def _read_sections(raw):
+    """Return (path count, {section type: payload}) from the header's section directory.
+
+    Each section is stored (codec 0) or zlib-compressed (codec 1) on its own.
+    """
+    if len(raw) < 20 or raw[:4] != RAP2_MAGIC:
+        raise ValueError("not a RAP2 cache")
+    version, num_files = struct.unpack_from("<II", raw, 4)
+    if version != RAP2_VERSION:
+        raise ValueError(f"format version {version}, expected {RAP2_VERSION}")
+    _, entry_size, section_count = struct.unpack_from("<HHI", raw, 12)
+    sections = {}
+    for i in range(section_count):
+        section_type, crc, codec, offset, stored_length, length = SECTION_ENTRY.unpack_from(raw, 20 + i * entry_size)
+        payload = raw[offset : offset + stored_length]
+        if codec == SECTION_CODEC_ZLIB:
+            payload = zlib.decompress(payload)
+        elif codec != SECTION_CODEC_STORED:
+            continue
+        if len(payload) == length and zlib.crc32(payload) == crc:
+            sections.setdefault(section_type, payload)
+    return num_files, sections
+
+
+def _parse_metadata(meta):
     off = 0
     if off + 8 > len(meta):
         return None
@@ -68,23 +88,21 @@ def main():
         cache_path = sys.argv[1]
 
     with open(cache_path, "rb") as f:
-        compressed = f.read()
+        raw = f.read()
 
-    raw = zlib.decompress(compressed)
+    num_files, sections = _read_sections(raw)
+    records = sections.get(b"PATH", b"")
     offset = 0
-    (num_files,) = struct.unpack_from("<I", raw, offset)
-    offset += 4
 
     paths = []
     for _ in range(num_files):
-        (path_len,) = struct.unpack_from("<H", raw, offset)
-        offset += 2
-        path = raw[offset : offset + path_len].decode("utf-8")
+        (path_len,) = struct.unpack_from("<H", records, offset + 8)
+        offset += 10
+        path = records[offset : offset + path_len].decode("utf-8")
         offset += path_len
         paths.append(path)
 
-    path_block_end = offset
-    parsed = _parse_metadata(raw, path_block_end)
+    parsed = _parse_metadata(sections[b"META"]) if b"META" in sections else None
     if parsed is not None:
         build_time_ms, ext_counter, root_counter = parsed
     else:
@@ -144,7 +144,7 @@ if (-not $skseChanged -and -not $mo2Changed) {
 }
 
 $cmakePath = Join-Path $repoRoot "CMakeLists.txt"
-$mo2Path = Join-Path $repoRoot "MO2 Plugin/RAPID.py"
+$mo2Path = Join-Path $repoRoot "MO2 Plugin/RAPID/plugins.py"
 
 $cmakeContent = Get-Content -Path $cmakePath -Raw
 $projectMatch = [regex]::Match($cmakeContent, 'project\((?<name>[A-Za-z0-9_\-]+)\s+VERSION\s+(?<major>\d+)\.(?<minor>\d+)\.(?<patch>\d+)')
@@ -178,7 +178,7 @@ $mo2Content = Get-Content -Path $mo2Path -Raw
 $versionPattern = 'mobase\.VersionInfo\(\d+,\s*\d+,\s*\d+,\s*mobase\.ReleaseType\.FINAL\)'
 $mo2Matches = [regex]::Matches($mo2Content, $versionPattern)
 if ($mo2Matches.Count -eq 0) {
-    throw "Failed to find MO2 VersionInfo entries in RAPID.py"
+    throw "Failed to find MO2 VersionInfo entries in RAPID/plugins.py"
 }
 $updatedMo2 = [regex]::Replace(
     $mo2Content,
@@ -235,6 +235,7 @@ if ($mo2Changed) {
         $pluginsRoot = Join-Path $mo2Stage "plugins"
         New-Item -ItemType Directory -Path $pluginsRoot -Force | Out-Null
         Copy-Item -Path (Join-Path $mo2PluginPath "*") -Destination $pluginsRoot -Recurse -Force
+        Get-ChildItem -Path $pluginsRoot -Recurse -Directory -Filter "__pycache__" | Remove-Item -Recurse -Force
         if (Test-Path $mo2Zip) {
             Remove-Item -Force $mo2Zip
         }
@@ -304,7 +305,7 @@ $changelogFile = Join-Path $releaseDir "release-notes-$nextVersion.md"
 if ($DryRun) {
     Write-Host "Dry run complete."
     Write-Host "Next version: $nextVersion"
-    Write-Host "Would update: CMakeLists.txt, MO2 Plugin/RAPID.py"
+    Write-Host "Would update: CMakeLists.txt, MO2 Plugin/RAPID/plugins.py"
     Write-Host "Would create tag: $tagName"
     Write-Host "Release notes: $changelogFile"
     Write-Host ""
@@ -323,7 +324,7 @@ Set-Content -Path $changelogFile -Value $changelog -NoNewline -Encoding UTF8
 Set-Content -Path $cmakePath -Value $updatedCmake -NoNewline -Encoding UTF8
 Set-Content -Path $mo2Path -Value $updatedMo2 -NoNewline -Encoding UTF8
 
-Invoke-Git -Args @("add", "--", "CMakeLists.txt", "MO2 Plugin/RAPID.py")
+Invoke-Git -Args @("add", "--", "CMakeLists.txt", "MO2 Plugin/RAPID/plugins.py")
 Invoke-Git -Args @("commit", "-m", "Release $tagName")
 Invoke-Git -Args @("push")
 
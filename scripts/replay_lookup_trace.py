@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""Replay a RAPID lookup trace against candidate loader index structures.
+
+Loads a RAP2 cache, replays the probed paths against several ways the SKSE loader could
+index it, and reports throughput, memory and collision statistics for each:
+
+    dict-of-lists    hash -> list of record ids (today's unordered_map<u64, vector<u32>>)
+    sorted-array     sorted u64 hashes with parallel record ids, binary search
+    open-addressing  power-of-two table of u64 keys and u32 ids, linear probing
+    filter+lookup    Bloom filter (10 bits per entry) in front of the sorted array
+    hot+dict         the cache's hot set section (sorted hashes, binary search) in front
+                     of dict-of-lists, as the loader does while its full index is still
+                     building; only when the cache has one or --hot-set derives one
+
+Traces come from the SKSE plugin (rapid_lookup_trace.tsv in the SKSE log folder, written
+while PerformanceDiagnostics is on) or are synthesized from the cache with Zipf-distributed
+hits and a configurable miss ratio. Runs offline; no game, MO2 or Windows needed.
+
+    python scripts/replay_lookup_trace.py rapid_vfs_cache.bin --trace rapid_lookup_trace.tsv
+    python scripts/replay_lookup_trace.py rapid_vfs_cache.bin --synthetic 500000 --miss-ratio 0.3
+    python scripts/replay_lookup_trace.py --synthetic-cache 800000 --synthetic 500000 --json out.json
+
+Caches built with access_ordering carry a hot set section; the report then shows how many
+of the trace's probes and hits it answers. Score it on a trace from a later session than
+the one the cache was built from, or the coverage is optimistic.
+
+Throughput is pure Python and only meaningful as a ranking; memory is reported both as
+measured under tracemalloc and as a model of the equivalent native layout (MSVC node and
+bucket sizes for the unordered_map). Path storage is shared by all structures and excluded.
+"""
+import argparse
+import json
+import math
+import random
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import partial
+
+RAP2_MAGIC = b"RAP2"
+RAP2_VERSION = 4
+SECTION_ENTRY = struct.Struct("<4sIIQQQ")  # type, CRC-32, codec, offset, stored length, length
+SECTION_CODEC_ZLIB = 1
+DATA_PREFIX = "data\\"
+MASK64 = 0xFFFFFFFFFFFFFFFF
+FIB64 = 0x9E3779B97F4A7C15
+TRACE_HEADER = "# RAPID lookup trace v1\n# t_us\top\tresult\tcandidates\tpath\n"
+
+
+def normalize_path(raw: str) -> str:
+    """Same normalization as the plugin and the SKSE NormalizePath."""
+    lowered = raw.strip(" \t").replace("/", "\\").lower()
+    while "\\\\" in lowered:
+        lowered = lowered.replace("\\\\", "\\")
+    lowered = lowered.strip("\\")
+    if not lowered.startswith(DATA_PREFIX):
+        lowered = DATA_PREFIX + lowered
+    return lowered
+
+
+def rapid_hash64(normalized: bytes) -> int:
+    """BSA-style hash over normalized UTF-8 bytes, byte-for-byte the SKSE ComputeRapidHash64."""
+    dot = normalized.rfind(b".")
+    root, ext = (normalized, b"") if dot == -1 else (normalized[:dot], normalized[dot:])
+    low = 0
+    if root:
+        low = root[-1]
+        if len(root) > 2:
+            low |= root[-2] << 8
+        low |= (len(root) & 0xFFFFFFFF) << 16
+        low |= root[0] << 24
+        low &= 0xFFFFFFFF
+    if ext == b".kf":
+        low |= 0x80
+    elif ext == b".nif":
+        low |= 0x8000
+    elif ext == b".dds":
+        low |= 0x8080
+    elif ext == b".wav":
+        low |= 0x80000000
+    low &= 0xFFFFFFFF
+    mid_hash = 0
+    for byte in root[1:-2]:
+        mid_hash = ((mid_hash * 0x1003F) + byte) & 0xFFFFFFFF
+    ext_hash = 0
+    for byte in ext:
+        ext_hash = ((ext_hash * 0x1003F) + byte) & 0xFFFFFFFF
+    return ((((mid_hash + ext_hash) & 0xFFFFFFFF) << 32) | low) & MASK64
+
+
+def read_cache(cache_path: str) -> tuple[list[bytes], array, array | None]:
+    """Return the normalized UTF-8 paths, stored hashes and hot set records of a RAP2 cache.
+
+    The hot set is None when the cache has no hot set section.
+    """
+    with open(cache_path, "rb") as f:
+        raw = f.read()
+    if len(raw) < 12 or raw[:4] != RAP2_MAGIC:
+        raise ValueError(f"{cache_path}: not a RAP2 cache")
+    version, count = struct.unpack_from("<II", raw, 4)
+    if version != RAP2_VERSION:
+        raise ValueError(f"{cache_path}: format version {version}, expected {RAP2_VERSION}")
+    _, entry_size, section_count = struct.unpack_from("<HHI", raw, 12)
+    sections = {}
+    for i in range(section_count):
+        section_type, _, codec, offset, stored_length, _ = SECTION_ENTRY.unpack_from(raw, 20 + i * entry_size)
+        if section_type in (b"PATH", b"HOTS") and section_type not in sections:
+            payload = raw[offset : offset + stored_length]
+            sections[section_type] = zlib.decompress(payload) if codec == SECTION_CODEC_ZLIB else payload
+    if b"PATH" not in sections:
+        raise ValueError(f"{cache_path}: no path records section")
+    hot_records = None
+    if b"HOTS" in sections:
+        hot = sections[b"HOTS"]
+        (hot_count,) = struct.unpack_from("<I", hot, 0)
+        if len(hot) != 4 + 12 * hot_count:
+            raise ValueError(f"{cache_path}: malformed hot set section")
+        hot_records = array("I", struct.unpack_from(f"<{hot_count}I", hot, 4 + 8 * hot_count))
+    records = sections[b"PATH"]
+    offset = 0
+    paths: list[bytes] = []
+    hashes = array("Q")
+    unpack_record = struct.Struct("<QH").unpack_from
+    for _ in range(count):
+        path_hash, path_len = unpack_record(records, offset)
+        offset += 10
+        paths.append(records[offset : offset + path_len])
+        hashes.append(path_hash)
+        offset += path_len
+    return paths, hashes, hot_records
+
+
+def synthetic_cache(count: int, seed: int) -> tuple[list[bytes], array]:
+    rnd = random.Random(seed)
+    roots = (("textures", ".dds"), ("meshes", ".nif"), ("sound", ".wav"), ("scripts", ".pex"), ("interface", ".swf"))
+    seen: set[bytes] = set()
+    paths: list[bytes] = []
+    while len(paths) < count:
+        root, ext = roots[rnd.randrange(len(roots))]
+        path = f"data\\{root}\\mod{rnd.randrange(2000):04d}\\sub{rnd.randrange(40)}\\asset_{rnd.randrange(1 << 30)}{ext}"
+        encoded = path.encode("utf-8")
+        if encoded not in seen:
+            seen.add(encoded)
+            paths.append(encoded)
+    return paths, array("Q", (rapid_hash64(path) for path in paths))
+
+
+class Probe:
+    __slots__ = ("op", "path", "hash", "recorded")
+
+    def __init__(self, op: str, path: bytes, path_hash: int, recorded: str):
+        self.op = op
+        self.path = path
+        self.hash = path_hash
+        self.recorded = recorded
+
+
+def read_trace(trace_path: str) -> list[Probe]:
+    probes: list[Probe] = []
+    hashes: dict[bytes, int] = {}
+    with open(trace_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t", 4)
+            if len(fields) == 5:
+                op, recorded, raw_path = fields[1], fields[2], fields[4]
+            else:
+                op, recorded, raw_path = "stream", "", fields[-1]
+            path = normalize_path(raw_path).encode("utf-8")
+            path_hash = hashes.get(path)
+            if path_hash is None:
+                path_hash = hashes[path] = rapid_hash64(path)
+            probes.append(Probe(op, path, path_hash, recorded))
+    return probes
+
+
+def synthetic_trace(
+    paths: list[bytes], hashes: array, count: int, miss_ratio: float, zipf: float, seed: int
+) -> list[Probe]:
+    """Zipf-distributed hits over a random popularity order, plus near-miss paths."""
+    rnd = random.Random(seed)
+    order = list(range(len(paths)))
+    rnd.shuffle(order)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(order) + 1):
+        total += 1.0 / rank**zipf
+        cum_weights.append(total)
+    ops = ("stream", "async", "info1")
+    op_weights = (5, 3, 2)
+    misses: dict[bytes, int] = {}
+    probes: list[Probe] = []
+    picks = rnd.choices(order, cum_weights=cum_weights, k=count)
+    for record in picks:
+        op = rnd.choices(ops, op_weights)[0]
+        if rnd.random() < miss_ratio:
+            path = paths[record]
+            dot = path.rfind(b".")
+            path = path[:dot] + b"_n" + path[dot:] if dot > 0 else path + b"_n"
+            path_hash = misses.get(path)
+            if path_hash is None:
+                path_hash = misses[path] = rapid_hash64(path)
+            probes.append(Probe(op, path, path_hash, ""))
+        else:
+            probes.append(Probe(op, paths[record], hashes[record], ""))
+    return probes
+
+
+def write_trace(trace_path: str, probes: list[Probe]) -> None:
+    with open(trace_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(TRACE_HEADER)
+        for t_us, probe in enumerate(probes):
+            f.write(f"{t_us}\t{probe.op}\t{probe.recorded or '-'}\t0\t{probe.path.decode('utf-8')}\n")
+
+
+def _mix(path_hash: int) -> int:
+    return (path_hash * FIB64) & MASK64
+
+
+class DictOfLists:
+    name = "dict-of-lists"
+
+    def __init__(self, paths: list[bytes], hashes: array):
+        self.paths = paths
+        self.index: dict[int, list[int]] = {}
+        for record, path_hash in enumerate(hashes):
+            bucket = self.index.get(path_hash)
+            if bucket is None:
+                self.index[path_hash] = [record]
+            else:
+                bucket.append(record)
+
+    def lookup(self, path: bytes, path_hash: int) -> tuple[int, int]:
+        """Return (record or -1, candidate paths compared)."""
+        bucket = self.index.get(path_hash)
+        if bucket is None:
+            return -1, 0
+        for record in bucket:
+            if self.paths[record] == path:
+                return record, len(bucket)
+        return -1, len(bucket)
+
+    def native_bytes(self) -> int:
+        # MSVC list node: two pointers + u64 key + vector (3 pointers), plus the vector's heap
+        # block and allocator overhead; buckets hold two iterators each at load factor <= 1.
+        nodes = len(self.index)
+        buckets = 1 << max(3, math.ceil(math.log2(max(nodes, 1))))
+        return nodes * (48 + 16 + 16 + 16) + buckets * 16
+
+    def stats(self) -> dict:
+        sizes = Counter(len(bucket) for bucket in self.index.values())
+        return {
+            "distinct_hashes": len(self.index),
+            "colliding_hashes": sum(count for size, count in sizes.items() if size > 1),
+            "max_bucket": max(sizes) if sizes else 0,
+        }
+
+
+class SortedHashArray:
+    name = "sorted-array"
+
+    def __init__(self, paths: list[bytes], hashes: array):
+        self.paths = paths
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        self.hashes = array("Q", (hashes[record] for record in order))
+        self.ids = array("I", order)
+
+    def lookup(self, path: bytes, path_hash: int) -> tuple[int, int]:
+        hashes = self.hashes
+        i = bisect_left(hashes, path_hash)
+        compared = 0
+        while i < len(hashes) and hashes[i] == path_hash:
+            record = self.ids[i]
+            compared += 1
+            if self.paths[record] == path:
+                return record, compared
+            i += 1
+        return -1, compared
+
+    def native_bytes(self) -> int:
+        return len(self.hashes) * 12
+
+    def stats(self) -> dict:
+        return {"search_steps": math.ceil(math.log2(max(len(self.hashes), 2)))}
+
+
+class OpenAddressing:
+    name = "open-addressing"
+
+    def __init__(self, paths: list[bytes], hashes: array, load_factor: float = 0.5):
+        self.paths = paths
+        capacity = 1 << max(3, math.ceil(math.log2(max(len(hashes), 1) / load_factor)))
+        self.shift = 64 - capacity.bit_length() + 1
+        self.mask = capacity - 1
+        self.keys = array("Q", bytes(8 * capacity))
+        self.ids = array("I", bytes(4 * capacity))
+        max_displacement = 0
+        total_displacement = 0
+        for record, path_hash in enumerate(hashes):
+            slot = _mix(path_hash) >> self.shift
+            displacement = 0
+            while self.ids[slot]:
+                slot = (slot + 1) & self.mask
+                displacement += 1
+            self.keys[slot] = path_hash
+            self.ids[slot] = record + 1
+            max_displacement = max(max_displacement, displacement)
+            total_displacement += displacement
+        self.max_displacement = max_displacement
+        self.mean_displacement = total_displacement / max(len(hashes), 1)
+        self.load = len(hashes) / capacity
+
+    def lookup(self, path: bytes, path_hash: int) -> tuple[int, int]:
+        keys = self.keys
+        ids = self.ids
+        slot = _mix(path_hash) >> self.shift
+        compared = 0
+        while True:
+            stored = ids[slot]
+            if not stored:
+                return -1, compared
+            if keys[slot] == path_hash:
+                compared += 1
+                if self.paths[stored - 1] == path:
+                    return stored - 1, compared
+            slot = (slot + 1) & self.mask
+
+    def native_bytes(self) -> int:
+        return len(self.keys) * 12
+
+    def stats(self) -> dict:
+        return {
+            "load_factor": round(self.load, 3),
+            "mean_displacement": round(self.mean_displacement, 3),
+            "max_displacement": self.max_displacement,
+        }
+
+
+class FilteredLookup:
+    name = "filter+lookup"
+
+    def __init__(self, paths: list[bytes], hashes: array, bits_per_entry: int = 10):
+        self.inner = SortedHashArray(paths, hashes)
+        self.bits = max(64, len(hashes) * bits_per_entry)
+        self.k = max(1, round(bits_per_entry * math.log(2)))
+        self.filter = bytearray((self.bits + 7) // 8)
+        for path_hash in set(hashes):
+            for bit in self._bits(path_hash):
+                self.filter[bit >> 3] |= 1 << (bit & 7)
+        self.rejected = 0
+        self.false_positives = 0
+
+    def _bits(self, path_hash: int):
+        h1 = _mix(path_hash)
+        h2 = _mix(h1 ^ (path_hash >> 29)) | 1
+        for i in range(self.k):
+            yield ((h1 + i * h2) & MASK64) % self.bits
+
+    def lookup(self, path: bytes, path_hash: int) -> tuple[int, int]:
+        bloom = self.filter
+        bits = self.bits
+        h1 = _mix(path_hash)
+        h2 = _mix(h1 ^ (path_hash >> 29)) | 1
+        for i in range(self.k):
+            bit = ((h1 + i * h2) & MASK64) % bits
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                self.rejected += 1
+                return -1, 0
+        record, compared = self.inner.lookup(path, path_hash)
+        if record < 0 and compared == 0:
+            self.false_positives += 1
+        return record, compared
+
+    def native_bytes(self) -> int:
+        return len(self.filter) + self.inner.native_bytes()
+
+    def stats(self) -> dict:
+        return {
+            "filter_bits_per_entry": round(self.bits / max(len(self.inner.hashes), 1), 1),
+            "filter_hashes": self.k,
+            "filter_rejects": self.rejected,
+            "filter_false_positives": self.false_positives,
+        }
+
+
+class HotSetFirst:
+    name = "hot+dict"
+
+    def __init__(self, paths: list[bytes], hashes: array, hot_records: array):
+        self.inner = DictOfLists(paths, hashes)
+        self.paths = paths
+        entries = sorted((hashes[record], record) for record in hot_records)
+        self.hot_hashes = array("Q", (path_hash for path_hash, _ in entries))
+        self.hot_ids = array("I", (record for _, record in entries))
+        self.hot_hits = 0
+
+    def lookup(self, path: bytes, path_hash: int) -> tuple[int, int]:
+        hot_hashes = self.hot_hashes
+        i = bisect_left(hot_hashes, path_hash)
+        compared = 0
+        while i < len(hot_hashes) and hot_hashes[i] == path_hash:
+            record = self.hot_ids[i]
+            compared += 1
+            if self.paths[record] == path:
+                self.hot_hits += 1
+                return record, compared
+            i += 1
+        record, inner_compared = self.inner.lookup(path, path_hash)
+        return record, compared + inner_compared
+
+    def native_bytes(self) -> int:
+        return len(self.hot_hashes) * 12 + self.inner.native_bytes()
+
+    def stats(self) -> dict:
+        return {"hot_entries": len(self.hot_hashes), "hot_hits": self.hot_hits}
+
+
+STRUCTURES = (DictOfLists, SortedHashArray, OpenAddressing, FilteredLookup)
+
+
+def derive_hot_set(expected: list[int], size: int) -> array:
+    """The size most-probed records of a replayed trace, as a stand-in for a cache without one."""
+    counts = Counter(record for record in expected if record >= 0)
+    return array("I", (record for record, _ in counts.most_common(size)))
+
+
+def hot_set_summary(probes: list[Probe], expected: list[int], hot_records: array) -> dict:
+    """How much of the trace the hot set answers: share of probes, share of hits."""
+    hot = set(hot_records)
+    hits = sum(1 for record in expected if record >= 0)
+    hot_hits = sum(1 for record in expected if record in hot)
+    return {
+        "hot_set_entries": len(hot),
+        "hot_set_entries_touched": len(hot.intersection(expected)),
+        "hot_set_probe_coverage": round(hot_hits / max(len(probes), 1), 4),
+        "hot_set_hit_coverage": round(hot_hits / max(hits, 1), 4),
+    }
+
+
+def trace_summary(probes: list[Probe], expected: list[int], cache_size: int) -> dict:
+    counts = Counter(probe.path for probe in probes)
+    hits = sum(1 for record in expected if record >= 0)
+    ranked = [count for _, count in counts.most_common()]
+    summary = {
+        "probes": len(probes),
+        "unique_paths": len(counts),
+        "hits": hits,
+        "misses": len(probes) - hits,
+        "hit_ratio": round(hits / max(len(probes), 1), 4),
+        "ops": dict(Counter(probe.op for probe in probes)),
+        "cache_entries_touched": len({record for record in expected if record >= 0}),
+        "cache_entries": cache_size,
+    }
+    for share in (0.01, 0.1):
+        top = max(1, int(len(ranked) * share))
+        summary[f"traffic_top_{int(share * 100)}pct_paths"] = round(sum(ranked[:top]) / max(len(probes), 1), 4)
+    recorded = [probe for probe in probes if probe.recorded in ("hit", "miss")]
+    if recorded:
+        disagree = sum(
+            1 for probe, record in zip(probes, expected) if probe.recorded in ("hit", "miss")
+            and (probe.recorded == "hit") != (record >= 0)
+        )
+        summary["recorded_result_mismatches"] = disagree
+    return summary
+
+
+def measure(structure_cls, paths: list[bytes], hashes: array, probes: list[Probe], repeat: int):
+    # Build once under tracemalloc for memory and once untraced for time.
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    structure = structure_cls(paths, hashes)
+    traced_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del structure
+    t0 = time.perf_counter()
+    structure = structure_cls(paths, hashes)
+    build_seconds = time.perf_counter() - t0
+
+    lookup = structure.lookup
+    queries = [(probe.path, probe.hash) for probe in probes]
+    results: list[int] = []
+    compared_total = 0
+    best = math.inf
+    for attempt in range(repeat):
+        t0 = time.perf_counter()
+        if attempt == 0:
+            for path, path_hash in queries:
+                record, compared = lookup(path, path_hash)
+                results.append(record)
+                compared_total += compared
+        else:
+            for path, path_hash in queries:
+                lookup(path, path_hash)
+        best = min(best, time.perf_counter() - t0)
+    row = {
+        "structure": structure.name,
+        "build_seconds": round(build_seconds, 3),
+        "lookups_per_second": round(len(queries) / best) if best > 0 else None,
+        "traced_bytes": traced_bytes,
+        "native_bytes": structure.native_bytes(),
+        "string_compares_per_probe": round(compared_total / max(len(queries), 1), 4),
+    }
+    stats = structure.stats()
+    # Counters accumulate over every repeat; report the first pass only.
+    if isinstance(structure, FilteredLookup):
+        stats["filter_rejects"] //= repeat
+        stats["filter_false_positives"] //= repeat
+    elif isinstance(structure, HotSetFirst):
+        stats["hot_hits"] //= repeat
+    row.update(stats)
+    return row, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cache_path", nargs="?", help="rapid_vfs_cache.bin to index")
+    parser.add_argument("--synthetic-cache", type=int, metavar="N", help="index N synthetic paths instead of a cache")
+    parser.add_argument("--trace", help="rapid_lookup_trace.tsv (or one path per line)")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="replay N synthetic probes")
+    parser.add_argument("--miss-ratio", type=float, default=0.3)
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew of synthetic hits")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--hot-set",
+        type=int,
+        metavar="N",
+        help="without a hot set section in the cache, derive one from the N most-probed records of the "
+        "trace itself (optimistic: it is scored on the trace it came from)",
+    )
+    parser.add_argument("--write-trace", metavar="PATH", help="save the synthetic trace in the SKSE format")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+
+    if args.synthetic_cache:
+        paths, hashes = synthetic_cache(args.synthetic_cache, args.seed)
+        hot_records = None
+        source = "synthetic cache"
+    elif args.cache_path:
+        paths, hashes, hot_records = read_cache(args.cache_path)
+        source = args.cache_path
+    else:
+        parser.error("a cache path or --synthetic-cache is required")
+    if args.trace:
+        probes = read_trace(args.trace)
+        trace_source = args.trace
+    elif args.synthetic:
+        probes = synthetic_trace(paths, hashes, args.synthetic, args.miss_ratio, args.zipf, args.seed)
+        trace_source = f"synthetic (miss ratio {args.miss_ratio}, zipf {args.zipf})"
+        if args.write_trace:
+            write_trace(args.write_trace, probes)
+    else:
+        parser.error("--trace or --synthetic is required")
+
+    print("=== RAPID lookup trace replay ===\n")
+    print(f"Cache: {source} ({len(paths):,} entries)")
+    print(f"Trace: {trace_source} ({len(probes):,} probes)\n")
+
+    rows = []
+    expected: list[int] | None = None
+    for structure_cls in STRUCTURES:
+        row, results = measure(structure_cls, paths, hashes, probes, args.repeat)
+        if expected is None:
+            expected = results
+        elif results != expected:
+            raise RuntimeError(f"{row['structure']} disagrees with dict-of-lists")
+        rows.append(row)
+
+    summary = trace_summary(probes, expected or [], len(paths))
+    hot_source = "hot set section" if hot_records is not None else None
+    if hot_records is None and args.hot_set:
+        hot_records = derive_hot_set(expected or [], args.hot_set)
+        hot_source = "derived from this trace"
+    if hot_records is not None:
+        row, results = measure(partial(HotSetFirst, hot_records=hot_records), paths, hashes, probes, args.repeat)
+        if results != expected:
+            raise RuntimeError(f"{row['structure']} disagrees with dict-of-lists")
+        rows.append(row)
+        summary.update(hot_set_summary(probes, expected or [], hot_records))
+        summary["hot_set_source"] = hot_source
+    print(f"Hits: {summary['hits']:,} ({summary['hit_ratio']:.1%}), misses: {summary['misses']:,}")
+    print(f"Unique paths: {summary['unique_paths']:,}, cache entries touched: {summary['cache_entries_touched']:,}")
+    print(
+        f"Traffic to the hottest 1% / 10% of paths: "
+        f"{summary['traffic_top_1pct_paths']:.1%} / {summary['traffic_top_10pct_paths']:.1%}"
+    )
+    print("Ops: " + ", ".join(f"{op} {count:,}" for op, count in sorted(summary["ops"].items())))
+    if "recorded_result_mismatches" in summary:
+        print(f"Recorded hit/miss disagreeing with this cache: {summary['recorded_result_mismatches']:,}")
+    if hot_source is not None:
+        print(
+            f"Hot set ({hot_source}): {summary['hot_set_entries']:,} entries "
+            f"({summary['hot_set_entries_touched']:,} probed in this trace) answer "
+            f"{summary['hot_set_probe_coverage']:.1%} of probes, {summary['hot_set_hit_coverage']:.1%} of hits"
+        )
+    print()
+
+    print(f"{'structure':18}{'lookups/s':>12}{'build s':>9}{'traced MiB':>12}{'native MiB':>12}{'cmp/probe':>11}")
+    for row in rows:
+        print(
+            f"{row['structure']:18}{row['lookups_per_second']:>12,}{row['build_seconds']:>9.2f}"
+            f"{row['traced_bytes'] / (1 << 20):>12.1f}{row['native_bytes'] / (1 << 20):>12.1f}"
+            f"{row['string_compares_per_probe']:>11.3f}"
+        )
+    print()
+    for row in rows:
+        extra = {key: value for key, value in row.items() if key not in (
+            "structure", "build_seconds", "lookups_per_second", "traced_bytes", "native_bytes",
+            "string_compares_per_probe",
+        )}
+        print(f"{row['structure']:18}" + ", ".join(f"{key}={value}" for key, value in extra.items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cache": source, "trace": trace_source, "summary": summary, "structures": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Reference consumer for the shared-memory cache handoff (shared_memory_handoff).
+
+While the game runs, the MO2 plugin can publish the uncompressed RAP2 cache in a named
+shared-memory segment (RAPID_VFS_Cache). A loader attaches to it, checks that it matches
+the cache file it would otherwise read, and copies the path section out of the mapping
+in one piece to parse it. Anything unexpected (no segment, wrong magic or version, a cache file that was
+rebuilt since) falls back to reading the file and inflating its path section. This module depends on the
+standard library only, so it documents the layout for a native loader as well.
+
+Segment layout (little endian):
+
+    magic "RAPS", u32 version (1), u64 cache file size, u64 cache mtime (ns),
+    u64 payload length, then the RAP2 v4 cache with every section stored uncompressed
+    (codec 0), so section offsets are relative to the end of this header.
+
+The magic is written last and cleared first, so a reader never sees a half-filled segment.
+
+    python scripts/shm_cache_consumer.py [cache_path] [--name RAPID_VFS_Cache]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+SHARED_CACHE_NAME = "RAPID_VFS_Cache"
+SHARED_CACHE_MAGIC = b"RAPS"
+SHARED_CACHE_VERSION = 1
+SHARED_CACHE_HEADER = struct.Struct("<4sIQQQ")
+RAP2_MAGIC = b"RAP2"
+RAP2_VERSION = 4
+RAP2_HEADER = struct.Struct("<4sII")
+SECTION_DIRECTORY = struct.Struct("<HHI")
+SECTION_ENTRY = struct.Struct("<4sIIQQQ")  # type, CRC-32, codec, offset, stored length, length
+SECTION_CODEC_STORED = 0
+SECTION_CODEC_ZLIB = 1
+SECTION_PATHS = b"PATH"
+PATH_RECORD_HEAD = struct.Struct("<QH")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory | None:
+    """Open an existing segment without taking ownership of it."""
+    try:
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name, track=False)
+        if os.name != "posix":
+            return shared_memory.SharedMemory(name)
+    except (FileNotFoundError, OSError):
+        return None
+    # Before 3.13 attaching on POSIX registers the segment with the resource tracker, which
+    # would unlink it when this process exits and pull it out from under the producer. The
+    # registration also starts the tracker process, whose startup competes with the load for
+    # the CPU, so skip it rather than undo it.
+    register = resource_tracker.register
+    resource_tracker.register = lambda _name, _rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    except (FileNotFoundError, OSError):
+        return None
+    finally:
+        resource_tracker.register = register
+
+
+def locate_paths(buf, base: int = 0) -> tuple[object, int, int, int] | None:
+    """Find the PATH section of a RAP2 v4 cache starting at buf[base].
+
+    Returns (buffer, start, end, record count) with the records in buffer[start:end]: buf
+    itself when the section is stored, its inflated copy when it is compressed.
+    """
+    if len(buf) - base < RAP2_HEADER.size + SECTION_DIRECTORY.size:
+        return None
+    magic, version, count = RAP2_HEADER.unpack_from(buf, base)
+    if magic != RAP2_MAGIC or version != RAP2_VERSION:
+        return None
+    _, entry_size, section_count = SECTION_DIRECTORY.unpack_from(buf, base + RAP2_HEADER.size)
+    entries = base + RAP2_HEADER.size + SECTION_DIRECTORY.size
+    if entry_size < SECTION_ENTRY.size or entries + entry_size * section_count > len(buf):
+        return None
+    for i in range(section_count):
+        kind, crc, codec, offset, stored_length, length = SECTION_ENTRY.unpack_from(buf, entries + i * entry_size)
+        if kind == SECTION_PATHS:
+            break
+    else:
+        return None
+    start, end = base + offset, base + offset + stored_length
+    if end > len(buf):
+        return None
+    if codec == SECTION_CODEC_ZLIB:
+        try:
+            data = zlib.decompress(buf[start:end], bufsize=max(1, length))
+        except zlib.error:
+            return None
+        start, end = 0, len(data)
+    elif codec == SECTION_CODEC_STORED:
+        data = buf
+    else:
+        return None
+    if end - start != length or zlib.crc32(data[start:end]) != crc:
+        return None
+    return data, start, end, count
+
+
+def parse_records(data, start: int, end: int, count: int) -> list[tuple[int, str]] | None:
+    """Walk count path records in data[start:end]; see locate_paths.
+
+    A mapped segment is copied into bytes once up front: slicing and decoding a memoryview
+    per record costs more than the copy, and the walk then runs on plain offsets.
+    """
+    if not isinstance(data, bytes):
+        data = bytes(data[start:end])
+        start, end = 0, len(data)
+    unpack_head = PATH_RECORD_HEAD.unpack_from
+    head_size = PATH_RECORD_HEAD.size
+    records = []
+    append = records.append
+    pos = start
+    for _ in range(count):
+        if pos + head_size > end:
+            return None
+        path_hash, path_len = unpack_head(data, pos)
+        pos += head_size
+        if pos + path_len > end:
+            return None
+        append((path_hash, data[pos : pos + path_len].decode("utf-8")))
+        pos += path_len
+    return records
+
+
+def parse_paths(buf, base: int = 0) -> list[tuple[int, str]] | None:
+    """Parse the PATH section of a RAP2 v4 cache starting at buf[base]."""
+    located = locate_paths(buf, base)
+    return None if located is None else parse_records(*located)
+
+
+def load_from_disk(cache_path: str) -> list[tuple[int, str]] | None:
+    try:
+        with open(cache_path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    return parse_paths(raw)
+
+
+def load_from_shared_memory(cache_path: str, name: str = SHARED_CACHE_NAME) -> list[tuple[int, str]] | None:
+    """Path records from the published segment, or None when it is missing or does not match cache_path."""
+    segment = _attach(name)
+    if segment is None:
+        return None
+    try:
+        buf = segment.buf
+        if len(buf) < SHARED_CACHE_HEADER.size:
+            return None
+        magic, version, file_size, mtime_ns, payload_length = SHARED_CACHE_HEADER.unpack_from(buf, 0)
+        if magic != SHARED_CACHE_MAGIC or version != SHARED_CACHE_VERSION:
+            return None
+        try:
+            stat = os.stat(cache_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (file_size, mtime_ns):
+            return None
+        if SHARED_CACHE_HEADER.size + payload_length > len(buf):
+            return None
+        return parse_paths(buf[: SHARED_CACHE_HEADER.size + payload_length], SHARED_CACHE_HEADER.size)
+    finally:
+        del buf
+        segment.close()
+
+
+def load(cache_path: str, name: str = SHARED_CACHE_NAME) -> tuple[str, list[tuple[int, str]] | None]:
+    """Shared memory first, the cache file as the fallback. Returns (source, records)."""
+    records = load_from_shared_memory(cache_path, name)
+    if records is not None:
+        return "shared memory", records
+    return "disk", load_from_disk(cache_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "cache_path",
+        nargs="?",
+        default=os.path.join(os.path.dirname(__file__), "..", "cache", "rapid_vfs_cache.bin"),
+    )
+    parser.add_argument("--name", default=SHARED_CACHE_NAME, help="shared-memory segment name")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    source, records = load(args.cache_path, args.name)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if records is None:
+        print(f"{args.cache_path}: no usable shared-memory segment and no readable cache file.")
+        return 1
+    print(f"Loaded {len(records):,} paths from {source} in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Check that every physical source path recorded in rapid_vfs_cache.bin still exists.
+
+    python scripts/verify_cache_sources.py [cache_path] [--resolve data\\textures\\sky.dds ...]
+
+Exits 1 when any recorded file is missing, 2 when the cache has no physical source table.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MO2 Plugin")
+
+
+def _load_plugin(module: str = "cache_format"):
+    """Import a plugin module that needs neither mobase nor Qt: cache_format, engine or defaults."""
+    sys.path.insert(0, PLUGIN_DIR)
+    return importlib.import_module(f"RAPID.{module}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "cache_path",
+        nargs="?",
+        default=os.path.join(os.path.dirname(__file__), "..", "cache", "rapid_vfs_cache.bin"),
+    )
+    parser.add_argument("--resolve", nargs="*", default=[], metavar="PATH", help="print the physical file of PATH")
+    parser.add_argument("--show", type=int, default=20, help="missing files to list (default 20)")
+    args = parser.parse_args()
+
+    rapid = _load_plugin()
+    sources = rapid.read_physical_sources(args.cache_path)
+    if sources is None:
+        print(f"{args.cache_path}: invalid cache or no physical source table (enable physical_paths and rebuild).")
+        return 2
+
+    for path in args.resolve:
+        print(f"{path} -> {sources.resolve_physical(path) or '(not cached or archive-backed)'}")
+
+    t0 = time.perf_counter()
+    missing, unrecorded = sources.verify()
+    elapsed = time.perf_counter() - t0
+    recorded = len(sources.paths) - unrecorded
+    print("=== RAPID cache source verification ===\n")
+    print(f"Entries: {len(sources.paths):,} ({unrecorded:,} without a physical source)")
+    print(f"Mod roots: {len(sources.roots):,}")
+    print(f"Checked: {recorded:,} in {elapsed:.2f} s")
+    print(f"Missing: {len(missing):,}")
+    for path, physical in missing[: args.show]:
+        print(f"  {path} -> {physical}")
+    if len(missing) > args.show:
+        print(f"  … {len(missing) - args.show:,} more")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,17 +5,43 @@
 
 #include <zlib.h>
 
+#include <algorithm>
+#include <chrono>
 #include <cstdint>
+#include <cstring>
 #include <filesystem>
 #include <fstream>
 #include <string>
+#include <string_view>
+#include <system_error>
 #include <vector>
 
 namespace RAPID
 {
 	namespace
 	{
-		constexpr std::uint32_t kRap2Version = 2;
+		constexpr std::uint32_t kRap2Version = 4;
+		constexpr std::size_t kRap2HeaderSize = 12;
+		// u16 directory version, u16 entry size, u32 section count; newer directory versions
+		// only append fields to each entry, so entries are walked by their stored size.
+		constexpr std::size_t kSectionDirectoryHeaderSize = 8;
+		constexpr std::size_t kSectionEntrySize = 36;
+		constexpr std::uint32_t kCodecStored = 0;
+		constexpr std::uint32_t kCodecZlib = 1;
+		constexpr char kSectionPaths[4] = { 'P', 'A', 'T', 'H' };
+		constexpr char kSectionHotSet[4] = { 'H', 'O', 'T', 'S' };
+
+		// The header and directory are stored as is; each section is stored or zlib-compressed
+		// on its own at its file offset, so only the sections the loader needs are inflated.
+		struct SectionEntry
+		{
+			char type[4];
+			std::uint32_t crc;
+			std::uint32_t codec;
+			std::uint64_t offset;
+			std::uint64_t storedLength;
+			std::uint64_t length;
+		};
 
 		std::filesystem::path GetCachePath()
 		{
@@ -48,58 +74,136 @@ namespace RAPID
 			return true;
 		}
 
-		bool InflateCache(const std::vector<std::uint8_t>& compressed, std::vector<std::uint8_t>& uncompressed)
+		std::uint32_t ReadU32LE(const std::vector<std::uint8_t>& bytes, std::size_t offset)
 		{
-			z_stream stream{};
-			stream.next_in = const_cast<Bytef*>(reinterpret_cast<const Bytef*>(compressed.data()));
-			stream.avail_in = static_cast<uInt>(compressed.size());
+			return static_cast<std::uint32_t>(bytes[offset]) |
+			       (static_cast<std::uint32_t>(bytes[offset + 1]) << 8) |
+			       (static_cast<std::uint32_t>(bytes[offset + 2]) << 16) |
+			       (static_cast<std::uint32_t>(bytes[offset + 3]) << 24);
+		}
+
+		std::uint16_t ReadU16LE(const std::vector<std::uint8_t>& bytes, std::size_t offset)
+		{
+			return static_cast<std::uint16_t>(bytes[offset]) |
+			       (static_cast<std::uint16_t>(bytes[offset + 1]) << 8);
+		}
 
-			if (inflateInit(&stream) != Z_OK) {
-				SKSE::log::error("R.A.P.I.D. zlib inflateInit failed");
+		std::uint64_t ReadU64LE(const std::vector<std::uint8_t>& bytes, std::size_t offset)
+		{
+			return static_cast<std::uint64_t>(ReadU32LE(bytes, offset)) |
+			       (static_cast<std::uint64_t>(ReadU32LE(bytes, offset + 4)) << 32);
+		}
+
+		bool ReadSectionDirectory(const std::vector<std::uint8_t>& data, std::vector<SectionEntry>& outSections)
+		{
+			if (data.size() < kRap2HeaderSize + kSectionDirectoryHeaderSize) {
+				SKSE::log::error("R.A.P.I.D. RAP2 cache payload too small for section directory");
 				return false;
 			}
 
-			constexpr std::size_t kChunkSize = 1 << 20;
-			std::vector<std::uint8_t> chunk(kChunkSize);
-
-			int inflateResult = Z_OK;
-			do {
-				stream.next_out = reinterpret_cast<Bytef*>(chunk.data());
-				stream.avail_out = static_cast<uInt>(chunk.size());
-				inflateResult = inflate(&stream, Z_NO_FLUSH);
+			const std::size_t entrySize = ReadU16LE(data, kRap2HeaderSize + 2);
+			const std::uint32_t sectionCount = ReadU32LE(data, kRap2HeaderSize + 4);
+			const std::size_t entriesStart = kRap2HeaderSize + kSectionDirectoryHeaderSize;
+			if (entrySize < kSectionEntrySize || sectionCount > (data.size() - entriesStart) / entrySize) {
+				SKSE::log::error(
+					"R.A.P.I.D. RAP2 section directory is invalid (entry size={}, sections={})",
+					entrySize,
+					sectionCount);
+				return false;
+			}
 
-				if (inflateResult != Z_OK && inflateResult != Z_STREAM_END) {
-					inflateEnd(&stream);
-					SKSE::log::error("R.A.P.I.D. zlib inflate failed with error code {}", inflateResult);
+			outSections.clear();
+			outSections.reserve(sectionCount);
+			for (std::uint32_t i = 0; i < sectionCount; ++i) {
+				const std::size_t cursor = entriesStart + i * entrySize;
+				SectionEntry entry{};
+				std::memcpy(entry.type, data.data() + cursor, sizeof(entry.type));
+				entry.crc = ReadU32LE(data, cursor + 4);
+				entry.codec = ReadU32LE(data, cursor + 8);
+				entry.offset = ReadU64LE(data, cursor + 12);
+				entry.storedLength = ReadU64LE(data, cursor + 20);
+				entry.length = ReadU64LE(data, cursor + 28);
+				if (entry.offset > data.size() || entry.storedLength > data.size() - entry.offset) {
+					SKSE::log::error(
+						"R.A.P.I.D. RAP2 section {} lies outside the cache (offset={}, stored length={})",
+						std::string_view(entry.type, sizeof(entry.type)),
+						entry.offset,
+						entry.storedLength);
 					return false;
 				}
-
-				const auto produced = chunk.size() - static_cast<std::size_t>(stream.avail_out);
-				uncompressed.insert(uncompressed.end(), chunk.begin(), chunk.begin() + static_cast<std::ptrdiff_t>(produced));
-			} while (inflateResult != Z_STREAM_END);
-
-			inflateEnd(&stream);
+				outSections.push_back(entry);
+			}
 			return true;
 		}
 
-		std::uint32_t ReadU32LE(const std::vector<std::uint8_t>& bytes, std::size_t offset)
+		const SectionEntry* FindSection(const std::vector<SectionEntry>& sections, const char (&type)[4])
 		{
-			return static_cast<std::uint32_t>(bytes[offset]) |
-			       (static_cast<std::uint32_t>(bytes[offset + 1]) << 8) |
-			       (static_cast<std::uint32_t>(bytes[offset + 2]) << 16) |
-			       (static_cast<std::uint32_t>(bytes[offset + 3]) << 24);
+			const auto section = std::find_if(sections.begin(), sections.end(), [&](const SectionEntry& a_entry) {
+				return std::memcmp(a_entry.type, type, sizeof(type)) == 0;
+			});
+			return section == sections.end() ? nullptr : &*section;
 		}
 
-		std::uint16_t ReadU16LE(const std::vector<std::uint8_t>& bytes, std::size_t offset)
+		// Copies or inflates one section into outPayload and checks its length and CRC-32.
+		bool InflateSection(
+			const std::vector<std::uint8_t>& data,
+			const SectionEntry& section,
+			std::vector<std::uint8_t>& outPayload)
 		{
-			return static_cast<std::uint16_t>(bytes[offset]) |
-			       (static_cast<std::uint16_t>(bytes[offset + 1]) << 8);
+			const std::string_view type(section.type, sizeof(section.type));
+			const auto* stored = data.data() + section.offset;
+			const auto storedLength = static_cast<std::size_t>(section.storedLength);
+			outPayload.resize(static_cast<std::size_t>(section.length));
+
+			if (section.codec == kCodecStored) {
+				if (storedLength != outPayload.size()) {
+					SKSE::log::error("R.A.P.I.D. RAP2 section {} has a stored length that does not match its length", type);
+					return false;
+				}
+				std::memcpy(outPayload.data(), stored, storedLength);
+			} else if (section.codec == kCodecZlib) {
+				z_stream stream{};
+				if (inflateInit(&stream) != Z_OK) {
+					SKSE::log::error("R.A.P.I.D. zlib inflateInit failed");
+					return false;
+				}
+				stream.next_in = const_cast<Bytef*>(reinterpret_cast<const Bytef*>(stored));
+				stream.avail_in = static_cast<uInt>(storedLength);
+				stream.next_out = reinterpret_cast<Bytef*>(outPayload.data());
+				stream.avail_out = static_cast<uInt>(outPayload.size());
+				const int inflateResult = inflate(&stream, Z_FINISH);
+				const auto produced = static_cast<std::size_t>(stream.total_out);
+				inflateEnd(&stream);
+				if (inflateResult != Z_STREAM_END || produced != outPayload.size()) {
+					SKSE::log::error(
+						"R.A.P.I.D. zlib inflate of section {} failed with error code {} ({} of {} bytes)",
+						type,
+						inflateResult,
+						produced,
+						outPayload.size());
+					return false;
+				}
+			} else {
+				SKSE::log::error("R.A.P.I.D. RAP2 section {} uses unknown codec {}", type, section.codec);
+				return false;
+			}
+
+			if (static_cast<std::uint32_t>(crc32_z(0L, outPayload.data(), outPayload.size())) != section.crc) {
+				SKSE::log::error("R.A.P.I.D. RAP2 section {} failed its checksum", type);
+				return false;
+			}
+			return true;
 		}
 
-		bool ParseRap2(const std::vector<std::uint8_t>& data, std::vector<std::string>& outPaths)
+		// Validates the header and section directory of the cache file and inflates the path records.
+		bool ReadRap2(
+			const std::vector<std::uint8_t>& data,
+			std::vector<SectionEntry>& outSections,
+			std::vector<std::uint8_t>& outPathRecords,
+			std::uint32_t& outCount)
 		{
-			if (data.size() < 12) {
-				SKSE::log::error("R.A.P.I.D. RAP2 cache payload too small for header");
+			if (data.size() < kRap2HeaderSize) {
+				SKSE::log::error("R.A.P.I.D. RAP2 cache too small for header");
 				return false;
 			}
 
@@ -117,59 +221,125 @@ namespace RAPID
 				return false;
 			}
 
-			const std::uint32_t expectedCount = ReadU32LE(data, 8);
-			std::size_t cursor = 12;
+			outCount = ReadU32LE(data, 8);
+			if (!ReadSectionDirectory(data, outSections)) {
+				return false;
+			}
+
+			if (Settings::Get().verboseLogging) {
+				for (const auto& section : outSections) {
+					SKSE::log::info(
+						"R.A.P.I.D. RAP2 section {}: offset={}, stored={}, length={}, codec={}",
+						std::string_view(section.type, sizeof(section.type)),
+						section.offset,
+						section.storedLength,
+						section.length,
+						section.codec);
+				}
+			}
+
+			const SectionEntry* pathSection = FindSection(outSections, kSectionPaths);
+			if (!pathSection) {
+				SKSE::log::error("R.A.P.I.D. RAP2 cache has no path records section");
+				return false;
+			}
+			return InflateSection(data, *pathSection, outPathRecords);
+		}
+
+		bool ParseRap2(
+			const std::vector<std::uint8_t>& records,
+			std::uint32_t expectedCount,
+			std::vector<std::string>& outPaths)
+		{
+			std::size_t cursor = 0;
+			const std::size_t pathBlockEnd = records.size();
 
 			outPaths.clear();
 			outPaths.reserve(expectedCount);
 
 			for (std::uint32_t i = 0; i < expectedCount; ++i) {
-				if (cursor + sizeof(std::uint64_t) + sizeof(std::uint16_t) > data.size()) {
+				if (cursor + sizeof(std::uint64_t) + sizeof(std::uint16_t) > pathBlockEnd) {
 					SKSE::log::error("R.A.P.I.D. RAP2 cache truncated reading record header at index {}", i);
 					return false;
 				}
 
 				cursor += sizeof(std::uint64_t);
 
-				const std::uint16_t pathLength = ReadU16LE(data, cursor);
+				const std::uint16_t pathLength = ReadU16LE(records, cursor);
 				cursor += sizeof(std::uint16_t);
 
-				if (cursor + pathLength > data.size()) {
+				if (cursor + pathLength > pathBlockEnd) {
 					SKSE::log::error("R.A.P.I.D. RAP2 cache truncated reading path bytes at index {}", i);
 					return false;
 				}
 
-				std::string path(reinterpret_cast<const char*>(data.data() + cursor), pathLength);
+				std::string path(reinterpret_cast<const char*>(records.data() + cursor), pathLength);
 				cursor += pathLength;
 				if (!path.empty()) {
 					outPaths.push_back(std::move(path));
 				}
 			}
 
-			if (cursor < data.size()) {
-				if (data.size() - cursor < sizeof(std::uint32_t)) {
-					SKSE::log::error("R.A.P.I.D. RAP2 metadata trailer is truncated");
-					return false;
-				}
-				const std::uint32_t metadataLen = ReadU32LE(data, data.size() - sizeof(std::uint32_t));
-				if (metadataLen > data.size() - cursor - sizeof(std::uint32_t) && Settings::Get().verboseLogging) {
-					SKSE::log::warn(
-						"R.A.P.I.D. RAP2 metadata length appears invalid (len={}, trailing={})",
-						metadataLen,
-						data.size() - cursor - sizeof(std::uint32_t));
-				}
+			if (cursor != pathBlockEnd && Settings::Get().verboseLogging) {
+				SKSE::log::warn(
+					"R.A.P.I.D. RAP2 path records section has {} trailing bytes",
+					pathBlockEnd - cursor);
 			}
 
 			return true;
 		}
 
+		// The hot set is optional: a missing or malformed section only costs the fast path.
+		void ParseHotSet(
+			const std::vector<std::uint8_t>& hotSet,
+			std::size_t pathCount,
+			std::vector<std::uint64_t>& outHashes,
+			std::vector<std::uint32_t>& outIndexes)
+		{
+			outHashes.clear();
+			outIndexes.clear();
+			if (hotSet.empty()) {
+				return;
+			}
+
+			const std::size_t length = hotSet.size();
+			if (length < sizeof(std::uint32_t)) {
+				SKSE::log::warn("R.A.P.I.D. RAP2 hot set section is truncated; ignoring it");
+				return;
+			}
+			const std::size_t count = ReadU32LE(hotSet, 0);
+			if (length != sizeof(std::uint32_t) + count * (sizeof(std::uint64_t) + sizeof(std::uint32_t))) {
+				SKSE::log::warn("R.A.P.I.D. RAP2 hot set section has an invalid length; ignoring it");
+				return;
+			}
+
+			const std::size_t hashesStart = sizeof(std::uint32_t);
+			const std::size_t indexesStart = hashesStart + count * sizeof(std::uint64_t);
+			outHashes.reserve(count);
+			outIndexes.reserve(count);
+			for (std::size_t i = 0; i < count; ++i) {
+				const std::uint32_t index = ReadU32LE(hotSet, indexesStart + i * sizeof(std::uint32_t));
+				if (index >= pathCount) {
+					continue;
+				}
+				outHashes.push_back(ReadU64LE(hotSet, hashesStart + i * sizeof(std::uint64_t)));
+				outIndexes.push_back(index);
+			}
+			if (!std::is_sorted(outHashes.begin(), outHashes.end())) {
+				SKSE::log::warn("R.A.P.I.D. RAP2 hot set section is not sorted; ignoring it");
+				outHashes.clear();
+				outIndexes.clear();
+			}
+		}
+
 		bool ParseCacheEntries(
-			const std::vector<std::uint8_t>& data,
+			const std::vector<std::uint8_t>& records,
+			std::uint32_t expectedCount,
 			std::vector<std::string>& outPaths,
 			CacheFormat& outFormat)
 		{
 			outFormat = CacheFormat::kUnknown;
-			if (!ParseRap2(data, outPaths)) {
+			if (!ParseRap2(records, expectedCount, outPaths)) {
 				return false;
 			}
 			outFormat = CacheFormat::kRap2;
@@ -183,42 +353,90 @@ namespace RAPID
 			return true;
 		}
 
+		const auto t0 = std::chrono::steady_clock::now();
 		std::vector<std::uint8_t> compressed;
 		if (!ReadCompressedCache(compressed)) {
 			return false;
 		}
 
-		std::vector<std::uint8_t> uncompressed;
-		if (!InflateCache(compressed, uncompressed)) {
+		const auto t1 = std::chrono::steady_clock::now();
+		std::vector<SectionEntry> sections;
+		std::vector<std::uint8_t> pathRecords;
+		std::uint32_t expectedCount = 0;
+		if (!ReadRap2(compressed, sections, pathRecords, expectedCount)) {
 			return false;
 		}
+		std::vector<std::uint8_t> hotSet;
+		if (const SectionEntry* hotSection = FindSection(sections, kSectionHotSet);
+			hotSection && !InflateSection(compressed, *hotSection, hotSet)) {
+			SKSE::log::warn("R.A.P.I.D. RAP2 hot set section is unreadable; ignoring it");
+			hotSet.clear();
+		}
+		const auto inflatedBytes = pathRecords.size() + hotSet.size();
+		const auto t2 = std::chrono::steady_clock::now();
 
-		if (!ParseCacheEntries(uncompressed, _paths, _format)) {
+		if (!ParseCacheEntries(pathRecords, expectedCount, _paths, _format)) {
 			return false;
 		}
+		pathRecords.clear();
+		pathRecords.shrink_to_fit();
 
 		if (_paths.empty()) {
 			SKSE::log::warn("R.A.P.I.D. cache contains no entries");
 			return false;
 		}
 
-		_hashToPathIndexes.clear();
-		_hashToPathIndexes.reserve(_paths.size());
-		for (std::uint32_t i = 0; i < _paths.size(); ++i) {
-			const std::uint64_t hash = ComputeRapidHash64(_paths[i]);
-			_hashToPathIndexes[hash].push_back(i);
-		}
+		ParseHotSet(hotSet, _paths.size(), _hotHashes, _hotPathIndexes);
+
+		_indexReady.store(false, std::memory_order_relaxed);
+		_hotHitsBeforeIndex.store(0, std::memory_order_relaxed);
 		_loaded = true;
+		try {
+			_indexBuilder = std::thread([this] { BuildIndex(); });
+		} catch (const std::system_error& e) {
+			SKSE::log::warn("R.A.P.I.D. could not start the index thread ({}); indexing inline", e.what());
+			BuildIndex();
+		}
+		const auto t3 = std::chrono::steady_clock::now();
 
+		// The MO2 plugin's launch history parses this line; keep the field names stable.
+		// index= is the time Load blocked for; the hash map itself is logged when it is ready.
 		SKSE::log::info(
-			"R.A.P.I.D. cache loaded from {}: {} paths (format={}, inflated={} bytes)",
+			"R.A.P.I.D. cache loaded from {}: {} paths (format={}, inflated={} bytes, read={:.3f} ms, inflate={:.3f} ms, index={:.3f} ms)",
 			GetCachePath().string(),
 			_paths.size(),
 			static_cast<std::uint32_t>(_format),
-			uncompressed.size());
+			inflatedBytes,
+			std::chrono::duration<double, std::milli>(t1 - t0).count(),
+			std::chrono::duration<double, std::milli>(t2 - t1).count(),
+			std::chrono::duration<double, std::milli>(t3 - t2).count());
+		if (!_hotHashes.empty()) {
+			SKSE::log::info("R.A.P.I.D. cache hot set: {} records", _hotHashes.size());
+		}
 		return true;
 	}
 
+	void LooseFileCache::BuildIndex()
+	{
+		const auto t0 = std::chrono::steady_clock::now();
+		_hashToPathIndexes.clear();
+		_hashToPathIndexes.reserve(_paths.size());
+		for (std::uint32_t i = 0; i < _paths.size(); ++i) {
+			const std::uint64_t hash = ComputeRapidHash64(_paths[i]);
+			_hashToPathIndexes[hash].push_back(i);
+		}
+		_indexReady.store(true, std::memory_order_release);
+		_indexReady.notify_all();
+		const auto t1 = std::chrono::steady_clock::now();
+
+		if (Settings::Get().performanceDiagnostics || Settings::Get().verboseLogging) {
+			SKSE::log::info(
+				"R.A.P.I.D. cache index ready in {:.3f} ms; {} lookup(s) served from the hot set meanwhile",
+				std::chrono::duration<double, std::milli>(t1 - t0).count(),
+				_hotHitsBeforeIndex.load(std::memory_order_relaxed));
+		}
+	}
+
 	std::span<const std::string> LooseFileCache::GetAllPaths() const
 	{
 		if (!_loaded || _paths.empty()) {
@@ -240,6 +458,20 @@ namespace RAPID
 		}
 
 		const std::uint64_t hash = ComputeRapidHash64(normalized);
+		if (!_indexReady.load(std::memory_order_acquire)) {
+			const auto first = std::lower_bound(_hotHashes.begin(), _hotHashes.end(), hash);
+			for (auto hot = first; hot != _hotHashes.end() && *hot == hash; ++hot) {
+				const std::uint32_t index = _hotPathIndexes[static_cast<std::size_t>(hot - _hotHashes.begin())];
+				if (_paths[index] == normalized) {
+					_hotHitsBeforeIndex.fetch_add(1, std::memory_order_relaxed);
+					result.path = &_paths[index];
+					result.collisionCandidates = static_cast<std::size_t>(hot - first) + 1;
+					return result;
+				}
+			}
+			_indexReady.wait(false, std::memory_order_acquire);
+		}
+
 		const auto it = _hashToPathIndexes.find(hash);
 		if (it == _hashToPathIndexes.end()) {
 			return result;
@@ -267,9 +499,17 @@ namespace RAPID
 
 	void LooseFileCache::Release()
 	{
+		if (_indexBuilder.joinable()) {
+			_indexBuilder.join();
+		}
 		_paths.clear();
 		_paths.shrink_to_fit();
 		_hashToPathIndexes.clear();
+		_hotHashes.clear();
+		_hotHashes.shrink_to_fit();
+		_hotPathIndexes.clear();
+		_hotPathIndexes.shrink_to_fit();
+		_indexReady.store(false, std::memory_order_relaxed);
 		_loaded = false;
 		_format = CacheFormat::kUnknown;
 		if (Settings::Get().verboseLogging) {
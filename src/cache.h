@@ -1,9 +1,11 @@
 #pragma once
 
+#include <atomic>
 #include <cstddef>
 #include <cstdint>
 #include <span>
 #include <string>
+#include <thread>
 #include <unordered_map>
 #include <vector>
 
@@ -32,8 +34,18 @@ namespace RAPID
 		void Release();
 
 	private:
+		void BuildIndex();
+
 		std::vector<std::string> _paths;
+		// Built on _indexBuilder after Load returns, so path injection does not wait for it.
 		std::unordered_map<std::uint64_t, std::vector<std::uint32_t>> _hashToPathIndexes;
+		std::atomic<bool> _indexReady{ false };
+		std::thread _indexBuilder;
+		// Optional HOTS section: the most looked-up records' hashes, sorted. Lookups are served
+		// from it while the map is being built; misses wait for the map.
+		std::vector<std::uint64_t> _hotHashes;
+		std::vector<std::uint32_t> _hotPathIndexes;
+		mutable std::atomic<std::uint64_t> _hotHitsBeforeIndex{ 0 };
 		bool _loaded{ false };
 		CacheFormat _format{ CacheFormat::kUnknown };
 	};
@@ -2,6 +2,7 @@
 
 #include "cache.h"
 #include "settings.h"
+#include "trace.h"
 
 namespace RAPID
 {
@@ -12,6 +13,7 @@ namespace RAPID
 		bool a_readOnly)
 	{
 		const ResolveResult resolve = GetLooseFileCache().ResolvePath(a_path);
+		Trace::RecordLookup(Trace::LookupOp::kStream, a_path, resolve.path != nullptr, resolve.collisionCandidates);
 		if (!resolve.path) {
 			return RE::BSResource::ErrorCode::kNotExist;
 		}
@@ -31,6 +33,7 @@ namespace RAPID
 		bool a_readOnly)
 	{
 		const ResolveResult resolve = GetLooseFileCache().ResolvePath(a_path);
+		Trace::RecordLookup(Trace::LookupOp::kAsyncStream, a_path, resolve.path != nullptr, resolve.collisionCandidates);
 		if (!resolve.path || !_looseLocation) {
 			return RE::BSResource::ErrorCode::kNotExist;
 		}
@@ -59,6 +62,7 @@ namespace RAPID
 		RE::BSResource::Location*& a_location)
 	{
 		const ResolveResult resolve = GetLooseFileCache().ResolvePath(a_path);
+		Trace::RecordLookup(Trace::LookupOp::kInfo1, a_path, resolve.path != nullptr, resolve.collisionCandidates);
 		if (!resolve.path || !_looseLocation) {
 			return RE::BSResource::ErrorCode::kNotExist;
 		}
@@ -71,6 +75,7 @@ namespace RAPID
 		RE::BSResource::LocationTraverser* a_traverser)
 	{
 		const ResolveResult resolve = GetLooseFileCache().ResolvePath(a_path);
+		Trace::RecordLookup(Trace::LookupOp::kInfo2, a_path, resolve.path != nullptr, resolve.collisionCandidates);
 		if (!resolve.path || !_looseLocation) {
 			return RE::BSResource::ErrorCode::kNotExist;
 		}
@@ -3,6 +3,7 @@
 #include "hook.h"
 #include "location.h"
 #include "settings.h"
+#include "trace.h"
 
 #include <chrono>
 
@@ -22,6 +23,7 @@ void MessageHandler(SKSE::MessagingInterface::Message* a_msg)
 				elapsed.count());
 		}
 		RAPID::Hooks::FlushNativeTraversalTiming();
+		RAPID::Trace::FlushLookupTrace();
 		RAPID::GetLooseFileCache().Release();
 		break;
 	case SKSE::MessagingInterface::kPostLoad:
@@ -0,0 +1,128 @@
+#include "trace.h"
+#include "settings.h"
+
+#include <chrono>
+#include <filesystem>
+#include <fstream>
+#include <mutex>
+#include <string>
+
+namespace RAPID::Trace
+{
+	namespace
+	{
+		constexpr std::size_t kFlushThreshold = 1 << 20;
+
+		struct LookupTraceState
+		{
+			std::mutex lock;
+			std::ofstream file;
+			std::filesystem::path path;
+			std::string buffer;
+			std::chrono::steady_clock::time_point start;
+			std::uint64_t probes{ 0 };
+			std::uint64_t hits{ 0 };
+			bool opened{ false };
+			bool closed{ false };
+		};
+
+		LookupTraceState& GetState()
+		{
+			static LookupTraceState state;
+			return state;
+		}
+
+		const char* OpName(LookupOp a_op)
+		{
+			switch (a_op) {
+			case LookupOp::kStream:
+				return "stream";
+			case LookupOp::kAsyncStream:
+				return "async";
+			case LookupOp::kInfo1:
+				return "info1";
+			case LookupOp::kInfo2:
+				return "info2";
+			}
+			return "unknown";
+		}
+
+		bool OpenLocked(LookupTraceState& a_state)
+		{
+			a_state.opened = true;
+			const auto logsFolder = SKSE::log::log_directory();
+			if (!logsFolder) {
+				a_state.closed = true;
+				return false;
+			}
+			a_state.path = *logsFolder / "rapid_lookup_trace.tsv";
+			a_state.file.open(a_state.path, std::ios::binary | std::ios::trunc);
+			if (!a_state.file.is_open()) {
+				SKSE::log::warn("R.A.P.I.D. could not open lookup trace {}", a_state.path.string());
+				a_state.closed = true;
+				return false;
+			}
+			a_state.start = std::chrono::steady_clock::now();
+			a_state.buffer.reserve(kFlushThreshold + 4096);
+			a_state.buffer += "# RAPID lookup trace v1\n# t_us\top\tresult\tcandidates\tpath\n";
+			return true;
+		}
+
+		void WriteBufferLocked(LookupTraceState& a_state)
+		{
+			a_state.file.write(a_state.buffer.data(), static_cast<std::streamsize>(a_state.buffer.size()));
+			a_state.buffer.clear();
+		}
+	}
+
+	void RecordLookup(LookupOp a_op, const char* a_path, bool a_hit, std::size_t a_candidates)
+	{
+		if (!Settings::Get().performanceDiagnostics) {
+			return;
+		}
+
+		auto& state = GetState();
+		const std::scoped_lock guard(state.lock);
+		if (state.closed || (!state.opened && !OpenLocked(state))) {
+			return;
+		}
+
+		const auto elapsedUs = std::chrono::duration_cast<std::chrono::microseconds>(
+			std::chrono::steady_clock::now() - state.start).count();
+		state.buffer += std::to_string(elapsedUs);
+		state.buffer += '\t';
+		state.buffer += OpName(a_op);
+		state.buffer += a_hit ? "\thit\t" : "\tmiss\t";
+		state.buffer += std::to_string(a_candidates);
+		state.buffer += '\t';
+		for (const char* c = a_path ? a_path : ""; *c != '\0'; ++c) {
+			state.buffer += (*c == '\t' || *c == '\n' || *c == '\r') ? ' ' : *c;
+		}
+		state.buffer += '\n';
+
+		++state.probes;
+		if (a_hit) {
+			++state.hits;
+		}
+		if (state.buffer.size() >= kFlushThreshold) {
+			WriteBufferLocked(state);
+		}
+	}
+
+	void FlushLookupTrace()
+	{
+		auto& state = GetState();
+		const std::scoped_lock guard(state.lock);
+		if (!state.opened || state.closed) {
+			return;
+		}
+		WriteBufferLocked(state);
+		state.file.close();
+		state.closed = true;
+		SKSE::log::info(
+			"R.A.P.I.D. performance diagnostics: lookup trace recorded {} probes ({} hits) to {}",
+			state.probes,
+			state.hits,
+			state.path.string());
+	}
+}
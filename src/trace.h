@@ -0,0 +1,21 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+
+namespace RAPID::Trace
+{
+	enum class LookupOp : std::uint8_t
+	{
+		kStream = 0,
+		kAsyncStream,
+		kInfo1,
+		kInfo2
+	};
+
+	// With PerformanceDiagnostics on, every ResolvePath probe is appended to
+	// rapid_lookup_trace.tsv in the SKSE log folder as one tab-separated line:
+	// microseconds since the first probe, op, hit|miss, hash candidates, path as requested.
+	void RecordLookup(LookupOp a_op, const char* a_path, bool a_hit, std::size_t a_candidates);
+	void FlushLookupTrace();
+}